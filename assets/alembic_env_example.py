@@ -1,67 +0,0 @@
-import sys
-from logging.config import fileConfig
-from pathlib import Path
-
-from alembic import context
-from sqlalchemy import engine_from_config, pool
-
-# Add src directory to path
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-
-# Import models
-from src.database.connection import Base
-from src.database.models.item import Item
-from src.database.models.transaction import Transaction
-from src.database.models.user import User
-
-# Alembic Config object
-config = context.config
-
-if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
-
-target_metadata = Base.metadata
-
-
-def run_migrations_offline() -> None:
-    url = config.get_main_option("sqlalchemy.url")
-    context.configure(
-        url=url,
-        target_metadata=target_metadata,
-        literal_binds=True,
-        dialect_opts={"paramstyle": "named"},
-        # Prevent table deletion
-        compare_type=True,
-        compare_server_default=True,
-        render_as_batch=True,
-    )
-
-    with context.begin_transaction():
-        context.run_migrations()
-
-
-def run_migrations_online() -> None:
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
-
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-            # Prevent table deletion
-            compare_type=True,
-            compare_server_default=True,
-            render_as_batch=True,
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
-
-
-if context.is_offline_mode():
-    run_migrations_offline()
-else:
-    run_migrations_online()
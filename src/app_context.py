@@ -28,6 +28,10 @@ class AppContext:
     mattermost_controller: Optional[MattermostController] = None
     _scheduler_email: Optional[object] = field(default=None, repr=False)
     _scheduler_mattermost: Optional[object] = field(default=None, repr=False)
+    _scheduler_database: Optional[object] = field(default=None, repr=False)
+    _scheduler_journal: Optional[object] = field(default=None, repr=False)
+    _scheduler_archive: Optional[object] = field(default=None, repr=False)
+    _scheduler_ledger: Optional[object] = field(default=None, repr=False)
 
     def cleanup(self) -> None:
         """Cleanup all controllers and resources."""
@@ -48,6 +52,22 @@ class AppContext:
             self._scheduler_mattermost.shutdown()
             self._scheduler_mattermost = None
 
+        if self._scheduler_database:
+            self._scheduler_database.shutdown()
+            self._scheduler_database = None
+
+        if self._scheduler_journal:
+            self._scheduler_journal.shutdown()
+            self._scheduler_journal = None
+
+        if self._scheduler_archive:
+            self._scheduler_archive.shutdown()
+            self._scheduler_archive = None
+
+        if self._scheduler_ledger:
+            self._scheduler_ledger.shutdown()
+            self._scheduler_ledger = None
+
         if self.email_controller:
             self.email_controller.stop()
             self.email_controller = None
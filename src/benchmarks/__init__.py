@@ -0,0 +1,5 @@
+"""Benchmarks of the database paths, run by hand with `python -m src.benchmarks.<name>`.
+
+Not imported by the application. The scratch databases and test data they
+share are in `support`.
+"""
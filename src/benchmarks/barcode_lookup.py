@@ -0,0 +1,104 @@
+"""Barcode lookup benchmark: the in-memory item catalog against the database query.
+
+Fills a database with `--items` items and resolves random barcodes the ways
+the lookup step of a scan can go:
+
+- catalog: `item_catalog.get_by_barcode`, what `UserMainPage.search_product`
+  does on the Tk thread for every scan of a known item
+- catalog miss: `ItemCatalog.lookup` with the item not cached, which queries
+  the database in its own session (an item created on another kiosk)
+- query: `Item.get_by_barcode` in its own session, the per-scan query the
+  catalog replaced
+
+It times the lookup only, not the widgets the cart builds for the item, and
+reports the latency per scan and the time to load the catalog:
+
+    python -m src.benchmarks.barcode_lookup --items 10000 --scans 5000
+
+By default it runs on a temporary SQLite file with the kiosk's SQLite
+profile. `--url` points it at another database, e.g. a scratch PostgreSQL
+database, where the network round trip of the query paths shows; it creates
+the tables there and adds the benchmark items.
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.orm import sessionmaker
+
+from src.benchmarks.support import add_items, create_engine, latencies, scratch_url, unique_prefix
+from src.database.connection import Base
+from src.database.item_catalog import CatalogItem, ItemCatalog
+from src.database.models.item import Item
+
+PATHS = (("catalog", "catalog"), ("miss", "catalog miss"), ("query", "query"))
+
+
+def run(url: str, items: int, scans: int) -> Dict[str, Dict[str, float]]:
+    """Add `items` items and time `scans` barcode lookups per path."""
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    prefix = unique_prefix("lookup")
+    with session_factory() as session:
+        add_items(session, items, prefix)
+        session.commit()
+    barcodes = [f"{prefix}{random.randrange(items)}" for _ in range(scans)]
+
+    catalog = ItemCatalog()
+    started = time.perf_counter()
+    with session_factory() as session:
+        catalog.load(session)
+    load_seconds = time.perf_counter() - started
+
+    samples: Dict[str, list] = {name: [] for name, _label in PATHS}
+    for barcode in barcodes:
+        started = time.perf_counter()
+        entry = catalog.get_by_barcode(barcode)
+        samples["catalog"].append(time.perf_counter() - started)
+
+        # Forget the item, so the lookup has to go to the database
+        catalog.remove(entry.id)
+        started = time.perf_counter()
+        with session_factory() as session:
+            catalog.lookup(session, barcode)
+        samples["miss"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with session_factory() as session:
+            CatalogItem.from_item(Item.get_by_barcode(session, barcode))
+        samples["query"].append(time.perf_counter() - started)
+    engine.dispose()
+
+    return {
+        **{name: latencies(path_samples) for name, path_samples in samples.items()},
+        "load": {"seconds": load_seconds},
+    }
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--scans", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    with scratch_url("barcode_lookup", args.url) as url:
+        result = run(url, args.items, args.scans)
+
+    print(f"{args.items} items, {args.scans} scans per path")
+    for name, label in PATHS:
+        path = result[name]
+        print(
+            f"{label:>12}: median {path['median_ms']:.4f} ms, "
+            f"p95 {path['p95_ms']:.4f} ms, max {path['max_ms']:.4f} ms"
+        )
+    print(f"catalog load: {result['load']['seconds'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
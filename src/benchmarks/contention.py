@@ -0,0 +1,160 @@
+"""Contention benchmark for the checkout.
+
+Starts several kiosk processes that all buy the same item for the same user
+as fast as they can, with less stock than they try to buy in total. With
+`--lines` every cart holds that many items instead, one of each benchmark
+item in a shuffled order, so concurrent carts lock the same rows in
+different orders (a 20-line cart is the largest the kiosk sees). Reports
+the checkout throughput, how many transactions the database aborted and
+`perform_checkout` retried, and checks that the item was neither oversold nor
+undersold and that the user was charged exactly for what was sold:
+
+    python -m src.benchmarks.contention --kiosks 4 --checkouts 500
+    python -m src.benchmarks.contention --kiosks 4 --checkouts 200 --lines 20
+
+By default it runs on a temporary SQLite file with the kiosk's SQLite
+profile. `--url` points it at another database, e.g. a scratch PostgreSQL
+database; it creates the tables there and adds a benchmark user and items.
+"""
+
+import argparse
+import multiprocessing
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from src.benchmarks.support import add_items, create_engine, scratch_url, unique_prefix
+from src.database.checkout import CheckoutError, perform_checkout
+from src.database.connection import Base
+from src.database.models.item import Item
+from src.database.models.transaction import Transaction
+from src.database.models.user import User
+
+PRICE = 1.0
+
+
+def _set_up(url: str, stock: int, credit: float, lines: int) -> Dict[str, Any]:
+    """Create the tables, a benchmark user and `lines` items; returns their ids."""
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    prefix = unique_prefix("contention")
+    with sessionmaker(bind=engine)() as session:
+        user = User(name="Contention", nfcid=prefix, credit=credit, type="User")
+        session.add(user)
+        items = add_items(session, lines, prefix, price=PRICE, quantity=stock)
+        session.commit()
+        ids = {"user_id": user.id, "item_ids": [item.id for item in items]}
+    engine.dispose()
+    return ids
+
+
+def _kiosk(url: str, ids: Dict[str, Any], checkouts: int, start, results) -> None:
+    """One kiosk process: `checkouts` checkouts of one of each item as fast as possible."""
+    engine = create_engine(url)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    counts = {"sold": 0, "rejected": 0, "retries": 0, "failed": 0}
+    cart = [(item_id, 1) for item_id in ids["item_ids"]]
+    start.wait()
+    for _ in range(checkouts):
+        random.shuffle(cart)
+        with session_factory() as session:
+            try:
+                result = perform_checkout(session, ids["user_id"], cart)
+            except CheckoutError:
+                counts["rejected"] += 1
+            except Exception:  # pylint: disable=broad-exception-caught
+                counts["failed"] += 1
+            else:
+                counts["sold"] += 1
+                counts["retries"] += result.attempts - 1
+    engine.dispose()
+    results.put(counts)
+
+
+def run(url: str, kiosks: int, checkouts: int, lines: int = 1) -> Dict[str, Any]:
+    """Run `kiosks` processes with `checkouts` carts each against half that stock per item."""
+    stock = kiosks * checkouts // 2
+    credit = float(kiosks * checkouts * lines) * PRICE
+    ids = _set_up(url, stock, credit, lines)
+
+    start = multiprocessing.Event()
+    results: Any = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=_kiosk,
+            args=(url, ids, checkouts, start, results),
+        )
+        for _ in range(kiosks)
+    ]
+    for process in processes:
+        process.start()
+    started = time.perf_counter()
+    start.set()
+    totals: Counter = Counter()
+    for _ in processes:
+        totals.update(results.get())
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+
+    return {
+        **totals,
+        "stock": stock,
+        "elapsed": elapsed,
+        "consistent": _is_consistent(url, ids, stock, totals["sold"], credit),
+    }
+
+
+def _is_consistent(url: str, ids: Dict[str, Any], stock: int, sold: int, credit: float) -> bool:
+    """Whether stock, transactions and credit agree with the carts the kiosks sold."""
+    item_ids: List[int] = ids["item_ids"]
+    engine = create_engine(url)
+    with sessionmaker(bind=engine)() as session:
+        remaining = [session.get(Item, item_id).quantity for item_id in item_ids]
+        balance = float(session.get(User, ids["user_id"]).credit)
+        charged = float(
+            session.scalar(
+                select(func.coalesce(func.sum(Transaction.cost), 0)).where(
+                    Transaction.item_id.in_(item_ids)
+                )
+            )
+        )
+    engine.dispose()
+    return (
+        all(quantity == stock - sold for quantity in remaining)
+        and abs(charged - sold * len(item_ids) * PRICE) < 1e-6
+        and abs(credit - balance - charged) < 1e-6
+    )
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    parser.add_argument("--kiosks", type=int, default=4)
+    parser.add_argument("--checkouts", type=int, default=500, help="attempts per kiosk")
+    parser.add_argument("--lines", type=int, default=1, help="items per cart")
+    args = parser.parse_args(argv)
+
+    with scratch_url("contention", args.url) as url:
+        result = run(url, args.kiosks, args.checkouts, args.lines)
+
+    attempts = args.kiosks * args.checkouts
+    print(
+        f"{args.kiosks} kiosks, {attempts} checkouts of {args.lines} line(s) "
+        f"against a stock of {result['stock']} per item: "
+        f"{attempts / result['elapsed']:.1f} checkouts/s"
+    )
+    print(
+        f"sold {result['sold']}, rejected (out of stock) {result['rejected']}, "
+        f"retried transactions {result['retries']}, failed {result['failed']}"
+    )
+    print("stock and credit consistent" if result["consistent"] else "INCONSISTENT")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Memory and latency of listing items with and without their images.
+
+Fills a fresh database with `--items` items, each with its own product photo
+of `--image-kb` KiB in the image table, and loads the listing three ways:
+
+- inline: every item with its photo, which is what loading the items cost
+  while the photo was a column of the `items` row
+- entities: `Item.read_all`, ORM items without image data
+- listing: the columns the admin item listing streams
+
+For each it reports the time to load (median of `--repeat` runs) and the
+peak memory allocated while loading, measured with tracemalloc in a separate
+run:
+
+    python -m src.benchmarks.listing --items 2000 --image-kb 64
+
+By default it runs on a temporary SQLite file with the kiosk's SQLite
+profile; `--url` points it at another database, e.g. a scratch PostgreSQL
+database.
+"""
+
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from src.benchmarks.support import add_items, create_engine, scratch_url, unique_prefix
+from src.database.connection import Base
+from src.database.models.item import Item
+from src.database.models.item_image import ItemImage
+
+# The columns `ItemListingPage` loads for its rows
+LISTING_COLUMNS = ("id", "name", "price", "image_hash", "category", "barcode")
+
+
+def _load_inline(session) -> List:
+    statement = (
+        select(Item, ItemImage.data)
+        .outerjoin(ItemImage, ItemImage.hash == Item.image_hash)
+        .order_by(Item.id)
+    )
+    return session.execute(statement).all()
+
+
+def _load_entities(session) -> List:
+    return Item.read_all(session)
+
+
+def _load_listing(session) -> List:
+    return list(Item.stream(session, columns=LISTING_COLUMNS))
+
+
+LOADERS: Dict[str, Callable] = {
+    "inline": _load_inline,
+    "entities": _load_entities,
+    "listing": _load_listing,
+}
+
+
+def _fill(session_factory, items: int, image_kb: int) -> None:
+    with session_factory() as session:
+        rows = add_items(session, items, unique_prefix("listing"))
+        for number, item in enumerate(rows):
+            item.image_hash = ItemImage.store(session, os.urandom(image_kb * 1024))
+            if number % 200 == 199:
+                session.commit()
+        session.commit()
+
+
+def run(url: str, items: int, image_kb: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Add `items` items with images and measure each way of loading them."""
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    _fill(session_factory, items, image_kb)
+
+    results = {}
+    for name, load in LOADERS.items():
+        timings = []
+        for _ in range(repeat):
+            with session_factory() as session:
+                started = time.perf_counter()
+                rows = load(session)
+                timings.append(time.perf_counter() - started)
+            del rows
+
+        with session_factory() as session:
+            tracemalloc.start()
+            rows = load(session)
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        del rows
+        results[name] = {"seconds": statistics.median(timings), "peak_bytes": peak}
+    engine.dispose()
+    return results
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--image-kb", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with scratch_url("listing", args.url) as url:
+        results = run(url, args.items, args.image_kb, args.repeat)
+
+    print(f"{args.items} items with {args.image_kb} KiB images")
+    for name, result in results.items():
+        print(
+            f"{name:>8}: {result['seconds'] * 1000:8.1f} ms, "
+            f"peak {result['peak_bytes'] / 1024 / 1024:8.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Soak test of the unit-of-work sessions.
+
+Initializes the database the way the kiosk does and runs `--iterations`
+simulated customers, each a login (user lookup by NFC id) and a two-line
+checkout in their own `session_scope`, like the screens do. Every
+`--interval` iterations it samples the Python memory traced by tracemalloc
+and the maximum resident set size, and at the end reports how much both grew
+after the warm-up; with per-operation sessions neither should keep growing:
+
+    python -m src.benchmarks.soak --iterations 100000
+
+Samples are printed as they are taken; 100k iterations take about an hour
+on SQLite, also because tracemalloc slows every allocation down. The RSS
+first grows with SQLite's page cache and memory-mapped database file until
+they reach the `cache_size` and `mmap_size` of the profile. It runs on a
+temporary SQLite file; `--url` is not offered because the benchmark writes
+100k checkouts.
+"""
+
+import argparse
+import random
+import resource
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from src.benchmarks.support import add_items, scratch_path, unique_prefix
+from src.database.checkout import perform_checkout
+from src.database.connection import initialize_database, session_scope
+from src.database.item_catalog import item_catalog
+from src.database.models.user import User
+from src.database.user_cache import user_cache
+
+# Samples taken before this share of the iterations only warm up caches and pools
+WARM_UP_SHARE = 0.2
+
+
+def _set_up(users: int, items: int, iterations: int) -> Dict[str, List[Any]]:
+    """Add users with enough credit and items with enough stock for all iterations."""
+    prefix = unique_prefix("soak")
+    with session_scope() as session:
+        user_rows = [
+            User(name=f"Soak {number}", nfcid=f"{prefix}{number}", credit=1e9, type="User")
+            for number in range(users)
+        ]
+        session.add_all(user_rows)
+        item_rows = add_items(session, items, prefix, quantity=2 * iterations)
+        session.flush()
+        ids = {
+            "nfcids": [user.nfcid for user in user_rows],
+            "item_ids": [item.id for item in item_rows],
+        }
+    with session_scope() as session:
+        item_catalog.load(session)
+    return ids
+
+
+def _max_rss_kib() -> int:
+    # Linux reports KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _customer(ids: Dict[str, List[Any]]) -> None:
+    """One login and checkout, each in its own unit of work, updating the caches like the UI."""
+    with session_scope() as session:
+        user = user_cache.lookup(session, random.choice(ids["nfcids"]))
+    lines = [(item_id, 1) for item_id in random.sample(ids["item_ids"], 2)]
+    with session_scope() as session:
+        result = perform_checkout(session, user.id, lines)
+    user_cache.set_credit(user.id, result.credit)
+    for item in result.items:
+        item_catalog.upsert(item)
+
+
+def run(
+    iterations: int,
+    interval: int,
+    users: int,
+    items: int,
+    on_sample: Optional[Callable[[Dict[str, float]], None]] = None,
+) -> List[Dict[str, float]]:
+    """Run the iterations and return the memory samples, also passed to `on_sample`."""
+    ids = _set_up(users, items, iterations)
+    samples = []
+    tracemalloc.start()
+    started = time.perf_counter()
+    for iteration in range(1, iterations + 1):
+        _customer(ids)
+        if iteration % interval == 0:
+            current, _peak = tracemalloc.get_traced_memory()
+            sample = {
+                "iteration": iteration,
+                "seconds": time.perf_counter() - started,
+                "traced_kib": current / 1024,
+                "max_rss_kib": _max_rss_kib(),
+            }
+            samples.append(sample)
+            if on_sample is not None:
+                on_sample(sample)
+    tracemalloc.stop()
+    return samples
+
+
+def _print_sample(sample: Dict[str, float]) -> None:
+    print(
+        f"{sample['iteration']:>8} iterations ({sample['seconds']:7.1f} s): "
+        f"traced {sample['traced_kib']:9.1f} KiB, "
+        f"max RSS {sample['max_rss_kib'] / 1024:7.1f} MiB",
+        flush=True,
+    )
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Run the soak test and print the memory samples."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--interval", type=int, default=10000, help="iterations per sample")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--items", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with scratch_path("soak") as path:
+        initialize_database({"database": {"type": "sqlite", "sqlite": {"path": path}}})
+        samples = run(args.iterations, args.interval, args.users, args.items, _print_sample)
+
+    settled = [
+        sample for sample in samples if sample["iteration"] > WARM_UP_SHARE * args.iterations
+    ]
+    if len(settled) >= 2:
+        print(
+            f"growth after warm-up: traced "
+            f"{settled[-1]['traced_kib'] - settled[0]['traced_kib']:+.1f} KiB, max RSS "
+            f"{(settled[-1]['max_rss_kib'] - settled[0]['max_rss_kib']) / 1024:+.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Checkout benchmark for the SQLite profile.
+
+Runs the same series of checkouts against a fresh database file once with
+SQLite's stock settings (rollback journal, `synchronous=FULL`) and once with
+the profile of `src.database.sqlite_tuning`, and reports the checkout
+throughput and the bytes the process wrote (`wchar` of `/proc/self/io`, which
+includes journal and WAL writes). Run it on the kiosk itself, next to the real
+database, to measure the SD card:
+
+    python -m src.benchmarks.sqlite_profile --directory src/database --checkouts 2000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.benchmarks.support import add_items, remove_database
+from src.database import sqlite_tuning
+from src.database.checkout import perform_checkout
+from src.database.connection import Base
+from src.database.models.user import User
+
+# Stock SQLite settings, stated explicitly so the baseline does not depend on
+# a database file left in WAL mode by an earlier run
+BASELINE_PRAGMAS: Dict[str, Any] = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+ITEM_COUNT = 50
+
+
+def _written_bytes() -> Optional[int]:
+    """Bytes written by this process so far, or None where `/proc` is not available."""
+    try:
+        with open("/proc/self/io", encoding="ascii") as io_stats:
+            for line in io_stats:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def run(path: str, checkouts: int, tuned: bool) -> Dict[str, Any]:
+    """Run `checkouts` two-line checkouts on a new database at `path`."""
+    remove_database(path)
+
+    engine = create_engine(f"sqlite:///{path}")
+    if tuned:
+        sqlite_tuning.install(engine, {})
+    else:
+        sqlite_tuning.apply_pragmas(engine, BASELINE_PRAGMAS)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    with session_factory() as session:
+        session.add(User(name="Benchmark", nfcid="benchmark", credit=10**9, type="User"))
+        add_items(session, ITEM_COUNT, "benchmark-", quantity=10**9)
+        session.commit()
+        user_id = session.query(User.id).scalar()
+
+    written_before = _written_bytes()
+    started = time.perf_counter()
+    for number in range(checkouts):
+        with session_factory() as session:
+            lines = [(number % ITEM_COUNT + 1, 1), ((number + 7) % ITEM_COUNT + 1, 2)]
+            perform_checkout(session, user_id, lines)
+    elapsed = time.perf_counter() - started
+    written_after = _written_bytes()
+    engine.dispose()
+
+    return {
+        "checkouts_per_second": checkouts / elapsed,
+        "written_bytes": (
+            written_after - written_before
+            if written_before is not None and written_after is not None
+            else None
+        ),
+    }
+
+
+def main() -> None:
+    """Compare the stock settings with the tuned profile and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--directory", default=tempfile.gettempdir())
+    parser.add_argument("--checkouts", type=int, default=1000)
+    args = parser.parse_args()
+
+    path = os.path.join(args.directory, "kiosk_benchmark.db")
+    try:
+        for name, tuned in (("stock", False), ("tuned", True)):
+            result = run(path, args.checkouts, tuned)
+            written = result["written_bytes"]
+            print(
+                f"{name:>5}: {result['checkouts_per_second']:8.1f} checkouts/s, "
+                + (
+                    f"{written / args.checkouts / 1024:7.1f} KiB written per checkout"
+                    if written is not None
+                    else "write volume not available"
+                )
+            )
+    finally:
+        remove_database(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Scaffolding shared by the benchmarks: scratch databases, test data, latencies."""
+
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine as sqlalchemy_create_engine
+
+from src.database import sqlite_tuning
+from src.database.models.item import Item
+
+# Files SQLite keeps next to a database
+_SQLITE_SUFFIXES = ("", "-wal", "-shm", "-journal")
+
+
+def remove_database(path: str) -> None:
+    """Delete a SQLite database file with its journal, WAL and shared-memory files."""
+    for suffix in _SQLITE_SUFFIXES:
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def create_engine(url: str):
+    """Engine for `url`; SQLite gets the kiosk's profile and may be used from any thread."""
+    if url.startswith("sqlite"):
+        engine = sqlalchemy_create_engine(url, connect_args={"check_same_thread": False})
+        sqlite_tuning.install(engine, {})
+        return engine
+    return sqlalchemy_create_engine(url)
+
+
+@contextmanager
+def scratch_path(name: str) -> Iterator[str]:
+    """Yield the path of a temporary SQLite file, removed before and afterwards."""
+    path = os.path.join(tempfile.gettempdir(), f"kiosk_{name}.db")
+    remove_database(path)
+    try:
+        yield path
+    finally:
+        remove_database(path)
+
+
+@contextmanager
+def scratch_url(name: str, url: Optional[str] = None) -> Iterator[str]:
+    """Yield `url`, or without one that of a temporary SQLite file removed afterwards."""
+    if url is not None:
+        yield url
+        return
+    with scratch_path(name) as path:
+        yield f"sqlite:///{path}"
+
+
+def unique_prefix(name: str) -> str:
+    """Prefix for NFC ids and barcodes that does not collide with an earlier run."""
+    return f"{name}-{time.time_ns()}-"
+
+
+def add_items(session, count: int, prefix: str, **columns: Any) -> List[Item]:
+    """Add `count` items with barcodes `<prefix><number>`; `columns` override the defaults.
+
+    Does not commit.
+    """
+    values = {"price": 1.0, "quantity": 100, "category": "Benchmark", **columns}
+    items = [
+        Item(name=f"Item {number}", barcode=f"{prefix}{number}", **values)
+        for number in range(count)
+    ]
+    session.add_all(items)
+    return items
+
+
+def latencies(samples: List[float]) -> Dict[str, float]:
+    """Median, 95th percentile and maximum of `samples` (seconds), in milliseconds."""
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "p95_ms": statistics.quantiles(samples, n=20)[-1] * 1000,
+        "max_ms": max(samples) * 1000,
+    }
@@ -2,16 +2,32 @@
 This package provides database connectivity and models for the Kiosk application.
 
 It includes:
-- Connection setup
-- User, Item, and Transaction models
+- Connection setup and unit-of-work sessions (`session_scope`)
+- User, Item, ItemImage, Checkout, Transaction, PurchaseRollup, CreditLedgerEntry
+  and CreditSnapshot models
 """
 
-from src.database.connection import SessionManager, get_db, get_new_session
+from src.database.connection import get_new_session, session_scope
+from src.database.models.checkout import Checkout
+from src.database.models.credit_ledger import CreditLedgerEntry, CreditSnapshot
 from src.database.models.item import Item
+from src.database.models.item_image import ItemImage
+from src.database.models.purchase_rollup import PurchaseRollup
 from src.database.models.transaction import Transaction
 
 # Models
 from src.database.models.user import User
 
 # Export classes and functions when this package is imported
-__all__ = ["SessionManager", "get_db", "get_new_session", "User", "Item", "Transaction"]
+__all__ = [
+    "session_scope",
+    "get_new_session",
+    "User",
+    "Item",
+    "ItemImage",
+    "Checkout",
+    "Transaction",
+    "PurchaseRollup",
+    "CreditLedgerEntry",
+    "CreditSnapshot",
+]
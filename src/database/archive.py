@@ -0,0 +1,315 @@
+"""Transaction archive.
+
+`transactions` (and `checkouts`) grow with every purchase, while the kiosk
+itself only reads the recent months; the statistics come from the monthly
+purchase rollup. Months older than `horizon_months` are moved out of the
+database into one gzip-compressed CSV file per table and month in
+`directory`:
+
+    transactions-2024-05.csv.gz
+    checkouts-2024-05.csv.gz
+
+The rollup rows of archived months stay in the database, so summaries and
+charts are unaffected. A month is written to its file (fsynced, then renamed
+into place) before its rows are deleted in one database transaction; if the
+kiosk dies in between, the next run merges the rows into the existing file
+by id, so nothing is lost or duplicated.
+
+The credit ledger is not archived, the balances are computed from it. The
+entries of archived checkouts stay in the database with their `checkout_id`
+cleared, in the same transaction that deletes the checkouts.
+
+`read_transactions` returns recent and archived transactions alike for the
+reports that need the raw rows.
+
+Archiving runs monthly when `database.archive.horizon_months` in
+`config.json` is set (0 disables it), or by hand:
+
+    python -m src.database.archive
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy import delete, select, update
+
+from src.app_context import get_app_context
+from src.database.models.checkout import Checkout
+from src.database.models.credit_ledger import CreditLedgerEntry
+from src.database.models.transaction import Transaction
+from src.database.rollup import month_of, month_start
+from src.logmgr import logger
+
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "horizon_months": 0,
+    "directory": "src/database/archive",
+}
+
+# Archived tables, children first: rows are deleted in this order
+_TABLES = (Transaction.__table__, Checkout.__table__)
+
+
+@dataclass(frozen=True)
+class TransactionRecord:  # pylint: disable=too-many-instance-attributes
+    """A transaction row, read from the database or from the archive."""
+
+    id: int
+    checkout_id: Optional[int]
+    user_id: int
+    item_id: int
+    date: datetime
+    cost: float
+    category: str
+    quantity: int
+    unit_price: Optional[float]
+    item_name: Optional[str]
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after (or before, if negative) `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _parse(column, value: str) -> Any:
+    if value == "":
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def _format(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class TransactionArchive:
+    """Moves old months of transactions into compressed CSV files and reads them back."""
+
+    def __init__(self) -> None:
+        self.settings: Dict[str, Any] = dict(DEFAULT_SETTINGS)
+
+    def configure(self, settings: Dict[str, Any]) -> None:
+        """Apply the `database.archive` settings."""
+        self.settings = {**DEFAULT_SETTINGS, **settings}
+
+    @property
+    def directory(self) -> Path:
+        """Directory holding the archive files."""
+        return Path(self.settings["directory"])
+
+    def _path(self, table, month: date) -> Path:
+        return self.directory / f"{table.name}-{month:%Y-%m}.csv.gz"
+
+    def cutoff(self, today: Optional[date] = None) -> date:
+        """First month that is kept in the database."""
+        return add_months(month_start(today or date.today()), -int(self.settings["horizon_months"]))
+
+    def archived_months(self) -> List[date]:
+        """Months with an archived transactions file, oldest first."""
+        if not self.directory.is_dir():
+            return []
+        prefix = f"{Transaction.__tablename__}-"
+        return sorted(
+            datetime.strptime(path.name[len(prefix) : len(prefix) + 7], "%Y-%m").date()
+            for path in self.directory.glob(f"{prefix}*.csv.gz")
+        )
+
+    def archive(self, session, today: Optional[date] = None) -> int:
+        """Archive every month before `cutoff` and commit; returns the archived transactions."""
+        if int(self.settings["horizon_months"]) <= 0:
+            raise ValueError("database.archive.horizon_months must be positive to archive")
+        cutoff = self.cutoff(today)
+        dialect_name = session.get_bind().dialect.name
+        months = set()
+        for table in _TABLES:
+            month = month_of(table.c.date, dialect_name)
+            months.update(
+                value if isinstance(value, date) else date.fromisoformat(value)
+                for value in session.scalars(
+                    select(month)
+                    .where(table.c.date < datetime.combine(cutoff, datetime.min.time()))
+                    .distinct()
+                )
+            )
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        archived = 0
+        for month in sorted(months):
+            archived += self._archive_month(session, month)
+        if months:
+            logger.info(
+                "Archived %d transactions of %d months before %s to %s",
+                archived,
+                len(months),
+                cutoff,
+                self.directory,
+            )
+        return archived
+
+    def _archive_month(self, session, month: date) -> int:
+        start = datetime.combine(month, datetime.min.time())
+        end = datetime.combine(add_months(month, 1), datetime.min.time())
+        counts = {}
+        try:
+            for table in _TABLES:
+                rows = session.execute(
+                    select(table).where(table.c.date >= start, table.c.date < end)
+                ).mappings()
+                counts[table.name] = self._write(table, month, rows)
+            session.execute(
+                update(CreditLedgerEntry)
+                .where(
+                    CreditLedgerEntry.checkout_id.in_(
+                        select(Checkout.id).where(Checkout.date >= start, Checkout.date < end)
+                    )
+                )
+                .values(checkout_id=None)
+                .execution_options(synchronize_session=False)
+            )
+            for table in _TABLES:
+                session.execute(delete(table).where(table.c.date >= start, table.c.date < end))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        logger.debug("Archived %s: %s", f"{month:%Y-%m}", counts)
+        return counts[Transaction.__tablename__]
+
+    def _write(self, table, month: date, rows: Iterable[Dict[str, Any]]) -> int:
+        """Write `rows` to the month file, merged with an existing file; returns len(rows)."""
+        path = self._path(table, month)
+        merged = {row["id"]: row for row in self._read(table, path)}
+        written = 0
+        for row in rows:
+            merged[row["id"]] = row
+            written += 1
+
+        columns = [column.name for column in table.columns]
+        temporary = path.with_name(path.name + ".tmp")
+        with open(temporary, "wb") as raw:
+            # Closing the text wrapper finishes the gzip stream but leaves `raw` open
+            with io.TextIOWrapper(
+                gzip.GzipFile(fileobj=raw, mode="wb"), encoding="utf-8", newline=""
+            ) as text:
+                writer = csv.writer(text)
+                writer.writerow(columns)
+                for row_id in sorted(merged):
+                    writer.writerow([_format(merged[row_id][name]) for name in columns])
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(temporary, path)
+        return written
+
+    @staticmethod
+    def _read(table, path: Path) -> List[Dict[str, Any]]:
+        if not path.exists():
+            return []
+        columns = {column.name: column for column in table.columns}
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as compressed:
+            return [
+                {name: _parse(columns[name], value) for name, value in row.items()}
+                for row in csv.DictReader(compressed)
+            ]
+
+    def read_transactions(
+        self,
+        session,
+        user_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[TransactionRecord]:
+        """Transactions in `[since, until)`, optionally of one user, from database and archive.
+
+        Only the archive files of months in the range are read. Ordered by date.
+        """
+        table = Transaction.__table__
+        statement = select(table)
+        if user_id is not None:
+            statement = statement.where(table.c.user_id == user_id)
+        if since is not None:
+            statement = statement.where(table.c.date >= since)
+        if until is not None:
+            statement = statement.where(table.c.date < until)
+        records = [TransactionRecord(**row) for row in session.execute(statement).mappings()]
+
+        for month in self.archived_months():
+            if since is not None and add_months(month, 1) <= month_start(since):
+                continue
+            if until is not None and datetime.combine(month, datetime.min.time()) >= until:
+                continue
+            records.extend(
+                TransactionRecord(**row)
+                for row in self._read(table, self._path(table, month))
+                if (user_id is None or row["user_id"] == user_id)
+                and (since is None or row["date"] >= since)
+                and (until is None or row["date"] < until)
+            )
+        return sorted(records, key=lambda record: (record.date, record.id))
+
+
+def run_archiving() -> None:
+    """Scheduled job: archive the months beyond the horizon."""
+    # pylint: disable=import-outside-toplevel
+    from src.database.connection import session_scope
+
+    try:
+        with session_scope() as session:
+            transaction_archive.archive(session)
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception("Archiving transactions failed")
+
+
+def initialize_archiving() -> None:
+    """Archive monthly on a background scheduler if a horizon is configured.
+
+    The scheduler is owned by the application context and shut down with it.
+    """
+    horizon = int(transaction_archive.settings["horizon_months"])
+    if horizon <= 0:
+        logger.info("Transaction archiving is disabled in configuration")
+        return
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(run_archiving, CronTrigger(day=1, hour=3, minute=30))
+    scheduler.start()
+    get_app_context()._scheduler_archive = scheduler
+    logger.info("Transactions older than %d months are archived monthly", horizon)
+
+
+# Process-wide archive instance
+transaction_archive = TransactionArchive()
+
+
+def main() -> None:
+    """Archive the configured database once."""
+    # pylint: disable=import-outside-toplevel
+    from src.database.connection import initialize_database, session_scope
+    from src.utils.config import config
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--horizon-months", type=int, help="override the configured horizon")
+    args = parser.parse_args()
+
+    initialize_database(config.get_all())
+    if args.horizon_months is not None:
+        transaction_archive.settings["horizon_months"] = args.horizon_months
+    with session_scope() as session:
+        transaction_archive.archive(session)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Change feed of the model layer.
+
+The admin listings re-queried their whole table whenever they were shown
+again, e.g. after one item was edited. The feed reports which rows of a table
+were created, updated or deleted by the transactions this process committed,
+so a listing can re-read just those rows:
+
+- ORM changes (`create`, `update` and `delete` of the CRUD mixin, or any
+  other flushed instance) are collected by session events,
+- statements that bypass the ORM (the conditional stock and credit updates of
+  the checkout and the credit ledger) report their rows with `note`.
+
+Changes are kept with the session and handed to the subscriptions of the
+table when it commits; a rollback drops them. A subscription collects them
+until its owner drains it, from any thread. Changes made by other kiosks on a
+shared PostgreSQL database are not seen.
+
+The feed may over-report, e.g. a row changed in a savepoint that was rolled
+back, so subscribers re-read the reported rows instead of trusting the kind.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+from sqlalchemy import event, inspect
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+# More changes than this are cheaper to handle with one full re-query
+MAX_PATCH_ROWS = 200
+
+_INFO_KEY = "change_feed"
+
+Changes = Dict[int, str]
+
+
+def _merge(changes: Changes, row_id: int, kind: str) -> None:
+    # A row created and then updated is still new to the subscriber
+    if not (kind == UPDATED and changes.get(row_id) == CREATED):
+        changes[row_id] = kind
+
+
+class ChangeSubscription:
+    """Collects the committed changes of one table until they are drained."""
+
+    def __init__(self, table: str) -> None:
+        self.table = table
+        self._lock = threading.Lock()
+        self._changes: Changes = {}
+
+    def add(self, changes: Changes) -> None:
+        """Merge committed changes (row id -> kind)."""
+        with self._lock:
+            for row_id, kind in changes.items():
+                _merge(self._changes, row_id, kind)
+
+    def drain(self) -> Changes:
+        """Return and forget the changes collected since the last drain."""
+        with self._lock:
+            changes, self._changes = self._changes, {}
+        return changes
+
+
+class ChangeFeed:
+    """Publishes the committed row changes of the sessions it is installed on."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscriptions: List[ChangeSubscription] = []
+
+    def install(self, session_factory) -> None:
+        """Register the session events on a `sessionmaker`."""
+        event.listen(session_factory, "after_flush", self._after_flush)
+        event.listen(session_factory, "after_commit", self._after_commit)
+        event.listen(session_factory, "after_transaction_end", self._after_transaction_end)
+
+    def subscribe(self, model) -> ChangeSubscription:
+        """Collect the changes of `model`'s table from now on."""
+        subscription = ChangeSubscription(model.__tablename__)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ChangeSubscription) -> None:
+        """Stop collecting changes for `subscription`."""
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def note(self, session, model, row_ids: Iterable[int], kind: str = UPDATED) -> None:
+        """Report rows changed by a statement that bypassed the ORM; published on commit."""
+        changes = session.info.setdefault(_INFO_KEY, {}).setdefault(model.__tablename__, {})
+        for row_id in row_ids:
+            _merge(changes, row_id, kind)
+
+    def _after_flush(self, session, _flush_context) -> None:
+        pending = session.info.setdefault(_INFO_KEY, {})
+        for kind, instances in (
+            (CREATED, session.new),
+            (UPDATED, session.dirty),
+            (DELETED, session.deleted),
+        ):
+            for instance in instances:
+                if kind == UPDATED and not session.is_modified(instance):
+                    continue
+                table = getattr(instance, "__tablename__", None)
+                state = inspect(instance)
+                # New instances get their identity key only after this event
+                identity = state.identity or state.mapper.primary_key_from_instance(instance)
+                if table is None or not identity or identity[0] is None:
+                    continue
+                _merge(pending.setdefault(table, {}), identity[0], kind)
+
+    def _after_commit(self, session) -> None:
+        pending = session.info.pop(_INFO_KEY, None)
+        if not pending:
+            return
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            changes = pending.get(subscription.table)
+            if changes:
+                subscription.add(changes)
+
+    @staticmethod
+    def _after_transaction_end(session, transaction) -> None:
+        if transaction.parent is None:
+            # Whatever was not published by the commit was rolled back
+            session.info.pop(_INFO_KEY, None)
+
+
+def patch_rows(
+    rows: Sequence[Any],
+    changes: Changes,
+    fresh_rows: Sequence[Any],
+    key: Callable[[Any], int] = lambda row: row.id,
+) -> List[Any]:
+    """Apply `changes` to `rows` ordered by id, given the re-read rows of the changed ids.
+
+    Changed rows are replaced by their fresh version or dropped if they are
+    gone; new rows are inserted in id order. Only the changed positions are
+    looked up (binary search), so the cost hardly grows with the listing.
+    """
+    fresh = {key(row): row for row in fresh_rows}
+    patched = list(rows)
+    for row_id in changes:
+        index = bisect_left(patched, row_id, key=key)
+        present = index < len(patched) and key(patched[index]) == row_id
+        if row_id in fresh:
+            if present:
+                patched[index] = fresh[row_id]
+            else:
+                patched.insert(index, fresh[row_id])
+        elif present:
+            del patched[index]
+    return patched
+
+
+# Process-wide change feed instance
+change_feed = ChangeFeed()
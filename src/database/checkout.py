@@ -0,0 +1,317 @@
+"""Set-based checkout.
+
+A checkout used to lock and update every cart line with its own statements,
+insert one transaction row at a time and re-read every item after the commit.
+`perform_checkout` does the same work in a fixed number of statements inside
+one database transaction, independent of the number of cart lines:
+
+1. one conditional `UPDATE items ... WHERE quantity >= <requested> RETURNING`
+   that decrements the stock of all cart items,
+2. one `INSERT` of the checkout (receipt) row and one bulk `INSERT` of its
+   lines into `transactions`, with quantity, unit price and item name (plus
+   one upsert into the monthly purchase rollup, see `src.database.rollup`),
+3. one conditional `UPDATE users ... WHERE credit >= <total> RETURNING` that
+   debits the credit, and one `INSERT` of the debit into the credit ledger
+   (see `src.database.credit_ledger`).
+
+The conditions make the updates safe against concurrent kiosks without an
+explicit `SELECT ... FOR UPDATE`: the row locks are taken by the updates, and
+a row that no longer satisfies the condition is simply not returned, in which
+case the whole checkout is rolled back.
+
+No lock is held between statements of Python code, so the only way two
+kiosks can get in each other's way is the database giving up on one of them:
+a PostgreSQL deadlock (two carts updating the same items in a different
+order) or serialization failure, or SQLite's write lock staying busy beyond
+`busy_timeout`. The transaction is then rolled back as a whole and retried
+after a short, jittered pause, up to `MAX_ATTEMPTS` times.
+`python -m src.benchmarks.contention` measures this with several
+kiosk processes buying the same item.
+
+If the connection is lost while the commit is in flight, the checkout may or
+may not have been committed: `CheckoutOutcomeUnknown` is raised instead of the
+connection error. A checkout can carry the `client_key` the kiosk generated
+for it, so the offline journal can replay it at most once (`find_checkout`).
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import sqlalchemy.exc
+from sqlalchemy import case, insert, select, update
+
+from src.database.change_feed import change_feed
+from src.database.credit_ledger import CHECKOUT, record_entry
+from src.database.models.checkout import Checkout
+from src.database.models.item import Item
+from src.database.models.transaction import Transaction
+from src.database.models.user import User
+from src.database.rollup import record_purchases
+from src.logmgr import logger
+
+
+class CheckoutError(ValueError):
+    """Raised when a checkout cannot be completed; nothing has been written."""
+
+
+class InsufficientStockError(CheckoutError):
+    """Raised when an item does not (or no longer) have the requested stock."""
+
+    def __init__(self, item_id: int, requested: int):
+        super().__init__(f"Insufficient stock for item {item_id}. Requested: {requested}")
+        self.item_id = item_id
+        self.requested = requested
+
+
+class InsufficientCreditError(CheckoutError):
+    """Raised when the user's credit does not cover the checkout total."""
+
+
+class CheckoutOutcomeUnknown(Exception):
+    """Raised when the connection was lost during the commit of a checkout.
+
+    The checkout may have been committed or not; `client_key` tells which
+    once the server is reachable again.
+    """
+
+    def __init__(self, client_key: Optional[str]):
+        super().__init__(f"Connection lost while committing checkout {client_key}")
+        self.client_key = client_key
+
+
+# Attempts of a checkout whose transaction the database aborted due to contention
+MAX_ATTEMPTS = 4
+# Base pause before a retry; grows with every attempt and is jittered
+RETRY_BACKOFF_S = 0.02
+
+# PostgreSQL SQLSTATEs that only mean "try again": serialization_failure, deadlock_detected
+_RETRYABLE_PGCODES = frozenset({"40001", "40P01"})
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether `error` aborted the transaction due to contention with another kiosk."""
+    if not isinstance(error, sqlalchemy.exc.OperationalError):
+        return False
+    pgcode = getattr(error.orig, "pgcode", None)
+    if pgcode:
+        return pgcode in _RETRYABLE_PGCODES
+    # SQLite: another connection kept the write lock beyond busy_timeout
+    return "database is locked" in str(error.orig)
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """Whether `error` means the database server could not be reached.
+
+    Errors the server reported itself (they carry a SQLSTATE, e.g. a
+    serialization failure) do not count.
+    """
+    if isinstance(error, (sqlalchemy.exc.DisconnectionError, sqlalchemy.exc.TimeoutError)):
+        return True
+    if isinstance(error, sqlalchemy.exc.DBAPIError):
+        if error.connection_invalidated:
+            return True
+        return isinstance(
+            error, (sqlalchemy.exc.OperationalError, sqlalchemy.exc.InterfaceError)
+        ) and not getattr(error.orig, "pgcode", None)
+    return False
+
+
+@dataclass(frozen=True)
+class CheckoutResult:
+    """Outcome of a committed checkout."""
+
+    # Credit of the user after the debit
+    credit: float
+    checkout_id: int
+    # Updated item rows (all item columns), usable wherever an item is only read
+    items: List[Any]
+    total: float
+    # Transactions it took; more than one if the database aborted it due to contention
+    attempts: int = 1
+
+
+def perform_checkout(
+    session,
+    user_id: int,
+    lines: Sequence[Tuple[int, int]],
+    date: Optional[datetime] = None,
+    client_key: Optional[str] = None,
+) -> CheckoutResult:
+    """Check out `(item_id, quantity)` lines for a user and commit.
+
+    Lines with a non-positive quantity are ignored, repeated items are merged.
+    Costs are computed from the item prices in the database. Raises a
+    `CheckoutError` (after rolling back) if stock or credit are insufficient.
+    A transaction aborted due to contention is retried (see `is_retryable`).
+    `client_key` is stored with the checkout; a connection lost during the
+    commit raises `CheckoutOutcomeUnknown`.
+    """
+    quantities = _merge_lines(lines)
+    if not quantities:
+        raise CheckoutError("Nothing to check out")
+    date = date or datetime.now()
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            checkout_id, credit, items, total = _checkout_once(
+                session, user_id, quantities, date, client_key
+            )
+            break
+        except sqlalchemy.exc.OperationalError as ex:
+            if attempt == MAX_ATTEMPTS or not is_retryable(ex):
+                raise
+            logger.info(
+                "Checkout of user %s aborted by the database (attempt %d), retrying: %s",
+                user_id,
+                attempt,
+                ex.orig,
+            )
+            time.sleep(RETRY_BACKOFF_S * attempt * random.uniform(0.5, 1.5))
+
+    logger.info(
+        "Checkout committed | user_id=%s lines=%d total=%.2f", user_id, len(quantities), total
+    )
+    return CheckoutResult(
+        credit=credit, checkout_id=checkout_id, items=items, total=total, attempts=attempt
+    )
+
+
+def find_checkout(session, client_key: str) -> Optional[int]:
+    """Id of the checkout committed with `client_key`, or None."""
+    return session.execute(
+        select(Checkout.id).where(Checkout.client_key == client_key)
+    ).scalar_one_or_none()
+
+
+def _checkout_once(
+    session,
+    user_id: int,
+    quantities: Dict[int, int],
+    date: datetime,
+    client_key: Optional[str],
+) -> Tuple[int, float, List[Any], float]:
+    """Run the checkout statements in one transaction and commit; rolls back on error."""
+    try:
+        items = _decrement_stock(session, quantities)
+        costs = {item.id: float(item.price) * quantities[item.id] for item in items}
+        total = sum(costs.values())
+
+        checkout_id = session.execute(
+            insert(Checkout)
+            .values(user_id=user_id, date=date, total=total, client_key=client_key)
+            .returning(Checkout.id)
+        ).scalar_one()
+        session.execute(
+            insert(Transaction),
+            [
+                {
+                    "checkout_id": checkout_id,
+                    "user_id": user_id,
+                    "item_id": item.id,
+                    "date": date,
+                    "cost": costs[item.id],
+                    "category": item.category,
+                    "quantity": quantities[item.id],
+                    "unit_price": float(item.price),
+                    "item_name": item.name,
+                }
+                for item in items
+            ],
+        )
+
+        record_purchases(
+            session,
+            user_id,
+            date,
+            [
+                (item.category, item.id, item.name, quantities[item.id], costs[item.id])
+                for item in items
+            ],
+        )
+
+        credit = _debit_credit(session, user_id, total)
+        # Booked now, not at `date`: a replayed offline checkout must not land
+        # before a credit snapshot that was already taken
+        record_entry(session, user_id, -total, CHECKOUT, checkout_id=checkout_id)
+        try:
+            session.commit()
+        except sqlalchemy.exc.SQLAlchemyError as ex:
+            if is_connection_error(ex):
+                raise CheckoutOutcomeUnknown(client_key) from ex
+            raise
+    except Exception:
+        session.rollback()
+        raise
+    return checkout_id, credit, items, total
+
+
+def _merge_lines(lines: Sequence[Tuple[int, int]]) -> Dict[int, int]:
+    quantities: Dict[int, int] = {}
+    for item_id, quantity in lines:
+        if quantity > 0:
+            quantities[item_id] = quantities.get(item_id, 0) + int(quantity)
+    return quantities
+
+
+def prime_statements(session) -> None:
+    """Execute the stock and credit updates once without matching a row.
+
+    Used by the database warm-up, so their compiled form is cached before the
+    first checkout; the caller rolls back.
+    """
+    session.execute(_stock_statement({0: 0}))
+    session.execute(_debit_statement(0, 0.0))
+
+
+def _stock_statement(quantities: Dict[int, int]):
+    requested = case(quantities, value=Item.id)
+    return (
+        update(Item)
+        .where(Item.id.in_(quantities), Item.quantity >= requested)
+        .values(quantity=Item.quantity - requested)
+        .returning(
+            Item.id,
+            Item.name,
+            Item.category,
+            Item.price,
+            Item.barcode,
+            Item.quantity,
+            Item.image_hash,
+        )
+        # The commit expires loaded instances; no need to evaluate the CASE in Python
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _decrement_stock(session, quantities: Dict[int, int]) -> List[Any]:
+    """Decrement all items in one statement; fail if any row lacks stock."""
+    items = sorted(session.execute(_stock_statement(quantities)).all(), key=lambda item: item.id)
+
+    if len(items) != len(quantities):
+        updated = {item.id for item in items}
+        item_id = next(item_id for item_id in quantities if item_id not in updated)
+        raise InsufficientStockError(item_id, quantities[item_id])
+    change_feed.note(session, Item, quantities)
+    return items
+
+
+def _debit_statement(user_id: int, total: float):
+    return (
+        update(User)
+        .where(User.id == user_id, User.credit >= total)
+        .values(credit=User.credit - total)
+        .returning(User.credit)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _debit_credit(session, user_id: int, total: float) -> float:
+    """Debit the user in one statement; fail if the credit does not cover the total."""
+    credit = session.execute(_debit_statement(user_id, total)).scalar_one_or_none()
+    if credit is None:
+        raise InsufficientCreditError(f"Insufficient credit for user {user_id}")
+    change_feed.note(session, User, [user_id])
+    return float(credit)
@@ -1,19 +1,34 @@
 """Database connection helpers.
 
-The application initializes the database once at startup and then provides
-SQLAlchemy sessions via a singleton `SessionManager`.
+The application initializes the database once at startup. Database work runs
+in short units of work:
+
+    with session_scope() as session:
+        ...
+
+The session of a scope is thread-local (a `scoped_session` registry), is
+committed when the block completes, rolled back on an exception and closed
+afterwards. Nested scopes on the same thread join the outer unit of work, so
+helpers can open a scope without knowing whether their caller already did.
+Instances loaded in a scope are expired on commit and detached on close; keep
+plain values (or snapshots such as `CachedUser`) beyond the block.
 
 To keep side effects contained, the module stores runtime state in a single
 state object instead of multiple module-level globals.
 """
 
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 import sqlalchemy.exc
+from alembic.util.exc import CommandError
 from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session, scoped_session, sessionmaker
 
+from src.database import postgres_tuning, sqlite_tuning
+from src.database.change_feed import change_feed
+from src.database.instrumentation import operation, query_instrumentation
 from src.logmgr import logger
 
 
@@ -26,6 +41,7 @@ class _DatabaseState:
     config: Optional[dict[str, Any]] = None
     engine: Any = None
     session_local: Any = None
+    scoped: Any = None
 
 
 _STATE = _DatabaseState()
@@ -60,7 +76,7 @@ def get_engine_kwargs(db_config):
     if db_type == "sqlite":
         return {"connect_args": {"check_same_thread": False}}
     if db_type == "postgresql":
-        return {"pool_pre_ping": True, "pool_recycle": 300}
+        return postgres_tuning.get_engine_kwargs(db_config.get("postgresql", {}))
     return {}
 
 
@@ -75,6 +91,11 @@ def initialize_database(app_config):
     try:
         _STATE.engine = create_engine(database_url, **engine_kwargs)
         db_type = db_config.get("type", "sqlite").upper()
+        if db_type == "SQLITE":
+            sqlite_tuning.install(_STATE.engine, db_config.get("sqlite", {}))
+        elif db_type == "POSTGRESQL":
+            postgres_tuning.install(_STATE.engine, db_config.get("postgresql", {}))
+        query_instrumentation.install(_STATE.engine, db_config.get("instrumentation", {}))
         logger.info("Successfully created database connection: %s -> %s", db_type, database_url)
 
         with _STATE.engine.connect():
@@ -89,75 +110,125 @@ def initialize_database(app_config):
         raise
 
     try:
-        _STATE.session_local = sessionmaker(autocommit=False, autoflush=False, bind=_STATE.engine)
+        _STATE.session_local = sessionmaker(
+            autocommit=False, autoflush=False, expire_on_commit=True, bind=_STATE.engine
+        )
+        _STATE.scoped = scoped_session(_STATE.session_local)
+        change_feed.install(_STATE.session_local)
 
         # Import models after engine is successfully created
+        from .archive import transaction_archive
+        from .models.checkout import Checkout
+        from .models.credit_ledger import CreditLedgerEntry, CreditSnapshot
         from .models.item import Item
+        from .models.item_image import ItemImage
+        from .models.purchase_rollup import PurchaseRollup
         from .models.transaction import Transaction
         from .models.user import User
-
-        _ = [User, Item, Transaction]
-
-        Base.metadata.create_all(bind=_STATE.engine)
-        logger.info("Successfully created all tables")
+        from .schema import ensure_schema
+
+        _ = [
+            User,
+            Item,
+            ItemImage,
+            Checkout,
+            Transaction,
+            PurchaseRollup,
+            CreditLedgerEntry,
+            CreditSnapshot,
+        ]
+
+        ensure_schema(_STATE.engine, Base.metadata)
+        transaction_archive.configure(db_config.get("archive", {}))
+
+        if db_type == "POSTGRESQL":
+            postgres_tuning.warm_up(
+                _STATE.engine,
+                _STATE.session_local,
+                postgres_tuning.get_pool_settings(db_config.get("postgresql", {}))[
+                    "warm_up_connections"
+                ],
+                _prime_hot_queries,
+            )
 
     except sqlalchemy.exc.SQLAlchemyError as ex:
         logger.error("Cannot bind DB engine to session", error=f"DB connection failed: {ex!s}")
         raise
+    except (CommandError, RuntimeError) as ex:
+        logger.error("Database schema migration failed", error=f"{ex!s}")
+        raise
     except (ImportError, OSError) as ex:
         logger.error("Error during table creation", error=f"General error: {ex!s}")
         raise
 
 
-class SessionManager:
-    """Singleton class to manage database sessions."""
+@operation("warm_up")
+def _prime_hot_queries(session) -> None:
+    """Run the queries of login, barcode lookup and checkout once, without effect."""
+    # pylint: disable=import-outside-toplevel
+    from .checkout import prime_statements
+    from .models.item import Item
+    from .models.user import User
 
-    _instance = None
+    User.get_by_nfcid(session, "")
+    Item.get_by_barcode(session, "")
+    prime_statements(session)
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(SessionManager, cls).__new__(cls)
-            cls._instance.session = None
-        return cls._instance
 
-    def start_session(self):
-        """Start a new database session if not already started."""
-        if self.session is None:
-            if _STATE.session_local is None:
-                raise RuntimeError("Database not initialized. Call initialize_database() first.")
-            self.session = _STATE.session_local()
-            logger.info("Database session started")
+def _require_initialized() -> None:
+    if _STATE.session_local is None:
+        raise RuntimeError("Database not initialized. Call initialize_database() first.")
 
-    def get_session(self):
-        """Get the current database session."""
-        if self.session is None:
-            self.start_session()
-        return self.session
 
-    def close_session(self):
-        """Close the current database session."""
-        if self.session is not None:
-            logger.info("Closing database session")
-            try:
-                self.session.close()
-                logger.info("Database session closed")
-            except sqlalchemy.exc.SQLAlchemyError:
-                logger.exception("Error closing database session")
-            finally:
-                self.session = None
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """Provide the session of the current thread's unit of work.
 
+    The outermost scope commits on success, rolls back on an exception and
+    removes (closes) the session; nested scopes reuse it and leave both to the
+    outermost one.
+    """
+    _require_initialized()
+    if _STATE.scoped.registry.has():
+        yield _STATE.scoped()
+        return
 
-# Use the singleton instance of SessionManager
-session_manager = SessionManager()
+    session = _STATE.scoped()
+    try:
+        yield session
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        _STATE.scoped.remove()
 
 
-def get_db():
-    """Returns the central db session"""
-    return session_manager.get_session()
+def start_database_maintenance() -> None:
+    """Schedule the periodic database jobs.
+
+    Archiving of old transactions, credit snapshots, plus SQLite maintenance or
+    PostgreSQL pool metrics.
+    """
+    # pylint: disable=import-outside-toplevel
+    from .archive import initialize_archiving
+    from .credit_ledger import initialize_snapshots
+
+    _require_initialized()
+    initialize_archiving()
+    initialize_snapshots()
+    db_config = _STATE.config.get("database", {})
+    if db_config.get("type", "sqlite").lower() == "postgresql":
+        settings = postgres_tuning.get_pool_settings(db_config.get("postgresql", {}))
+        postgres_tuning.initialize_metrics(_STATE.engine, settings["metrics_interval_minutes"])
+        return
+    interval = db_config.get("sqlite", {}).get(
+        "maintenance_interval_minutes", sqlite_tuning.DEFAULT_MAINTENANCE_INTERVAL_MINUTES
+    )
+    sqlite_tuning.initialize_maintenance(_STATE.engine, interval)
 
 
 def get_new_session():
-    """Returns a new database session. Caller must close it."""
-    if _STATE.session_local is None:
-        raise RuntimeError("Database not initialized. Call initialize_database() first.")
+    """Returns a new database session outside of any scope. Caller must close it."""
+    _require_initialized()
     return _STATE.session_local()
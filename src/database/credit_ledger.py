@@ -0,0 +1,217 @@
+"""Credit ledger.
+
+`users.credit` used to be overwritten by the checkout and by admin edits, so
+top-ups left no trace and the balance at an earlier time could not be told.
+Every change of a user's credit now appends an entry to `credit_ledger` in
+the same database transaction that changes `users.credit`, which stays the
+cached current balance:
+
+- `opening`: the credit of a new user (or of every user when the ledger was
+  introduced),
+- `checkout`: the debit of a checkout, written by `perform_checkout`,
+- `top_up` / `correction`: admin changes, positive or negative.
+
+A daily job stores the balance of every user whose credit changed as a
+snapshot in `credit_snapshots`, so `balance_at` only sums the entries since
+the latest snapshot before the requested time.
+"""
+
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+
+from src.app_context import get_app_context
+from src.database.change_feed import change_feed
+from src.database.models.credit_ledger import CreditLedgerEntry, CreditSnapshot
+from src.database.models.user import User
+from src.logmgr import logger
+
+OPENING = "opening"
+CHECKOUT = "checkout"
+TOP_UP = "top_up"
+CORRECTION = "correction"
+
+# Changes below this are rounding noise of the float column
+_EPSILON = 1e-9
+
+
+def record_entry(  # pylint: disable=too-many-arguments
+    session,
+    user_id: int,
+    amount: float,
+    kind: str,
+    *,
+    date: Optional[datetime] = None,
+    checkout_id: Optional[int] = None,
+) -> None:
+    """Append a ledger entry in the caller's transaction; `users.credit` is not touched."""
+    session.execute(
+        insert(CreditLedgerEntry).values(
+            user_id=user_id,
+            date=date or datetime.now(),
+            amount=amount,
+            kind=kind,
+            checkout_id=checkout_id,
+        )
+    )
+
+
+def adjust_credit(
+    session, user_id: int, amount: float, kind: str, date: Optional[datetime] = None
+) -> float:
+    """Add `amount` to the credit of a user and record it; returns the new credit.
+
+    Relative, so a concurrent checkout on another kiosk is not overwritten.
+    Does not commit.
+    """
+    credit = session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(credit=User.credit + amount)
+        .returning(User.credit)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    if credit is None:
+        raise ValueError(f"User {user_id} not found")
+    change_feed.note(session, User, [user_id])
+    record_entry(session, user_id, amount, kind, date=date)
+    return float(credit)
+
+
+def set_credit(session, user_id: int, seen: float, target: float) -> float:
+    """Apply an admin edit of the credit from `seen` to `target`; returns the new credit.
+
+    The difference is booked as top-up or correction. If the credit changed in
+    the meantime (e.g. a checkout), that change is kept. Does not commit.
+    """
+    amount = float(target) - float(seen)
+    if abs(amount) < _EPSILON:
+        return float(session.scalar(select(User.credit).where(User.id == user_id)))
+    credit = adjust_credit(session, user_id, amount, TOP_UP if amount > 0 else CORRECTION)
+    if abs(credit - float(target)) >= _EPSILON:
+        logger.info(
+            "Credit of user %s changed while it was edited: %.2f instead of %.2f",
+            user_id,
+            credit,
+            target,
+        )
+    return credit
+
+
+def delete_entries(session, user_id: int) -> None:
+    """Delete the ledger entries and snapshots of a user that is being deleted.
+
+    The foreign keys cascade the user delete, but SQLite only enforces them
+    when asked to, which the kiosk does not. Does not commit.
+    """
+    session.execute(delete(CreditLedgerEntry).where(CreditLedgerEntry.user_id == user_id))
+    session.execute(delete(CreditSnapshot).where(CreditSnapshot.user_id == user_id))
+
+
+def _latest_snapshots(before: datetime):
+    """Subquery: the latest snapshot per user with `as_of <= before`."""
+    latest = (
+        select(CreditSnapshot.user_id, func.max(CreditSnapshot.as_of).label("as_of"))
+        .where(CreditSnapshot.as_of <= before)
+        .group_by(CreditSnapshot.user_id)
+        .subquery()
+    )
+    return (
+        select(CreditSnapshot.user_id, CreditSnapshot.as_of, CreditSnapshot.balance)
+        .join(
+            latest,
+            and_(
+                CreditSnapshot.user_id == latest.c.user_id, CreditSnapshot.as_of == latest.c.as_of
+            ),
+        )
+        .subquery()
+    )
+
+
+def balance_at(session, user_id: int, at: datetime) -> float:
+    """Credit of a user at time `at`: latest snapshot plus the entries since."""
+    snapshot = session.execute(
+        select(CreditSnapshot.as_of, CreditSnapshot.balance)
+        .where(CreditSnapshot.user_id == user_id, CreditSnapshot.as_of <= at)
+        .order_by(CreditSnapshot.as_of.desc())
+        .limit(1)
+    ).first()
+    entries = select(func.coalesce(func.sum(CreditLedgerEntry.amount), 0.0)).where(
+        CreditLedgerEntry.user_id == user_id, CreditLedgerEntry.date <= at
+    )
+    if snapshot is None:
+        return float(session.scalar(entries))
+    return snapshot.balance + float(
+        session.scalar(entries.where(CreditLedgerEntry.date >= snapshot.as_of))
+    )
+
+
+def take_snapshots(session, as_of: datetime) -> int:
+    """Snapshot the balance before `as_of` of every user with entries since their last snapshot.
+
+    Commits; returns the number of snapshots written.
+    """
+    previous = _latest_snapshots(as_of)
+    changes = (
+        select(
+            CreditLedgerEntry.user_id,
+            func.sum(CreditLedgerEntry.amount).label("amount"),
+            func.max(previous.c.balance).label("balance"),
+        )
+        .outerjoin(previous, previous.c.user_id == CreditLedgerEntry.user_id)
+        .where(
+            CreditLedgerEntry.date < as_of,
+            or_(previous.c.as_of.is_(None), CreditLedgerEntry.date >= previous.c.as_of),
+        )
+        .group_by(CreditLedgerEntry.user_id)
+    )
+    rows = [
+        {"user_id": row.user_id, "as_of": as_of, "balance": (row.balance or 0.0) + row.amount}
+        # Users already snapshotted at `as_of` have no entries in the window
+        for row in session.execute(changes)
+    ]
+    try:
+        if rows:
+            session.execute(insert(CreditSnapshot), rows)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    logger.info("Credit snapshots as of %s written for %d users", as_of, len(rows))
+    return len(rows)
+
+
+def run_snapshots() -> None:
+    """Scheduled job: snapshot the balances as of today's midnight.
+
+    Idempotent, so it also runs shortly after startup to catch up on a missed night.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.database.connection import session_scope
+
+    as_of = datetime.combine(datetime.now().date(), time.min)
+    try:
+        with session_scope() as session:
+            take_snapshots(session, as_of)
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception("Writing credit snapshots failed")
+
+
+def initialize_snapshots() -> None:
+    """Write the credit snapshots daily on a background scheduler.
+
+    The scheduler is owned by the application context and shut down with it.
+    """
+    scheduler = BackgroundScheduler()
+    # Shortly after midnight, so no checkout dated before it is still in flight
+    scheduler.add_job(
+        run_snapshots,
+        CronTrigger(hour=0, minute=15),
+        next_run_time=datetime.now() + timedelta(minutes=1),
+    )
+    scheduler.start()
+    get_app_context()._scheduler_ledger = scheduler
+    logger.info("Credit snapshots are written daily")
@@ -1,9 +1,14 @@
 """Shared CRUD mixin used by SQLAlchemy models."""
 
-from typing import List, Optional, Type, TypeVar
+from typing import Any, Iterator, List, Optional, Sequence, Type, TypeVar
+
+from sqlalchemy import select, tuple_
 
 T = TypeVar("T", bound="CRUDMixin")
 
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_BATCH_SIZE = 500
+
 
 class CRUDMixin:
     """Mixin that adds convenience methods for CRUD (Create, Read, Update, Delete) operations."""
@@ -39,3 +44,72 @@ class CRUDMixin:
     def get_by_id(cls: Type[T], session, item_id: int) -> Optional[T]:
         """Returns a record by its primary key ID."""
         return session.query(cls).filter(cls.id == item_id).first()
+
+    @classmethod
+    def page_after(  # pylint: disable=too-many-arguments
+        cls,
+        session,
+        last_id: Optional[int] = None,
+        *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        order_by: Optional[str] = None,
+        last_value: Any = None,
+        columns: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+    ) -> List[Any]:
+        """Returns the next page of records after a keyset position.
+
+        Pages are ordered by `order_by` (a column name) with the primary key as
+        tie breaker, or by the primary key alone. Pass the `id` (and the
+        `order_by` value as `last_value`) of the last row of the previous page
+        to get the following one; unlike OFFSET, the cost does not grow with
+        the page number.
+
+        With `columns` only those attributes are loaded and light-weight rows
+        are returned instead of ORM instances.
+        """
+        statement = cls._select(columns, order_by, where)
+        if last_id is not None:
+            if order_by is None:
+                statement = statement.where(cls.id > last_id)
+            else:
+                statement = statement.where(
+                    tuple_(getattr(cls, order_by), cls.id) > tuple_(last_value, last_id)
+                )
+        result = session.execute(statement.limit(limit))
+        return list(result.all() if columns else result.scalars().all())
+
+    @classmethod
+    def stream(
+        cls,
+        session,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        order_by: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+        where: Sequence[Any] = (),
+    ) -> Iterator[Any]:
+        """Iterates over all matching records, fetching `batch_size` rows at a time.
+
+        Uses `yield_per`, which makes drivers that support it (PostgreSQL) use a
+        server-side cursor, so the whole table is never held in memory at once.
+        The session must stay open while iterating.
+        """
+        statement = cls._select(columns, order_by, where).execution_options(yield_per=batch_size)
+        result = session.execute(statement)
+        yield from result if columns else result.scalars()
+
+    @classmethod
+    def _select(cls, columns: Optional[Sequence[str]], order_by: Optional[str], where):
+        """Builds the select for the read helpers: entity or column projection, ordered."""
+        if columns:
+            statement = select(*(getattr(cls, name) for name in columns))
+        else:
+            statement = select(cls)
+        for criterion in where:
+            statement = statement.where(criterion)
+        if order_by is not None:
+            statement = statement.order_by(getattr(cls, order_by), cls.id)
+        else:
+            statement = statement.order_by(cls.id)
+        return statement
@@ -0,0 +1,63 @@
+"""Background database executor.
+
+Queries used to run on the Tk thread through one shared session, so a
+slow database round trip froze the touchscreen. The executor runs database work
+on a small thread pool instead. Every task gets its own session, which is
+committed or rolled back by the task itself and always closed afterwards.
+
+Tasks receive the session as first argument and should return plain data
+(snapshots, rows, numbers) rather than ORM instances, because the session is
+closed once the task returns. Use `src.ui.background.run_in_background` to get
+the result back onto the Tk thread.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.database.connection import get_new_session
+from src.logmgr import logger
+
+DEFAULT_MAX_WORKERS = 2
+
+
+class DatabaseExecutor:
+    """Thread pool running database tasks, each with its own session."""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, task: Callable[..., Any], *args, **kwargs) -> Future:
+        """Run `task(session, *args, **kwargs)` on a worker and return its future."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="db-worker"
+                )
+            return self._pool.submit(self._run, task, *args, **kwargs)
+
+    @staticmethod
+    def _run(task: Callable[..., Any], *args, **kwargs) -> Any:
+        session = get_new_session()
+        try:
+            return task(session, *args, **kwargs)
+        except Exception:
+            logger.exception("Database task %s failed", getattr(task, "__name__", task))
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers; pending tasks are cancelled."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+            logger.info("Database executor shut down")
+
+
+# Process-wide executor instance
+db_executor = DatabaseExecutor()
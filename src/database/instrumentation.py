@@ -0,0 +1,236 @@
+"""Query instrumentation.
+
+Hooks `before_cursor_execute`/`after_cursor_execute` of the engine and keeps:
+
+- a latency histogram per statement,
+- query count and database time per *operation*, a name set with the
+  `operation` context manager (or decorator) around login, checkout, the
+  listings and the summary jobs,
+- a slow-query log: statements slower than `slow_query_ms` are logged with
+  their operation,
+- an opt-in N+1 detector: with `n_plus_one_threshold` set to K > 0, a
+  statement that runs more than K times within one operation is reported.
+
+The statistics are logged every `report_interval_minutes` and on shutdown.
+Everything is configured under `database.instrumentation` in `config.json`.
+
+The operation is stored in a context variable, so it follows the code into
+the database executor: tag the task itself, not the code that submits it.
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+
+from src.logmgr import logger
+
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "enabled": True,
+    "slow_query_ms": 200,
+    "n_plus_one_threshold": 0,
+    "report_interval_minutes": 60,
+}
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Distinct statements tracked; further ones are counted as OTHER_STATEMENT
+MAX_STATEMENTS = 500
+OTHER_STATEMENT = "<other>"
+
+NO_OPERATION = "<untagged>"
+
+# Collapses expanded IN lists, "IN (?, ?, ?)" or "IN (%(id_1)s, %(id_2)s)", to one placeholder
+_PARAMETER_LIST = re.compile(
+    r"\bIN \((?:\s*(?:\?|%\(\w+\)s)\s*,)+\s*(?:\?|%\(\w+\)s)\s*\)", re.IGNORECASE
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Return the statement as a histogram key: single-line, IN lists collapsed."""
+    return _PARAMETER_LIST.sub("IN (?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+@dataclass
+class StatementStats:
+    """Latency histogram of one statement."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(HISTOGRAM_BOUNDS_MS) + 1))
+
+    def add(self, elapsed_ms: float) -> None:
+        """Record one execution."""
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for index, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bucket bound (ms) below which `fraction` of the executions fall."""
+        target = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= target and index < len(HISTOGRAM_BOUNDS_MS):
+                return float(HISTOGRAM_BOUNDS_MS[index])
+        return self.max_ms
+
+
+@dataclass
+class OperationStats:
+    """Query count and database time of one operation name."""
+
+    runs: int = 0
+    queries: int = 0
+    total_ms: float = 0.0
+    max_queries: int = 0
+
+
+@dataclass
+class _Operation:
+    name: str
+    queries: int = 0
+    total_ms: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    reported: set = field(default_factory=set)
+
+
+_current_operation: ContextVar[Optional[_Operation]] = ContextVar("current_operation", default=None)
+
+
+class QueryInstrumentation:
+    """Collects the statistics of all engines it is installed on."""
+
+    def __init__(self) -> None:
+        self.settings: Dict[str, Any] = dict(DEFAULT_SETTINGS)
+        self._lock = threading.Lock()
+        self._statements: Dict[str, StatementStats] = {}
+        self._operations: Dict[str, OperationStats] = {}
+        self._last_report = time.monotonic()
+
+    def install(self, engine, settings: Dict[str, Any]) -> None:
+        """Apply `settings` and register the cursor events on `engine` if enabled."""
+        self.settings = {**DEFAULT_SETTINGS, **settings}
+        if not self.settings["enabled"]:
+            logger.info("Query instrumentation is disabled in configuration")
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        logger.info(
+            "Query instrumentation enabled (slow query threshold %s ms, N+1 threshold %s)",
+            self.settings["slow_query_ms"],
+            self.settings["n_plus_one_threshold"] or "off",
+        )
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        """Attribute the queries run inside the block (on this thread/context) to `name`."""
+        current = _Operation(name)
+        token = _current_operation.set(current)
+        try:
+            yield
+        finally:
+            _current_operation.reset(token)
+            with self._lock:
+                stats = self._operations.setdefault(name, OperationStats())
+                stats.runs += 1
+                stats.queries += current.queries
+                stats.total_ms += current.total_ms
+                stats.max_queries = max(stats.max_queries, current.queries)
+
+    @staticmethod
+    def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, _cursor, statement, _parameters, _context, _executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+        key = normalize_statement(statement)
+        current = _current_operation.get()
+
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                if len(self._statements) >= MAX_STATEMENTS:
+                    key = OTHER_STATEMENT
+                stats = self._statements.setdefault(key, StatementStats())
+            stats.add(elapsed_ms)
+
+        if elapsed_ms >= self.settings["slow_query_ms"]:
+            logger.warning(
+                "Slow query (%.0f ms, operation %s): %s",
+                elapsed_ms,
+                current.name if current else NO_OPERATION,
+                key,
+            )
+
+        if current is not None:
+            current.queries += 1
+            current.total_ms += elapsed_ms
+            self._check_n_plus_one(current, key)
+
+        if time.monotonic() - self._last_report >= self.settings["report_interval_minutes"] * 60:
+            self.report()
+
+    def _check_n_plus_one(self, current: _Operation, key: str) -> None:
+        threshold = self.settings["n_plus_one_threshold"]
+        if not threshold:
+            return
+        current.statements[key] += 1
+        if current.statements[key] > threshold and key not in current.reported:
+            current.reported.add(key)
+            logger.warning(
+                "Possible N+1 query in operation %s: statement ran more than %d times: %s",
+                current.name,
+                threshold,
+                key,
+            )
+
+    def report(self, top: int = 10) -> None:
+        """Log the operations and the `top` statements by total time."""
+        with self._lock:
+            self._last_report = time.monotonic()
+            operations = sorted(self._operations.items())
+            statements = sorted(
+                self._statements.items(), key=lambda entry: entry[1].total_ms, reverse=True
+            )[:top]
+        for name, stats in operations:
+            logger.info(
+                "DB operation %s: %d runs, %.1f queries/run (max %d), %.1f ms db time/run",
+                name,
+                stats.runs,
+                stats.queries / stats.runs,
+                stats.max_queries,
+                stats.total_ms / stats.runs,
+            )
+        for key, stats in statements:
+            logger.info(
+                "DB statement: %d runs, total %.0f ms, p50 <= %.0f ms, p95 <= %.0f ms, "
+                "max %.1f ms: %s",
+                stats.count,
+                stats.total_ms,
+                stats.percentile(0.5),
+                stats.percentile(0.95),
+                stats.max_ms,
+                key,
+            )
+
+
+# Process-wide instrumentation instance
+query_instrumentation = QueryInstrumentation()
+
+# Shortcut for tagging: `with operation("checkout"):` or `@operation("checkout")`
+operation = query_instrumentation.operation
@@ -0,0 +1,143 @@
+"""In-process barcode catalog.
+
+Every barcode scan used to run a `SELECT` against the `items` table. The catalog
+keeps a detached snapshot of all items in memory so the scan-to-cart path can
+resolve a barcode without a database round trip.
+
+The catalog is warmed once at startup and kept coherent by the code paths that
+change items (create, update, delete and checkout).
+"""
+
+import threading
+from dataclasses import dataclass, fields, replace
+from typing import Dict, List, Optional
+
+from src.database.models.item import Item
+from src.logmgr import logger
+
+
+@dataclass(frozen=True)
+class CatalogItem:
+    """Read-only snapshot of an item row, usable wherever an `Item` is only read."""
+
+    id: int
+    name: str
+    category: str
+    price: float
+    barcode: str
+    quantity: int
+    image_hash: Optional[str] = None
+
+    @classmethod
+    def from_item(cls, item: Item) -> "CatalogItem":
+        """Create a snapshot from an ORM item."""
+        return cls(
+            id=item.id,
+            name=item.name,
+            category=item.category,
+            price=item.price,
+            barcode=item.barcode,
+            quantity=item.quantity,
+            image_hash=item.image_hash,
+        )
+
+
+class ItemCatalog:
+    """Thread-safe barcode -> item index with O(1) lookups."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_id: Dict[int, CatalogItem] = {}
+        self._by_barcode: Dict[str, int] = {}
+        self._loaded = False
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the catalog has been warmed from the database."""
+        return self._loaded
+
+    def load(self, session) -> None:
+        """(Re)build the catalog from all items in the database."""
+        columns = [field.name for field in fields(CatalogItem)]
+        entries = [CatalogItem.from_item(row) for row in Item.stream(session, columns=columns)]
+        with self._lock:
+            self._by_id = {entry.id: entry for entry in entries}
+            self._by_barcode = {entry.barcode: entry.id for entry in entries}
+            self._loaded = True
+        logger.info("Item catalog loaded with %d items", len(entries))
+
+    def get_by_barcode(self, barcode: str) -> Optional[CatalogItem]:
+        """Return the cached item for a barcode without touching the database."""
+        with self._lock:
+            item_id = self._by_barcode.get(barcode)
+            return self._by_id.get(item_id) if item_id is not None else None
+
+    def get_by_id(self, item_id: int) -> Optional[CatalogItem]:
+        """Return the cached item for a primary key."""
+        with self._lock:
+            return self._by_id.get(item_id)
+
+    def lookup(self, session, barcode: str) -> Optional[CatalogItem]:
+        """Resolve a barcode from the catalog, falling back to the database on a miss.
+
+        The fallback covers items created by another kiosk sharing the same
+        database; a hit is added to the catalog.
+        """
+        entry = self.get_by_barcode(barcode)
+        if entry is not None:
+            return entry
+
+        item = Item.get_by_barcode(session, barcode)
+        if item is None:
+            return None
+        logger.debug("Item catalog miss for barcode %s, loaded from database", barcode)
+        return self.upsert(item)
+
+    def refresh(self, session, item_id: int) -> Optional[CatalogItem]:
+        """Reload a single item from the database, e.g. after a checkout found its stock stale."""
+        item = Item.get_by_id(session, item_id)
+        if item is None:
+            self.remove(item_id)
+            return None
+        return self.upsert(item)
+
+    def all_items(self) -> List[CatalogItem]:
+        """Return all cached items ordered by id."""
+        with self._lock:
+            return [self._by_id[item_id] for item_id in sorted(self._by_id)]
+
+    def upsert(self, item: Item) -> CatalogItem:
+        """Insert or replace the snapshot of an item after it was created or changed."""
+        entry = CatalogItem.from_item(item)
+        with self._lock:
+            previous = self._by_id.get(entry.id)
+            if previous is not None and self._by_barcode.get(previous.barcode) == entry.id:
+                del self._by_barcode[previous.barcode]
+            self._by_id[entry.id] = entry
+            self._by_barcode[entry.barcode] = entry.id
+        return entry
+
+    def set_quantity(self, item_id: int, quantity: int) -> None:
+        """Update the cached stock of an item."""
+        with self._lock:
+            entry = self._by_id.get(item_id)
+            if entry is not None:
+                self._by_id[item_id] = replace(entry, quantity=quantity)
+
+    def remove(self, item_id: int) -> None:
+        """Drop an item from the catalog after it was deleted."""
+        with self._lock:
+            entry = self._by_id.pop(item_id, None)
+            if entry is not None and self._by_barcode.get(entry.barcode) == item_id:
+                del self._by_barcode[entry.barcode]
+
+    def clear(self) -> None:
+        """Forget all cached items."""
+        with self._lock:
+            self._by_id = {}
+            self._by_barcode = {}
+            self._loaded = False
+
+
+# Process-wide catalog instance
+item_catalog = ItemCatalog()
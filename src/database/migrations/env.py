@@ -0,0 +1,97 @@
+import sys
+from logging.config import fileConfig
+from pathlib import Path
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+# Import models
+from src.database.connection import Base, build_database_url  # noqa: E402
+from src.database.models.checkout import Checkout  # noqa: E402
+from src.database.models.credit_ledger import CreditLedgerEntry, CreditSnapshot  # noqa: E402
+from src.database.models.item import Item  # noqa: E402
+from src.database.models.item_image import ItemImage  # noqa: E402
+from src.database.models.purchase_rollup import PurchaseRollup  # noqa: E402
+from src.database.models.transaction import Transaction  # noqa: E402
+from src.database.models.user import User  # noqa: E402
+
+_ = [
+    User,
+    Item,
+    ItemImage,
+    Checkout,
+    Transaction,
+    PurchaseRollup,
+    CreditLedgerEntry,
+    CreditSnapshot,
+]
+
+# Alembic Config object
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def get_url() -> str:
+    """Prefer an explicit sqlalchemy.url, otherwise use the database from config.json."""
+    url = config.get_main_option("sqlalchemy.url")
+    if url:
+        return url
+
+    from src.utils.config import config as app_config
+
+    return build_database_url(app_config.get("database", {}))
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        # Prevent table deletion
+        compare_type=True,
+        compare_server_default=True,
+        render_as_batch=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_on_connection(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # Prevent table deletion
+        compare_type=True,
+        compare_server_default=True,
+        render_as_batch=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # The application passes its own connection when it migrates at startup.
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations_on_connection(connection)
+        return
+
+    connectable = create_engine(get_url(), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        run_migrations_on_connection(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
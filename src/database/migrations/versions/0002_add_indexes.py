@@ -0,0 +1,65 @@
+"""Add indexes for the hot lookup paths
+
+- unique `users.nfcid` (login) and `items.barcode` (barcode scan)
+- `users.type` (admin lookup for notifications)
+- `transactions.item_id`, `transactions.date` and a composite
+  `(user_id, date)` index for per-user history and monthly reports
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:05:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _assert_no_duplicates(table: str, column: str) -> None:
+    """Fail with a readable message instead of a constraint error on duplicate values."""
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                f"SELECT {column}, COUNT(*) FROM {table} " f"GROUP BY {column} HAVING COUNT(*) > 1"
+            )
+        )
+        .fetchall()
+    )
+    if duplicates:
+        values = ", ".join(str(row[0]) for row in duplicates)
+        raise RuntimeError(
+            f"Cannot add unique index on {table}.{column}, duplicate values: {values}. "
+            "Resolve the duplicates and run the migration again."
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _assert_no_duplicates("users", "nfcid")
+    _assert_no_duplicates("items", "barcode")
+
+    op.create_index("ix_users_nfcid", "users", ["nfcid"], unique=True)
+    op.create_index("ix_users_type", "users", ["type"])
+    op.create_index("ix_items_barcode", "items", ["barcode"], unique=True)
+    op.create_index("ix_transactions_item_id", "transactions", ["item_id"])
+    op.create_index("ix_transactions_date", "transactions", ["date"])
+    op.create_index("ix_transactions_user_id_date", "transactions", ["user_id", "date"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_transactions_user_id_date", table_name="transactions")
+    op.drop_index("ix_transactions_date", table_name="transactions")
+    op.drop_index("ix_transactions_item_id", table_name="transactions")
+    op.drop_index("ix_items_barcode", table_name="items")
+    op.drop_index("ix_users_type", table_name="users")
+    op.drop_index("ix_users_nfcid", table_name="users")
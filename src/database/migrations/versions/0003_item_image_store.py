@@ -0,0 +1,80 @@
+"""Move item images into a content-addressed image table
+
+Existing `items.image` blobs are copied into `item_images` keyed by their
+SHA-256 hash (identical photos are stored once), referenced through the new
+`items.image_hash` column, and the blob column is dropped from `items`.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+import hashlib
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    item_images = op.create_table(
+        "item_images",
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+
+    with op.batch_alter_table("items") as batch_op:
+        batch_op.add_column(sa.Column("image_hash", sa.String(length=64), nullable=True))
+
+    items = sa.table(
+        "items",
+        sa.column("id", sa.Integer),
+        sa.column("image", sa.LargeBinary),
+        sa.column("image_hash", sa.String),
+    )
+
+    # Copy one image at a time to keep memory usage flat on the Pi.
+    bind = op.get_bind()
+    item_ids = bind.execute(
+        sa.select(items.c.id).where(items.c.image.is_not(None)).order_by(items.c.id)
+    ).scalars()
+    stored = set()
+    for item_id in list(item_ids):
+        data = bind.execute(sa.select(items.c.image).where(items.c.id == item_id)).scalar()
+        image_hash = hashlib.sha256(data).hexdigest()
+        if image_hash not in stored:
+            bind.execute(sa.insert(item_images).values(hash=image_hash, data=data))
+            stored.add(image_hash)
+        bind.execute(sa.update(items).where(items.c.id == item_id).values(image_hash=image_hash))
+
+    with op.batch_alter_table("items") as batch_op:
+        batch_op.create_foreign_key(
+            "fk_items_image_hash_item_images", "item_images", ["image_hash"], ["hash"]
+        )
+        batch_op.drop_column("image")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("items") as batch_op:
+        batch_op.add_column(sa.Column("image", sa.LargeBinary(), nullable=True))
+
+    op.execute(
+        "UPDATE items SET image = "
+        "(SELECT data FROM item_images WHERE item_images.hash = items.image_hash)"
+    )
+
+    with op.batch_alter_table("items") as batch_op:
+        batch_op.drop_constraint("fk_items_image_hash_item_images", type_="foreignkey")
+        batch_op.drop_column("image_hash")
+
+    op.drop_table("item_images")
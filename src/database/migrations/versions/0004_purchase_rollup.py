@@ -0,0 +1,53 @@
+"""Add the monthly purchase rollup table
+
+`user_month_category_rollup` holds spend and transaction count per user,
+calendar month, category and item. It is filled from the existing
+transaction history here and maintained by the checkout afterwards.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_month_category_rollup",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("spend", sa.Float(), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "month", "category", "item_id"),
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        month = "CAST(date_trunc('month', date) AS DATE)"
+    else:
+        month = "date(date, 'start of month')"
+
+    op.execute(
+        "INSERT INTO user_month_category_rollup "
+        "(user_id, month, category, item_id, spend, transaction_count) "
+        f"SELECT user_id, {month}, category, item_id, SUM(cost), COUNT(id) "
+        f"FROM transactions GROUP BY user_id, {month}, category, item_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_month_category_rollup")
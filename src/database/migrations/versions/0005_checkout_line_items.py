@@ -0,0 +1,88 @@
+"""Store checkouts and line item details
+
+- new `checkouts` table: one row per purchase (receipt) with user, date and
+  total
+- `transactions` become the lines of a checkout: `checkout_id`, `quantity`,
+  `unit_price` and the denormalized `item_name`
+- the monthly rollup gets the units bought (`quantity`) and the `item_name`
+
+The quantity of existing transactions is unknown, they keep quantity 1 and
+`unit_price = cost`; their item name is copied from `items` where the item
+still exists.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "checkouts",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_checkouts_user_id_date", "checkouts", ["user_id", "date"])
+
+    with op.batch_alter_table("transactions") as batch_op:
+        batch_op.add_column(sa.Column("checkout_id", sa.Integer(), nullable=True))
+        batch_op.add_column(
+            sa.Column("quantity", sa.Integer(), nullable=False, server_default=sa.text("1"))
+        )
+        batch_op.add_column(sa.Column("unit_price", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("item_name", sa.String(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_transactions_checkout_id_checkouts", "checkouts", ["checkout_id"], ["id"]
+        )
+        batch_op.create_index("ix_transactions_checkout_id", ["checkout_id"])
+
+    op.execute(
+        "UPDATE transactions SET unit_price = cost, "
+        "item_name = (SELECT name FROM items WHERE items.id = transactions.item_id)"
+    )
+
+    with op.batch_alter_table("user_month_category_rollup") as batch_op:
+        batch_op.add_column(
+            sa.Column("quantity", sa.Integer(), nullable=False, server_default=sa.text("0"))
+        )
+        batch_op.add_column(sa.Column("item_name", sa.String(), nullable=True))
+
+    op.execute(
+        "UPDATE user_month_category_rollup SET quantity = transaction_count, "
+        "item_name = (SELECT name FROM items WHERE items.id = user_month_category_rollup.item_id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("user_month_category_rollup") as batch_op:
+        batch_op.drop_column("item_name")
+        batch_op.drop_column("quantity")
+
+    with op.batch_alter_table("transactions") as batch_op:
+        batch_op.drop_index("ix_transactions_checkout_id")
+        batch_op.drop_constraint("fk_transactions_checkout_id_checkouts", type_="foreignkey")
+        batch_op.drop_column("item_name")
+        batch_op.drop_column("unit_price")
+        batch_op.drop_column("quantity")
+        batch_op.drop_column("checkout_id")
+
+    op.drop_index("ix_checkouts_user_id_date", table_name="checkouts")
+    op.drop_table("checkouts")
@@ -0,0 +1,64 @@
+"""Add the credit ledger and credit snapshots
+
+`credit_ledger` records every change of a user's credit, `credit_snapshots`
+the balance of a user at a point in time. Every existing user gets an
+`opening` entry with the current credit, so the entries of a user sum up to
+`users.credit` from here on.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from datetime import datetime
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "credit_ledger",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("checkout_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["checkout_id"], ["checkouts.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_credit_ledger_user_id_date", "credit_ledger", ["user_id", "date"])
+
+    op.create_table(
+        "credit_snapshots",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("as_of", sa.DateTime(), nullable=False),
+        sa.Column("balance", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "as_of"),
+    )
+
+    op.get_bind().execute(
+        sa.text(
+            "INSERT INTO credit_ledger (user_id, date, amount, kind) "
+            "SELECT id, :now, credit, 'opening' FROM users"
+        ),
+        {"now": datetime.now()},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("credit_snapshots")
+    op.drop_index("ix_credit_ledger_user_id_date", table_name="credit_ledger")
+    op.drop_table("credit_ledger")
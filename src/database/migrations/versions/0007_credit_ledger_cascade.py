@@ -0,0 +1,90 @@
+"""Let user and checkout deletes cascade to the credit ledger
+
+Every user has ledger entries since 0006, and their plain foreign keys made
+the database refuse to delete a user or to archive (delete) old checkouts:
+
+- `credit_ledger.user_id` and the new `credit_snapshots.user_id` foreign key
+  delete the ledger entries and snapshots with their user (`CASCADE`)
+- `credit_ledger.checkout_id` is set to NULL when the checkout is deleted
+  (`SET NULL`); the entry keeps its amount and date
+
+Entries and snapshots of users that no longer exist are deleted and links to
+missing checkouts cleared first, as SQLite does not enforce foreign keys.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from typing import List, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Names the unnamed foreign keys of 0006 get in SQLite batch mode
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _foreign_key_names(table: str) -> List[str]:
+    """Names of the foreign keys of `table`, following the convention where they have none."""
+    return [
+        foreign_key["name"]
+        or NAMING_CONVENTION["fk"]
+        % {
+            "table_name": table,
+            "column_0_name": foreign_key["constrained_columns"][0],
+            "referred_table_name": foreign_key["referred_table"],
+        }
+        for foreign_key in sa.inspect(op.get_bind()).get_foreign_keys(table)
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DELETE FROM credit_ledger WHERE user_id NOT IN (SELECT id FROM users)")
+    op.execute("DELETE FROM credit_snapshots WHERE user_id NOT IN (SELECT id FROM users)")
+    op.execute(
+        "UPDATE credit_ledger SET checkout_id = NULL "
+        "WHERE checkout_id NOT IN (SELECT id FROM checkouts)"
+    )
+
+    names = _foreign_key_names("credit_ledger")
+    with op.batch_alter_table("credit_ledger", naming_convention=NAMING_CONVENTION) as batch_op:
+        for name in names:
+            batch_op.drop_constraint(name, type_="foreignkey")
+        batch_op.create_foreign_key(
+            "fk_credit_ledger_user_id_users", "users", ["user_id"], ["id"], ondelete="CASCADE"
+        )
+        batch_op.create_foreign_key(
+            "fk_credit_ledger_checkout_id_checkouts",
+            "checkouts",
+            ["checkout_id"],
+            ["id"],
+            ondelete="SET NULL",
+        )
+
+    with op.batch_alter_table("credit_snapshots") as batch_op:
+        batch_op.create_foreign_key(
+            "fk_credit_snapshots_user_id_users", "users", ["user_id"], ["id"], ondelete="CASCADE"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("credit_snapshots") as batch_op:
+        batch_op.drop_constraint("fk_credit_snapshots_user_id_users", type_="foreignkey")
+
+    with op.batch_alter_table("credit_ledger") as batch_op:
+        batch_op.drop_constraint("fk_credit_ledger_checkout_id_checkouts", type_="foreignkey")
+        batch_op.drop_constraint("fk_credit_ledger_user_id_users", type_="foreignkey")
+        batch_op.create_foreign_key("fk_credit_ledger_user_id_users", "users", ["user_id"], ["id"])
+        batch_op.create_foreign_key(
+            "fk_credit_ledger_checkout_id_checkouts", "checkouts", ["checkout_id"], ["id"]
+        )
@@ -0,0 +1,41 @@
+"""Add the client key of a checkout
+
+A kiosk generates a UUID for every checkout it submits and stores it in
+`checkouts.client_key`. If the connection is lost while the commit is in
+flight, the kiosk cannot know whether the checkout was committed; it
+journals the cart with the same key and the replay skips it if a checkout
+with that key exists. The unique index makes a second insert with the key
+fail instead of charging twice.
+
+Checkouts made before this revision have no key.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("checkouts") as batch_op:
+        batch_op.add_column(sa.Column("client_key", sa.String(length=36), nullable=True))
+        batch_op.create_index("ix_checkouts_client_key", ["client_key"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("checkouts") as batch_op:
+        batch_op.drop_index("ix_checkouts_client_key")
+        batch_op.drop_column("client_key")
@@ -0,0 +1,30 @@
+"""This file holds the checkout (receipt) model."""
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
+
+from src.database.connection import Base
+from src.database.crud_mixin import CRUDMixin
+
+
+class Checkout(Base, CRUDMixin):
+    """One purchase; its cart lines are the `transactions` referencing it."""
+
+    __tablename__ = "checkouts"
+    __table_args__ = (
+        Index("ix_checkouts_user_id_date", "user_id", "date"),
+        Index("ix_checkouts_client_key", "client_key", unique=True),
+        {"extend_existing": True},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    date = Column(DateTime, nullable=False)
+    total = Column(Float, nullable=False)
+    # UUID the kiosk generated for the checkout, to replay it at most once
+    client_key = Column(String(36), nullable=True)
+
+    def __repr__(self):
+        return (
+            f"<Checkout(id={self.id}, user_id={self.user_id}, date='{self.date}', "
+            f"total={self.total})>"
+        )
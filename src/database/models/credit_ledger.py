@@ -0,0 +1,65 @@
+"""This file holds the credit ledger and credit snapshot models."""
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
+
+from src.database.connection import Base
+
+
+class CreditLedgerEntry(Base):
+    """One change of a user's credit; the entries of a user sum up to `users.credit`.
+
+    Append-only: a wrong entry is undone by a correction entry, not by an update.
+    """
+
+    __tablename__ = "credit_ledger"
+    __table_args__ = (
+        Index("ix_credit_ledger_user_id_date", "user_id", "date"),
+        {"extend_existing": True},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Deleting the user deletes its entries, deleting the checkout only unlinks them
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", name="fk_credit_ledger_user_id_users", ondelete="CASCADE"),
+        nullable=False,
+    )
+    date = Column(DateTime, nullable=False)
+    # Signed: negative for debits
+    amount = Column(Float, nullable=False)
+    # "opening", "checkout", "top_up" or "correction"
+    kind = Column(String, nullable=False)
+    checkout_id = Column(
+        Integer,
+        ForeignKey(
+            "checkouts.id", name="fk_credit_ledger_checkout_id_checkouts", ondelete="SET NULL"
+        ),
+        nullable=True,
+    )
+
+    def __repr__(self):
+        return (
+            f"<CreditLedgerEntry(id={self.id}, user_id={self.user_id}, date='{self.date}', "
+            f"amount={self.amount}, kind='{self.kind}')>"
+        )
+
+
+class CreditSnapshot(Base):
+    """Balance of a user from all ledger entries dated before `as_of`."""
+
+    __tablename__ = "credit_snapshots"
+    __table_args__ = {"extend_existing": True}
+
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", name="fk_credit_snapshots_user_id_users", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    as_of = Column(DateTime, primary_key=True)
+    balance = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<CreditSnapshot(user_id={self.user_id}, as_of='{self.as_of}', "
+            f"balance={self.balance})>"
+        )
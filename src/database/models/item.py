@@ -2,7 +2,7 @@
 
 from typing import Optional
 
-from sqlalchemy import Column, Float, Integer, LargeBinary, String
+from sqlalchemy import Column, Float, ForeignKey, Integer, String
 
 from src.database.connection import Base
 from src.database.crud_mixin import CRUDMixin
@@ -14,11 +14,16 @@ class Item(Base, CRUDMixin):
     __table_args__ = {"extend_existing": True}
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    image = Column(LargeBinary, nullable=True)  # For storing images as binary data
+    # Content hash of the product photo, the data itself lives in `item_images`
+    image_hash = Column(
+        String(64),
+        ForeignKey("item_images.hash", name="fk_items_image_hash_item_images"),
+        nullable=True,
+    )
     name = Column(String, nullable=False)
     category = Column(String, nullable=False)
     price = Column(Float, nullable=False)
-    barcode = Column(String, nullable=False)
+    barcode = Column(String, nullable=False, unique=True, index=True)
     quantity = Column(Integer, nullable=False)
 
     def __repr__(self):
@@ -0,0 +1,60 @@
+"""This file holds the item image model.
+
+Product photos are stored content-addressed (keyed by their SHA-256 hash) in a
+separate table so that listing items never transfers image data. Identical
+images are stored once.
+"""
+
+import hashlib
+from typing import Optional
+
+from sqlalchemy import Column, LargeBinary, String
+from sqlalchemy.orm import deferred
+
+from src.database.connection import Base
+from src.database.crud_mixin import CRUDMixin
+from src.database.models.item import Item
+
+
+class ItemImage(Base, CRUDMixin):
+    __tablename__ = "item_images"
+    __table_args__ = {"extend_existing": True}
+
+    hash = Column(String(64), primary_key=True)
+    # Deferred so that existence checks and joins never load the blob.
+    data = deferred(Column(LargeBinary, nullable=False))
+
+    def __repr__(self):
+        return f"<ItemImage(hash='{self.hash}')>"
+
+    @staticmethod
+    def hash_data(data: bytes) -> str:
+        """Return the content hash used as key for image data."""
+        return hashlib.sha256(data).hexdigest()
+
+    @classmethod
+    def store(cls, session, data: bytes) -> str:
+        """Adds the image to the session unless it is already stored and returns its hash.
+
+        Does not commit; the caller commits together with the item referencing it.
+        """
+        image_hash = cls.hash_data(data)
+        if session.get(cls, image_hash) is None:
+            session.add(cls(hash=image_hash, data=data))
+        return image_hash
+
+    @classmethod
+    def get_data(cls, session, image_hash: str) -> Optional[bytes]:
+        """Returns the raw image data for a hash."""
+        return session.query(cls.data).filter(cls.hash == image_hash).scalar()
+
+    @classmethod
+    def prune(cls, session, image_hash: Optional[str], commit=True) -> None:
+        """Deletes an image once no item references it anymore."""
+        if not image_hash:
+            return
+
+        if session.query(Item.id).filter(Item.image_hash == image_hash).first() is None:
+            session.query(cls).filter(cls.hash == image_hash).delete(synchronize_session=False)
+            if commit:
+                session.commit()
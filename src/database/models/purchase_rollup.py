@@ -0,0 +1,35 @@
+"""This file holds the monthly purchase rollup model."""
+
+from sqlalchemy import Column, Date, Float, Integer, String, text
+
+from src.database.connection import Base
+
+
+class PurchaseRollup(Base):
+    """Spend, units and number of transactions per user, calendar month, category and item.
+
+    Derived from `transactions`: maintained by the checkout and rebuilt from
+    scratch with `python -m src.database.rollup`.
+    """
+
+    __tablename__ = "user_month_category_rollup"
+    __table_args__ = {"extend_existing": True}
+
+    user_id = Column(Integer, primary_key=True)
+    # First day of the month
+    month = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)
+    item_id = Column(Integer, primary_key=True)
+    spend = Column(Float, nullable=False)
+    transaction_count = Column(Integer, nullable=False)
+    # Units bought; equals transaction_count for rows from before line items
+    quantity = Column(Integer, nullable=False, server_default=text("0"))
+    # Item name recorded with the purchases, kept when the item is deleted
+    item_name = Column(String, nullable=True)
+
+    def __repr__(self):
+        return (
+            f"<PurchaseRollup(user_id={self.user_id}, month={self.month}, "
+            f"category={self.category}, item_id={self.item_id}, spend={self.spend}, "
+            f"transaction_count={self.transaction_count}, quantity={self.quantity})>"
+        )
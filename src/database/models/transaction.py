@@ -2,27 +2,52 @@
 
 from typing import List
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, text
 
 from src.database.connection import Base
 from src.database.crud_mixin import CRUDMixin
 
 
 class Transaction(Base, CRUDMixin):
+    """One line of a checkout: `quantity` units of an item at `unit_price`.
+
+    `item_name` is copied from the item at checkout time, so reports work
+    without joining `items` and survive the deletion of the item. Rows from
+    before line items were recorded have no checkout, quantity 1 and
+    `unit_price == cost`.
+    """
+
     __tablename__ = "transactions"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Per-user reads filter by user and date range; the composite index also
+        # serves plain user_id lookups.
+        Index("ix_transactions_user_id_date", "user_id", "date"),
+        {"extend_existing": True},
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
+    # None for rows recorded before checkouts were stored
+    checkout_id = Column(
+        Integer,
+        ForeignKey("checkouts.id", name="fk_transactions_checkout_id_checkouts"),
+        nullable=True,
+        index=True,
+    )
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
-    date = Column(DateTime, nullable=False)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False, index=True)
+    date = Column(DateTime, nullable=False, index=True)
+    # quantity * unit_price
     cost = Column(Float, nullable=False)
     category = Column(String, nullable=False)
+    quantity = Column(Integer, nullable=False, server_default=text("1"))
+    unit_price = Column(Float, nullable=True)
+    item_name = Column(String, nullable=True)
 
     def __repr__(self):
         return (
             f"<Transaction(id={self.id}, category={self.category}, cost='{self.cost}', "
-            f"item_id='{self.item_id}', user_id='{self.user_id}', date='{self.date}')>"
+            f"quantity={self.quantity}, item_id='{self.item_id}', user_id='{self.user_id}', "
+            f"date='{self.date}')>"
         )
 
     @classmethod
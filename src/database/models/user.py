@@ -13,9 +13,9 @@ class User(Base, CRUDMixin):
     __table_args__ = {"extend_existing": True}
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    nfcid = Column(String, nullable=False)
+    nfcid = Column(String, nullable=False, unique=True, index=True)
     name = Column(String, nullable=False)
-    type = Column(String, nullable=False)
+    type = Column(String, nullable=False, index=True)
     credit = Column(Float, nullable=False)
     email = Column(String, nullable=True)
     mattermost_username = Column(String, nullable=True)
@@ -0,0 +1,415 @@
+"""Offline checkout journal.
+
+With the PostgreSQL backend, a network outage used to fail every checkout and
+the customer walked away. When the server cannot be reached, a checkout is now
+validated against the cached credit (`user_cache`) and stock (`item_catalog`),
+written to a local SQLite journal and confirmed right away. The cached credit
+and stock are debited as if the checkout had been committed.
+
+A background job replays the journal to PostgreSQL in order once the server is
+reachable again, each entry with its original date:
+
+- an entry that commits is marked `replayed`,
+- an entry that the server rejects (stock or credit no longer sufficient,
+  e.g. because another kiosk sold the stock in the meantime) is marked
+  `conflict` and logged as a warning; it stays in the journal to be settled
+  by an admin,
+- a connection error stops the replay until the next run.
+
+Every entry carries a client key (a UUID), stored with the checkout it
+commits. A checkout whose commit lost the connection may have been committed
+after all; it is journaled with the key it was submitted with, and the replay
+skips an entry whose key the server already has. The same goes for an entry
+whose replay was interrupted.
+
+While entries are pending, new checkouts go to the journal directly instead of
+waiting for a connection timeout first, so they are replayed behind the
+earlier ones and the checkout latency does not depend on the network.
+
+The journal is configured under `database.offline_journal` in `config.json`
+and only used with PostgreSQL; a local SQLite database has no network to lose.
+"""
+
+import json
+import sqlite3
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from src.app_context import get_app_context
+from src.database.checkout import (
+    CheckoutError,
+    CheckoutOutcomeUnknown,
+    InsufficientCreditError,
+    InsufficientStockError,
+    find_checkout,
+    is_connection_error,
+    perform_checkout,
+)
+from src.database.connection import session_scope
+from src.database.instrumentation import operation
+from src.database.item_catalog import item_catalog
+from src.database.user_cache import user_cache
+from src.logmgr import logger
+
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "enabled": True,
+    "path": "src/database/offline_journal.db",
+    "replay_interval_seconds": 15,
+}
+
+PENDING = "pending"
+REPLAYING = "replaying"
+REPLAYED = "replayed"
+CONFLICT = "conflict"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkouts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    lines TEXT NOT NULL,
+    total REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    detail TEXT,
+    client_key TEXT
+)
+"""
+
+
+@dataclass(frozen=True)
+class JournalEntry:  # pylint: disable=too-many-instance-attributes
+    """A checkout stored in the journal."""
+
+    id: int
+    created_at: datetime
+    user_id: int
+    # Merged (item_id, quantity) lines
+    lines: List[Tuple[int, int]]
+    # Total at the cached prices; the replay charges the server prices
+    total: float
+    # Why the server rejected the entry
+    detail: Optional[str] = None
+    # Cached credit of the user after the entry was recorded
+    credit: Optional[float] = None
+    # Key of the checkout on the server; entries journaled before keys existed have none
+    client_key: Optional[str] = None
+
+
+class OfflineJournal:
+    """Local write-ahead journal of checkouts made while the server was unreachable."""
+
+    def __init__(self) -> None:
+        self.settings: Dict[str, Any] = dict(DEFAULT_SETTINGS)
+        # Serializes journal writes with the cache adjustments that belong to them
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def is_enabled(self) -> bool:
+        """Whether checkouts can be journaled."""
+        return self._connection is not None
+
+    def open(self, settings: Dict[str, Any]) -> None:
+        """Open (or create) the journal file and recover an interrupted replay."""
+        self.settings = {**DEFAULT_SETTINGS, **settings}
+        if not self.settings["enabled"]:
+            logger.info("Offline checkout journal is disabled in configuration")
+            return
+        connection = sqlite3.connect(
+            self.settings["path"], check_same_thread=False, isolation_level=None
+        )
+        # Every entry stands for money that was taken: make each write durable
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")
+        connection.execute(_SCHEMA)
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(checkouts)")}
+        if "client_key" not in columns:
+            connection.execute("ALTER TABLE checkouts ADD COLUMN client_key TEXT")
+        # An entry caught mid-replay may or may not have been committed on the
+        # server; its key tells on the next replay
+        connection.execute(
+            "UPDATE checkouts SET status = ? WHERE status = ? AND client_key IS NOT NULL",
+            (PENDING, REPLAYING),
+        )
+        interrupted = connection.execute(
+            "UPDATE checkouts SET status = ?, detail = ? WHERE status = ?",
+            (CONFLICT, "Replay was interrupted, check the transactions manually", REPLAYING),
+        ).rowcount
+        if interrupted:
+            logger.warning("%d journaled checkouts were interrupted during replay", interrupted)
+        self._connection = connection
+        logger.info(
+            "Offline checkout journal at %s, %d checkouts pending",
+            self.settings["path"],
+            len(self.pending()),
+        )
+
+    def close(self) -> None:
+        """Close the journal file."""
+        with self._lock:
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            connection.close()
+
+    def has_pending(self) -> bool:
+        """Whether checkouts are waiting to be replayed."""
+        if self._connection is None:
+            return False
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM checkouts WHERE status = ? LIMIT 1", (PENDING,)
+            ).fetchone()
+        return row is not None
+
+    def pending(self) -> List[JournalEntry]:
+        """Checkouts waiting to be replayed, oldest first."""
+        return self._entries(PENDING)
+
+    def conflicts(self) -> List[JournalEntry]:
+        """Checkouts the server rejected on replay, oldest first."""
+        return self._entries(CONFLICT)
+
+    def _entries(self, status: str) -> List[JournalEntry]:
+        if self._connection is None:
+            return []
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, created_at, user_id, lines, total, detail, client_key "
+                "FROM checkouts WHERE status = ? ORDER BY id",
+                (status,),
+            ).fetchall()
+        return [
+            JournalEntry(
+                id=row[0],
+                created_at=datetime.fromisoformat(row[1]),
+                user_id=row[2],
+                lines=[tuple(line) for line in json.loads(row[3])],
+                total=row[4],
+                detail=row[5],
+                client_key=row[6],
+            )
+            for row in rows
+        ]
+
+    def record(
+        self, user_id: int, lines: Sequence[Tuple[int, int]], client_key: Optional[str] = None
+    ) -> JournalEntry:
+        """Validate a checkout against the cached credit and stock and journal it.
+
+        `client_key` is the key a failed checkout was submitted with, if any;
+        a new one is generated otherwise. Raises the `CheckoutError` of
+        `perform_checkout` if the cached state does not cover the checkout;
+        nothing is journaled then.
+        """
+        if self._connection is None:
+            raise RuntimeError("Offline checkout journal is not open")
+
+        quantities: Dict[int, int] = {}
+        for item_id, quantity in lines:
+            if quantity > 0:
+                quantities[item_id] = quantities.get(item_id, 0) + int(quantity)
+        if not quantities:
+            raise CheckoutError("Nothing to check out")
+
+        with self._lock:
+            user = user_cache.get_by_id(user_id)
+            if user is None:
+                raise CheckoutError(f"User {user_id} is not cached")
+            total = 0.0
+            items = []
+            for item_id, quantity in quantities.items():
+                item = item_catalog.get_by_id(item_id)
+                if item is None or item.quantity < quantity:
+                    raise InsufficientStockError(item_id, quantity)
+                items.append(item)
+                total += float(item.price) * quantity
+            if user.credit < total:
+                raise InsufficientCreditError(f"Insufficient credit for user {user_id}")
+
+            created_at = datetime.now()
+            client_key = client_key or str(uuid.uuid4())
+            entry_id = self._connection.execute(
+                "INSERT INTO checkouts (created_at, user_id, lines, total, client_key) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    created_at.isoformat(),
+                    user_id,
+                    json.dumps(list(quantities.items())),
+                    total,
+                    client_key,
+                ),
+            ).lastrowid
+
+            credit = user.credit - total
+            user_cache.set_credit(user_id, credit)
+            for item in items:
+                item_catalog.set_quantity(item.id, item.quantity - quantities[item.id])
+
+        logger.warning(
+            "Checkout journaled offline | entry=%s user_id=%s lines=%d total=%.2f",
+            entry_id,
+            user_id,
+            len(quantities),
+            total,
+        )
+        return JournalEntry(
+            id=entry_id,
+            created_at=created_at,
+            user_id=user_id,
+            lines=list(quantities.items()),
+            total=total,
+            credit=credit,
+            client_key=client_key,
+        )
+
+    def replay(self) -> None:
+        """Replay the pending checkouts in order until done or the server is unreachable."""
+        with self._replay_lock:
+            for entry in self.pending():
+                if not self._replay_entry(entry):
+                    return
+            conflicts = len(self.conflicts())
+            if conflicts:
+                logger.warning("%d journaled checkouts are in conflict", conflicts)
+
+    def _replay_entry(self, entry: JournalEntry) -> bool:
+        """Replay one entry; returns False if the server could not be reached."""
+        self._set_status(entry.id, REPLAYING)
+        try:
+            with operation("offline_replay"), session_scope() as session:
+                checkout_id = entry.client_key and find_checkout(session, entry.client_key)
+                if checkout_id:
+                    self._set_status(entry.id, REPLAYED)
+                    logger.info(
+                        "Journaled checkout %s was already committed as checkout %s, skipped",
+                        entry.id,
+                        checkout_id,
+                    )
+                    return True
+                result = perform_checkout(
+                    session,
+                    entry.user_id,
+                    entry.lines,
+                    date=entry.created_at,
+                    client_key=entry.client_key,
+                )
+        except CheckoutError as ex:
+            self._reject(entry, str(ex))
+            logger.warning(
+                "Journaled checkout %s of user %s (%.2f) conflicts: %s",
+                entry.id,
+                entry.user_id,
+                entry.total,
+                ex,
+            )
+            return True
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            if isinstance(ex, CheckoutOutcomeUnknown) or is_connection_error(ex):
+                self._set_status(entry.id, PENDING)
+                logger.info("Database still unreachable, replay postponed: %s", ex)
+                return False
+            self._reject(entry, str(ex))
+            logger.exception("Journaled checkout %s could not be replayed", entry.id)
+            return True
+
+        with self._lock:
+            self._write_status(entry.id, REPLAYED, None)
+            self._sync_caches(entry.user_id, result)
+        if abs(result.total - entry.total) >= 0.005:
+            logger.info(
+                "Journaled checkout %s was charged %.2f instead of %.2f (prices changed)",
+                entry.id,
+                result.total,
+                entry.total,
+            )
+        logger.info("Journaled checkout %s replayed", entry.id)
+        return True
+
+    def _reject(self, entry: JournalEntry, detail: str) -> None:
+        """Mark an entry as conflict and give its debits back to the caches."""
+        with self._lock:
+            self._write_status(entry.id, CONFLICT, detail)
+            user = user_cache.get_by_id(entry.user_id)
+            if user is not None:
+                user_cache.set_credit(entry.user_id, user.credit + entry.total)
+            for item_id, quantity in entry.lines:
+                item = item_catalog.get_by_id(item_id)
+                if item is not None:
+                    item_catalog.set_quantity(item_id, item.quantity + quantity)
+
+    def _set_status(self, entry_id: int, status: str, detail: Optional[str] = None) -> None:
+        with self._lock:
+            self._write_status(entry_id, status, detail)
+
+    def _write_status(self, entry_id: int, status: str, detail: Optional[str]) -> None:
+        """Caller holds the lock."""
+        self._connection.execute(
+            "UPDATE checkouts SET status = ?, detail = ? WHERE id = ?", (status, detail, entry_id)
+        )
+
+    def _sync_caches(self, user_id: int, result) -> None:
+        """Set the caches to the server state minus what is still pending. Caller holds the lock."""
+        pending_quantities: Dict[int, int] = {}
+        pending_debit = 0.0
+        for _id, lines, total, entry_user_id in self._connection.execute(
+            "SELECT id, lines, total, user_id FROM checkouts WHERE status = ?", (PENDING,)
+        ):
+            if entry_user_id == user_id:
+                pending_debit += total
+            for item_id, quantity in json.loads(lines):
+                pending_quantities[item_id] = pending_quantities.get(item_id, 0) + quantity
+
+        user_cache.set_credit(user_id, result.credit - pending_debit)
+        for item in result.items:
+            item_catalog.set_quantity(item.id, item.quantity - pending_quantities.get(item.id, 0))
+
+    def apply_pending_to_caches(self) -> None:
+        """Debit the pending checkouts from freshly loaded caches (e.g. after a restart)."""
+        for entry in self.pending():
+            with self._lock:
+                user = user_cache.get_by_id(entry.user_id)
+                if user is not None:
+                    user_cache.set_credit(entry.user_id, user.credit - entry.total)
+                for item_id, quantity in entry.lines:
+                    item = item_catalog.get_by_id(item_id)
+                    if item is not None:
+                        item_catalog.set_quantity(item_id, item.quantity - quantity)
+
+
+def start_offline_journal(db_config: Dict[str, Any]) -> None:
+    """Open the journal and replay it every `replay_interval_seconds` (PostgreSQL only).
+
+    Call after the caches were warmed. The scheduler is owned by the
+    application context and shut down with it.
+    """
+    if db_config.get("type", "sqlite").lower() != "postgresql":
+        return
+    offline_journal.open(db_config.get("offline_journal", {}))
+    if not offline_journal.is_enabled:
+        return
+    offline_journal.apply_pending_to_caches()
+
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(
+        offline_journal.replay,
+        IntervalTrigger(seconds=offline_journal.settings["replay_interval_seconds"]),
+        next_run_time=datetime.now(),
+        max_instances=1,
+    )
+    scheduler.start()
+    get_app_context()._scheduler_journal = scheduler
+    logger.info(
+        "Offline journal is replayed every %d seconds",
+        offline_journal.settings["replay_interval_seconds"],
+    )
+
+
+# Process-wide journal instance
+offline_journal = OfflineJournal()
@@ -0,0 +1,223 @@
+"""PostgreSQL connection pool profile.
+
+The engine used to get `pool_pre_ping=True, pool_recycle=300` and the default
+pool size, so the first login after an idle period paid the connection setup
+plus a ping round trip. The settings under `database.postgresql` in
+`config.json` now control the pool:
+
+- `pool_size`, `max_overflow`, `pool_timeout`, `pool_recycle`: passed to the
+  `QueuePool` of the engine.
+- `pre_ping`: `"always"` pings on every checkout (SQLAlchemy's
+  `pool_pre_ping`), `"idle"` only pings connections that were idle for more
+  than `pre_ping_idle_seconds`, `"never"` does not ping.
+- `statement_timeout_ms`: server-side `statement_timeout` of every session.
+- `connect_timeout`: seconds to wait for a new connection, so an unreachable
+  server fails a checkout quickly (and it goes to the offline journal).
+- `warm_up_connections`: connections opened at startup. The hot queries
+  (login, barcode lookup, checkout) are run once, so their compiled form is
+  cached by SQLAlchemy before the first customer arrives. psycopg2 does not
+  use server-side prepared statements, so this is the statement cache that
+  can be primed.
+- `metrics_interval_minutes`: how often the pool metrics (connections
+  checked out, overflow, time spent waiting for a connection) are logged.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from src.app_context import get_app_context
+from src.logmgr import logger
+
+DEFAULT_POOL_SETTINGS: Dict[str, Any] = {
+    "pool_size": 5,
+    "max_overflow": 5,
+    "pool_timeout": 10,
+    "pool_recycle": 1800,
+    "pre_ping": "idle",
+    "pre_ping_idle_seconds": 60,
+    "statement_timeout_ms": 10000,
+    "connect_timeout": 5,
+    "warm_up_connections": 2,
+    "metrics_interval_minutes": 15,
+}
+
+PRE_PING_STRATEGIES = ("always", "idle", "never")
+
+# Waiting longer than this for a pool connection is logged right away
+SLOW_CHECKOUT_WAIT_S = 0.5
+
+
+def get_pool_settings(pg_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the pool settings: the defaults overridden by the configuration."""
+    settings = dict(DEFAULT_POOL_SETTINGS)
+    settings.update({key: pg_config[key] for key in DEFAULT_POOL_SETTINGS if key in pg_config})
+    if settings["pre_ping"] not in PRE_PING_STRATEGIES:
+        raise ValueError(
+            f"Invalid value for database.postgresql.pre_ping: {settings['pre_ping']!r}, "
+            f"expected one of {', '.join(PRE_PING_STRATEGIES)}"
+        )
+    return settings
+
+
+@dataclass
+class PoolWaitStats:
+    """Time spent waiting for a pool connection since the last report."""
+
+    checkouts: int = 0
+    total_wait_s: float = 0.0
+    max_wait_s: float = 0.0
+
+
+class InstrumentedQueuePool(QueuePool):
+    """`QueuePool` that measures how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self._wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        started = time.monotonic()
+        connection = super()._do_get()
+        waited = time.monotonic() - started
+        with self._wait_lock:
+            self._wait_stats.checkouts += 1
+            self._wait_stats.total_wait_s += waited
+            self._wait_stats.max_wait_s = max(self._wait_stats.max_wait_s, waited)
+        if waited >= SLOW_CHECKOUT_WAIT_S:
+            logger.warning("Waited %.2f s for a database connection (%s)", waited, self.status())
+        return connection
+
+    def take_wait_stats(self) -> PoolWaitStats:
+        """Return the wait statistics since the last call and reset them."""
+        with self._wait_lock:
+            stats, self._wait_stats = self._wait_stats, PoolWaitStats()
+        return stats
+
+
+def get_engine_kwargs(pg_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the `create_engine` arguments for the configured pool."""
+    settings = get_pool_settings(pg_config)
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings["pool_size"],
+        "max_overflow": settings["max_overflow"],
+        "pool_timeout": settings["pool_timeout"],
+        "pool_recycle": settings["pool_recycle"],
+        "pool_pre_ping": settings["pre_ping"] == "always",
+        "connect_args": {
+            "options": f"-c statement_timeout={int(settings['statement_timeout_ms'])}",
+            "connect_timeout": int(settings["connect_timeout"]),
+        },
+    }
+
+
+def install(engine, pg_config: Dict[str, Any]) -> None:
+    """Register the idle pre-ping on `engine` if configured."""
+    settings = get_pool_settings(pg_config)
+    if settings["pre_ping"] == "idle":
+        _install_idle_pre_ping(engine, settings["pre_ping_idle_seconds"])
+    logger.info(
+        "PostgreSQL pool: size=%s overflow=%s timeout=%ss pre_ping=%s statement_timeout=%sms",
+        settings["pool_size"],
+        settings["max_overflow"],
+        settings["pool_timeout"],
+        settings["pre_ping"],
+        settings["statement_timeout_ms"],
+    )
+
+
+def _install_idle_pre_ping(engine, idle_seconds: float) -> None:
+    """Ping a pooled connection on checkout only if it sat idle for `idle_seconds`."""
+
+    def on_checkin(_dbapi_connection, connection_record) -> None:
+        if connection_record is not None:
+            connection_record.info["checked_in_at"] = time.monotonic()
+
+    def on_checkout(dbapi_connection, connection_record, _connection_proxy) -> None:
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as ex:
+            # The pool discards the connection and retries with a new one
+            raise exc.DisconnectionError(f"Idle connection is stale: {ex}") from ex
+        finally:
+            try:
+                cursor.close()
+            except Exception:  # pylint: disable=broad-exception-caught
+                pass
+
+    event.listen(engine, "checkin", on_checkin)
+    event.listen(engine, "checkout", on_checkout)
+
+
+def warm_up(engine, session_factory, connections: int, prime: Callable[[Any], None]) -> None:
+    """Open `connections` pool connections at once and run `prime(session)` on the first.
+
+    Every session keeps its connection until all are open, so the pool really
+    holds `connections` connections afterwards. SQLAlchemy caches compiled
+    statements per engine, so priming one connection covers all of them. The
+    sessions are rolled back.
+    """
+    if connections <= 0:
+        return
+    started = time.monotonic()
+    sessions = [session_factory() for _ in range(min(connections, engine.pool.size()))]
+    try:
+        prime(sessions[0])
+        for session in sessions[1:]:
+            session.connection()
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception("Database warm-up failed")
+    finally:
+        # Closing rolls back and returns the connections to the pool, ready for the first login
+        for session in sessions:
+            session.close()
+    logger.info(
+        "Warmed up %d database connections in %.0f ms",
+        len(sessions),
+        (time.monotonic() - started) * 1000,
+    )
+
+
+def log_pool_metrics(engine) -> None:
+    """Log connections checked out, overflow and the wait times since the last report."""
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return
+    wait = pool.take_wait_stats()
+    logger.info(
+        "DB pool: size=%d checked_out=%d overflow=%d idle=%d | checkouts=%d "
+        "avg_wait=%.1f ms max_wait=%.1f ms",
+        pool.size(),
+        pool.checkedout(),
+        max(pool.overflow(), 0),
+        pool.checkedin(),
+        wait.checkouts,
+        wait.total_wait_s / wait.checkouts * 1000 if wait.checkouts else 0.0,
+        wait.max_wait_s * 1000,
+    )
+
+
+def initialize_metrics(engine, interval_minutes: int) -> None:
+    """Log the pool metrics every `interval_minutes` on a background scheduler.
+
+    The scheduler is owned by the application context and shut down with it.
+    """
+    if interval_minutes <= 0:
+        return
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(log_pool_metrics, IntervalTrigger(minutes=interval_minutes), args=[engine])
+    scheduler.start()
+    get_app_context()._scheduler_database = scheduler
+    logger.info("Database pool metrics are logged every %d minutes", interval_minutes)
@@ -0,0 +1,154 @@
+"""Monthly purchase rollup.
+
+Purchase statistics (monthly summaries, the per-user category chart) used to
+rescan all raw `transactions` of a user. The `user_month_category_rollup` table
+holds spend, units and transaction count per user, calendar month, category
+and item, plus the item name, so reports need neither `transactions` nor
+`items`.
+It is updated by the checkout in the same database transaction, so reads only
+touch a handful of rows per month instead of every transaction.
+
+The table can be rebuilt from the transaction history at any time (archived
+months are kept as they are):
+
+    python -m src.database.rollup
+"""
+
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Date, cast, delete, func, insert, literal_column, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.database.models.purchase_rollup import PurchaseRollup
+from src.database.models.transaction import Transaction
+from src.logmgr import logger
+
+_KEY_COLUMNS = ("user_id", "month", "category", "item_id")
+
+
+def month_start(value: datetime) -> date:
+    """Return the first day of the month of a date or datetime."""
+    return date(value.year, value.month, 1)
+
+
+def record_purchases(
+    session,
+    user_id: int,
+    purchase_date: datetime,
+    purchases: Iterable[Tuple[str, int, str, int, float]],
+) -> None:
+    """Add `(category, item_id, item_name, quantity, cost)` lines of one checkout to the rollup.
+
+    Executes a single upsert in the caller's transaction; does not commit.
+    """
+    rows: Dict[Tuple[str, int], Dict] = {}
+    for category, item_id, item_name, quantity, cost in purchases:
+        row = rows.setdefault(
+            (category, item_id),
+            {
+                "user_id": user_id,
+                "month": month_start(purchase_date),
+                "category": category,
+                "item_id": item_id,
+                "spend": 0.0,
+                "transaction_count": 0,
+                "quantity": 0,
+            },
+        )
+        row["spend"] += float(cost)
+        row["transaction_count"] += 1
+        row["quantity"] += int(quantity)
+        row["item_name"] = item_name
+    if not rows:
+        return
+
+    dialect_insert = (
+        postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    )
+    statement = dialect_insert(PurchaseRollup).values(list(rows.values()))
+    statement = statement.on_conflict_do_update(
+        index_elements=list(_KEY_COLUMNS),
+        set_={
+            "spend": PurchaseRollup.spend + statement.excluded.spend,
+            "transaction_count": PurchaseRollup.transaction_count
+            + statement.excluded.transaction_count,
+            "quantity": PurchaseRollup.quantity + statement.excluded.quantity,
+            "item_name": statement.excluded.item_name,
+        },
+    )
+    session.execute(statement)
+
+
+def month_of(column, dialect_name: str):
+    """SQL expression for the first day of the month of a timestamp column."""
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc(literal_column("'month'"), column), Date)
+    return func.date(column, literal_column("'start of month'"))
+
+
+def rebuild(session) -> int:
+    """Recompute the rollup from `transactions` and commit. Returns the row count.
+
+    Rows of months before the oldest transaction are kept: their transactions
+    were archived (see `src.database.archive`) and cannot be recomputed.
+    """
+    oldest = session.scalar(select(func.min(Transaction.date)))
+    month = month_of(Transaction.date, session.get_bind().dialect.name)
+    aggregate = select(
+        Transaction.user_id,
+        month,
+        Transaction.category,
+        Transaction.item_id,
+        func.sum(Transaction.cost),
+        func.count(Transaction.id),
+        func.sum(Transaction.quantity),
+        func.max(Transaction.item_name),
+    ).group_by(Transaction.user_id, month, Transaction.category, Transaction.item_id)
+
+    try:
+        if oldest is not None:
+            session.execute(
+                delete(PurchaseRollup).where(PurchaseRollup.month >= month_start(oldest))
+            )
+        session.execute(
+            insert(PurchaseRollup).from_select(
+                [*_KEY_COLUMNS, "spend", "transaction_count", "quantity", "item_name"],
+                aggregate,
+            )
+        )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    row_count = session.scalar(select(func.count()).select_from(PurchaseRollup))
+    logger.info("Purchase rollup rebuilt with %d rows", row_count)
+    return row_count
+
+
+def get_category_spend(session, user_id: int, since: Optional[date] = None) -> Dict[str, float]:
+    """Return spend per category of a user, for all time or from the month of `since` on."""
+    statement = (
+        select(PurchaseRollup.category, func.sum(PurchaseRollup.spend))
+        .where(PurchaseRollup.user_id == user_id)
+        .group_by(PurchaseRollup.category)
+    )
+    if since is not None:
+        statement = statement.where(PurchaseRollup.month >= month_start(since))
+    return {category: float(spend) for category, spend in session.execute(statement)}
+
+
+def main() -> None:
+    """Rebuild the rollup of the configured database."""
+    # pylint: disable=import-outside-toplevel
+    from src.database.connection import initialize_database, session_scope
+    from src.utils.config import config
+
+    initialize_database(config.get_all())
+    with session_scope() as session:
+        rebuild(session)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Schema versioning helpers.
+
+The schema is managed by the Alembic migration chain in `migrations/`. At
+startup the application only compares the revision stored in the database with
+the head of the chain, which is a single lookup instead of reflecting every
+table. Only when they differ is the database created or migrated.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from alembic.util.exc import CommandError
+from sqlalchemy import inspect
+
+from src.logmgr import logger
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+# Revision matching the schema that `create_all` produced before migrations
+# were bundled. Databases with tables but without a revision are assumed to be at it.
+BASELINE_REVISION = "0001"
+
+
+def get_alembic_config(connection=None) -> AlembicConfig:
+    """Build an Alembic config for the bundled migrations, optionally bound to a connection."""
+    alembic_config = AlembicConfig()
+    alembic_config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    if connection is not None:
+        alembic_config.attributes["connection"] = connection
+    return alembic_config
+
+
+def get_head_revision() -> str:
+    """Return the head revision of the bundled migration chain."""
+    return ScriptDirectory.from_config(get_alembic_config()).get_current_head()
+
+
+def get_current_revision(connection) -> Optional[str]:
+    """Return the revision stored in the database, or None if it was never stamped."""
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def _is_known_revision(revision: str) -> bool:
+    try:
+        return ScriptDirectory.from_config(get_alembic_config()).get_revision(revision) is not None
+    except CommandError:
+        return False
+
+
+def ensure_schema(engine, metadata) -> None:
+    """Make sure the database schema is at the head revision.
+
+    - already at head: nothing to do
+    - empty database: create all tables and stamp head
+    - existing tables without revision: stamp baseline, then upgrade
+    - older revision: upgrade
+    - revision unknown to the bundled chain (e.g. written by a newer version):
+      RuntimeError, the database is left as it is
+    """
+    head = get_head_revision()
+    with engine.connect() as connection:
+        current = get_current_revision(connection)
+
+    if current == head:
+        logger.info("Database schema is at head revision %s", head)
+        return
+
+    if current is not None and not _is_known_revision(current):
+        raise RuntimeError(
+            f"Database is at schema revision {current}, which this version does not know "
+            f"(head is {head}); refusing to migrate it"
+        )
+
+    with engine.begin() as connection:
+        alembic_config = get_alembic_config(connection)
+
+        if current is None and not inspect(connection).has_table("items"):
+            metadata.create_all(bind=connection)
+            command.stamp(alembic_config, "head")
+            logger.info("Created database schema at revision %s", head)
+            return
+
+        if current is None:
+            logger.warning(
+                "Database has no schema revision, assuming baseline %s", BASELINE_REVISION
+            )
+            command.stamp(alembic_config, BASELINE_REVISION, purge=True)
+            current = BASELINE_REVISION
+
+        logger.info("Migrating database schema from %s to %s", current, head)
+        command.upgrade(alembic_config, "head")
@@ -0,0 +1,112 @@
+"""SQLite performance profile.
+
+Out of the box SQLite runs in rollback-journal mode with `synchronous=FULL`,
+which costs several fsyncs on the SD card of the Pi for every commit. The
+pragmas below are applied to every new DBAPI connection through the engine
+`connect` event:
+
+- `journal_mode=WAL`: commits append to the write-ahead log instead of
+  rewriting pages twice; readers no longer block the writer.
+- `synchronous=NORMAL`: in WAL mode only checkpoints fsync. A power cut can
+  lose the last commits, but never corrupts the database.
+- `cache_size`, `mmap_size`: keep the (small) database in memory.
+- `temp_store=MEMORY`: sorts and temporary indexes do not touch the card.
+- `busy_timeout`: wait for a concurrent writer instead of failing.
+
+Every value can be overridden under `database.sqlite` in `config.json`. A
+background job checkpoints the WAL and runs `PRAGMA optimize` periodically
+(`database.sqlite.maintenance_interval_minutes`, 0 disables it).
+"""
+
+from typing import Any, Dict
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import event
+
+from src.app_context import get_app_context
+from src.logmgr import logger
+
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    # Negative values are KiB: 16 MiB page cache per connection
+    "cache_size": -16384,
+    "mmap_size": 64 * 1024 * 1024,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+DEFAULT_MAINTENANCE_INTERVAL_MINUTES = 60
+
+
+def get_pragmas(sqlite_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the pragmas to apply: the defaults overridden by the configuration."""
+    pragmas = dict(DEFAULT_PRAGMAS)
+    for name in DEFAULT_PRAGMAS:
+        value = sqlite_config.get(name)
+        if value is None:
+            continue
+        if not isinstance(value, (int, str)) or isinstance(value, bool):
+            raise ValueError(f"Invalid value for database.sqlite.{name}: {value!r}")
+        if isinstance(value, str) and not value.replace("_", "").isalnum():
+            raise ValueError(f"Invalid value for database.sqlite.{name}: {value!r}")
+        pragmas[name] = value
+    return pragmas
+
+
+def install(engine, sqlite_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply the configured profile to every new connection of `engine`; returns it."""
+    pragmas = get_pragmas(sqlite_config)
+    apply_pragmas(engine, pragmas)
+    logger.info(
+        "SQLite profile: %s", ", ".join(f"{name}={value}" for name, value in pragmas.items())
+    )
+    return pragmas
+
+
+def apply_pragmas(engine, pragmas: Dict[str, Any]) -> None:
+    """Execute exactly `pragmas` on every new connection of `engine`."""
+
+    def on_connect(dbapi_connection, _connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    event.listen(engine, "connect", on_connect)
+
+
+def run_maintenance(engine) -> None:
+    """Checkpoint the WAL into the database file and refresh the planner statistics."""
+    try:
+        with engine.connect() as connection:
+            busy, log_frames, checkpointed = connection.exec_driver_sql(
+                "PRAGMA wal_checkpoint(TRUNCATE)"
+            ).one()
+            connection.exec_driver_sql("PRAGMA optimize")
+        logger.debug(
+            "SQLite maintenance done | busy=%s wal_frames=%s checkpointed=%s",
+            busy,
+            log_frames,
+            checkpointed,
+        )
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception("SQLite maintenance failed")
+
+
+def initialize_maintenance(engine, interval_minutes: int) -> None:
+    """Run `run_maintenance` every `interval_minutes` on a background scheduler.
+
+    The scheduler is owned by the application context and shut down with it.
+    """
+    if interval_minutes <= 0:
+        logger.info("SQLite maintenance is disabled in configuration")
+        return
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(run_maintenance, IntervalTrigger(minutes=interval_minutes), args=[engine])
+    scheduler.start()
+    get_app_context()._scheduler_database = scheduler
+    logger.info("SQLite maintenance scheduled every %d minutes", interval_minutes)
@@ -0,0 +1,165 @@
+"""NFC-ID -> user resolution cache.
+
+Every card tap used to query `users.nfcid` on the Tk main thread. The cache
+holds a small identity snapshot (id, type, name, credit) per NFC UID so the
+tap-to-screen path does not need the database.
+
+The cache is loaded at startup, bounded in size with LRU eviction and kept
+coherent by the user create/update/delete paths and by checkout credit changes.
+Changes made on another kiosk only reach it on a miss or a revalidation, so a
+hit is only trusted for customer logins; admin logins are revalidated.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+from src.database.models.user import User
+from src.logmgr import logger
+
+DEFAULT_MAX_SIZE = 4096
+
+_COLUMNS = ("id", "nfcid", "name", "type", "credit")
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Read-only identity snapshot of a user row."""
+
+    id: int
+    nfcid: str
+    name: str
+    type: str
+    credit: float
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        """Create a snapshot from an ORM user."""
+        return cls(
+            id=user.id,
+            nfcid=user.nfcid,
+            name=user.name,
+            type=user.type,
+            credit=float(user.credit),
+        )
+
+
+class UserCache:
+    """Thread-safe, size-bounded LRU cache keyed by NFC UID."""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._by_nfcid: "OrderedDict[str, CachedUser]" = OrderedDict()
+        self._nfcid_by_id: Dict[int, str] = {}
+
+    def load(self, session) -> None:
+        """Fill the cache with up to `max_size` users from the database."""
+        users = User.page_after(session, limit=self.max_size, columns=_COLUMNS)
+        with self._lock:
+            self._by_nfcid.clear()
+            self._nfcid_by_id.clear()
+            for user in users:
+                self._store(CachedUser.from_user(user))
+        logger.info("User cache loaded with %d users", len(users))
+
+    def get(self, nfcid: str) -> Optional[CachedUser]:
+        """Return the cached user for an NFC UID without touching the database."""
+        with self._lock:
+            entry = self._by_nfcid.get(nfcid)
+            if entry is not None:
+                self._by_nfcid.move_to_end(nfcid)
+            return entry
+
+    def get_by_id(self, user_id: int) -> Optional[CachedUser]:
+        """Return the cached user for a primary key."""
+        with self._lock:
+            nfcid = self._nfcid_by_id.get(user_id)
+            return self._by_nfcid.get(nfcid) if nfcid is not None else None
+
+    def lookup(self, session, nfcid: str) -> Optional[CachedUser]:
+        """Resolve an NFC UID from the cache, falling back to the database on a miss."""
+        entry = self.get(nfcid)
+        if entry is not None:
+            return entry
+
+        user = User.get_by_nfcid(session, nfcid)
+        if user is None:
+            return None
+        logger.debug("User cache miss for NFC ID %s, loaded from database", nfcid)
+        return self.put(user)
+
+    def revalidate(self, session, nfcid: str) -> Optional[CachedUser]:
+        """Resolve an NFC UID from the database even on a hit and update the cache.
+
+        For decisions a stale entry must not make, e.g. opening the admin screen
+        for a user whose admin role was revoked or who was deleted on another kiosk.
+        """
+        user = User.get_by_nfcid(session, nfcid)
+        if user is None:
+            with self._lock:
+                entry = self._by_nfcid.pop(nfcid, None)
+                if entry is not None:
+                    self._nfcid_by_id.pop(entry.id, None)
+            return None
+        return self.put(user)
+
+    def refresh(self, session, user_id: int) -> Optional[CachedUser]:
+        """Reload a single user from the database, e.g. before rejecting on stale credit."""
+        user = User.get_by_id(session, user_id)
+        if user is None:
+            self.remove(user_id)
+            return None
+        session.refresh(user)
+        return self.put(user)
+
+    def put(self, user: User) -> CachedUser:
+        """Insert or replace the snapshot of a user after it was created or changed."""
+        entry = CachedUser.from_user(user)
+        with self._lock:
+            self._store(entry)
+        return entry
+
+    def set_credit(self, user_id: int, credit: float) -> None:
+        """Update the cached credit of a user after a checkout."""
+        with self._lock:
+            nfcid = self._nfcid_by_id.get(user_id)
+            entry = self._by_nfcid.get(nfcid) if nfcid is not None else None
+            if entry is not None:
+                self._by_nfcid[nfcid] = replace(entry, credit=float(credit))
+
+    def remove(self, user_id: int) -> None:
+        """Drop a user from the cache after it was deleted."""
+        with self._lock:
+            nfcid = self._nfcid_by_id.pop(user_id, None)
+            if nfcid is not None:
+                self._by_nfcid.pop(nfcid, None)
+
+    def clear(self) -> None:
+        """Forget all cached users."""
+        with self._lock:
+            self._by_nfcid.clear()
+            self._nfcid_by_id.clear()
+
+    def _store(self, entry: CachedUser) -> None:
+        """Store an entry and evict the least recently used ones. Caller holds the lock."""
+        previous_nfcid = self._nfcid_by_id.get(entry.id)
+        if previous_nfcid is not None and previous_nfcid != entry.nfcid:
+            self._by_nfcid.pop(previous_nfcid, None)
+
+        displaced = self._by_nfcid.get(entry.nfcid)
+        if displaced is not None and displaced.id != entry.id:
+            self._nfcid_by_id.pop(displaced.id, None)
+
+        self._by_nfcid[entry.nfcid] = entry
+        self._by_nfcid.move_to_end(entry.nfcid)
+        self._nfcid_by_id[entry.id] = entry.nfcid
+
+        while len(self._by_nfcid) > self.max_size:
+            _, evicted = self._by_nfcid.popitem(last=False)
+            self._nfcid_by_id.pop(evicted.id, None)
+
+
+# Process-wide cache instance
+user_cache = UserCache()
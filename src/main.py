@@ -16,7 +16,12 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 # pylint: disable=wrong-import-position
 from src.app_context import cleanup_app_context, initialize_app_context  # noqa: E402
 from src.database.connection import initialize_database  # noqa: E402
-from src.database.connection import session_manager
+from src.database.connection import session_scope, start_database_maintenance  # noqa: E402
+from src.database.executor import db_executor  # noqa: E402
+from src.database.instrumentation import query_instrumentation  # noqa: E402
+from src.database.item_catalog import item_catalog  # noqa: E402
+from src.database.offline_journal import offline_journal, start_offline_journal  # noqa: E402
+from src.database.user_cache import user_cache  # noqa: E402
 from src.localization import initialize_translations  # noqa: E402
 from src.localization.translator import get_translations  # noqa: E402
 from src.lock import cleanup_gpio, initialize_gpio  # noqa: E402
@@ -29,7 +34,11 @@ from src.sounds.sound_manager import (  # noqa: E402
     stop_sound_controller,
 )
 from src.ui.components.Message import ShowMessage  # noqa: E402
+from src.ui.image_loader import DEFAULT_WORKERS, image_loader  # noqa: E402
+from src.ui.navigation import DEFAULT_CACHE_SIZE, navigator  # noqa: E402
 from src.ui.screens.welcome_page import KioskMainFrame  # noqa: E402
+from src.ui.stall_monitor import DEFAULT_THRESHOLD_MS, MainLoopMonitor  # noqa: E402
+from src.utils.assets import asset_registry  # noqa: E402
 from src.utils.config import config  # noqa: E402
 from src.utils.paths import PROJECT_ROOT  # noqa: E402
 
@@ -103,13 +112,19 @@ def main() -> None:
         logger.debug("Initializing database connection")
         initialize_database(config.get_all())
         logger.info("Database connection initialized")
+        start_database_maintenance()
 
         logger.debug("Initializing translations")
         initialize_translations()
 
-        logger.debug("Starting database session")
-        session_manager.start_session()
-        logger.info("Database session initialized")
+        with session_scope() as session:
+            logger.debug("Warming item catalog")
+            item_catalog.load(session)
+
+            logger.debug("Warming user cache")
+            user_cache.load(session)
+
+        start_offline_journal(config.get("database", {}))
 
         logger.debug("Initializing GPIO")
         initialize_gpio(chip=config.get("gpio.chip"), line_number=config.get("gpio.line_number"))
@@ -142,6 +157,10 @@ def main() -> None:
         else:
             logger.info("Sound is disabled in configuration")
 
+        if config.get("ui.preload_assets", True):
+            logger.debug("Preloading assets")
+            asset_registry.preload()
+
         logger.debug("Initializing main window")
 
         try:
@@ -162,13 +181,19 @@ def main() -> None:
         set_appearance_mode(config.get("appearance.mode", "light"))
 
         logger.debug("Setting up main kiosk frame")
-        kiosk_frame = KioskMainFrame(root)
-        kiosk_frame.grid(row=0, column=0, sticky="nsew")
+        image_loader.attach(root, config.get("ui.image_workers", DEFAULT_WORKERS))
+        navigator.attach(root, config.get("ui.screen_cache_size", DEFAULT_CACHE_SIZE))
+        navigator.show(KioskMainFrame, KioskMainFrame)
 
         root.grid_rowconfigure(0, weight=1)
         root.grid_columnconfigure(0, weight=1)
 
-        root.protocol("WM_DELETE_WINDOW", lambda: on_closing(root))
+        stall_monitor = MainLoopMonitor(
+            root, threshold_ms=config.get("ui.stall_threshold_ms", DEFAULT_THRESHOLD_MS)
+        )
+        stall_monitor.start()
+
+        root.protocol("WM_DELETE_WINDOW", lambda: on_closing(root, stall_monitor))
 
         sleep(0.1)
         logger.debug("Starting main application loop")
@@ -177,17 +202,25 @@ def main() -> None:
     except Exception:  # pylint: disable=broad-exception-caught
         logger.exception("Error initializing application")
     finally:
+        db_executor.shutdown(wait=False)
         cleanup_app_context()
         cleanup_gpio()
 
 
-def on_closing(root: CTk) -> None:
+def on_closing(root: CTk, stall_monitor: MainLoopMonitor) -> None:
     """Handle application closing event."""
     logger.info("Exiting application")
+    stall_monitor.stop()
     shutdown_scheduler()
-    session_manager.close_session()
+    db_executor.shutdown(wait=False)
+    query_instrumentation.report()
+    navigator.report()
+    image_loader.shutdown()
+    image_loader.report()
     stop_sound_controller()
     cleanup_app_context()
+    # After the scheduler is shut down, so no replay is running
+    offline_journal.close()
     cleanup_gpio()
     root.destroy()
     root.quit()
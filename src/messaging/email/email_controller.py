@@ -12,7 +12,7 @@ from jinja2 import Environment, FileSystemLoader, TemplateError
 from src.localization.translator import get_translations
 from src.logmgr import logger
 from src.messaging.base_messaging_controller import BaseMessagingController
-from src.utils.paths import get_image_path
+from src.utils.assets import asset_registry
 
 
 class EmailController(BaseMessagingController):
@@ -105,10 +105,7 @@ class EmailController(BaseMessagingController):
             # Add logo as inline image
             try:
                 logger.debug("Adding logo as inline image")
-                logo_path = get_image_path("logo.png")
-                with open(logo_path, "rb") as img_file:
-                    img_data = img_file.read()
-                image = MIMEImage(img_data, name="logo.png")
+                image = MIMEImage(asset_registry.data("logo.png"), name="logo.png")
                 image.add_header("Content-ID", "<logo>")
                 msg.attach(image)
             except OSError as e:
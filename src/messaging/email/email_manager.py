@@ -6,11 +6,16 @@ Provides initialization and access functions for the EmailController.
 from typing import Any, Dict, Optional
 
 from src.app_context import get_app_context
-from src.database.connection import get_new_session
+from src.database.connection import session_scope
+from src.database.instrumentation import operation
 from src.database.models.user import User
 from src.localization.translator import get_system_language
 from src.logmgr import logger
-from src.messaging.utils import get_monthly_summary_data, initialize_scheduler
+from src.messaging.utils import (
+    get_monthly_summary_data,
+    get_monthly_summary_data_for_all_users,
+    initialize_scheduler,
+)
 
 from .email_controller import EmailController
 
@@ -45,38 +50,45 @@ def get_email_controller() -> Optional[EmailController]:
     return ctx.email_controller
 
 
+@operation("email_summaries")
 def send_monthly_summaries() -> None:
     """Send monthly summaries to all users."""
     logger.debug("Starting to send monthly summaries")
     ctx = get_app_context()
-    session = get_new_session()
     try:
-        users = User.read_all(session)
-        for user in users:
-            summary = get_monthly_summary(user, session)
-            if user.email and ctx.email_controller:
+        # Build the summaries first: sending over SMTP must not hold the
+        # session and the streaming cursor open
+        with session_scope() as session:
+            summaries = get_monthly_summary_data_for_all_users(session)
+            users = User.stream(session, columns=("id", "name", "email"))
+            recipients = [
+                (user.name, user.email, get_monthly_summary(user, session, data=summaries[user.id]))
+                for user in users
+            ]
+        for name, email, summary in recipients:
+            if email and ctx.email_controller:
                 ctx.email_controller.send_monthly_summary(
-                    recipient=user.email,
+                    recipient=email,
                     summary=summary,
                     language=get_system_language(),
                 )
-                logger.info("Monthly summary sent to user %s (%s)", user.name, user.email)
+                logger.info("Monthly summary sent to user %s (%s)", name, email)
             else:
-                logger.warning("User %s does not have an email address, skipping.", user.name)
+                logger.warning("User %s does not have an email address, skipping.", name)
         logger.info("Monthly summaries have been sent to all users")
     except Exception:  # pylint: disable=broad-exception-caught
         logger.exception("Error sending monthly summaries")
-    finally:
-        session.close()
 
 
-def get_monthly_summary(user: User, session: Any) -> Dict[str, Any]:
+def get_monthly_summary(user: User, session: Any, data: Optional[tuple] = None) -> Dict[str, Any]:
     """
     Generate a monthly summary for a given user.
 
     Args:
         user: The user to generate the summary for.
         session: Database session.
+        data: Precomputed summary data of the user (see
+            `get_monthly_summary_data_for_all_users`); queried if omitted.
 
     Returns:
         Dictionary containing summary data.
@@ -86,7 +98,7 @@ def get_monthly_summary(user: User, session: Any) -> Dict[str, Any]:
         product_purchases,
         first_day_of_last_month,
         last_day_of_last_month,
-    ) = get_monthly_summary_data(user, session)
+    ) = data or get_monthly_summary_data(user, session)
 
     summary: Dict[str, Any] = {
         "total_transactions": sum(p["quantity"] for p in product_purchases.values()),
@@ -6,11 +6,16 @@ Provides initialization and access functions for the MattermostController.
 from typing import Any, Dict, Optional
 
 from src.app_context import get_app_context
-from src.database.connection import get_db
+from src.database.connection import session_scope
+from src.database.instrumentation import operation
 from src.database.models.user import User
 from src.localization.translator import get_translations
 from src.logmgr import logger
-from src.messaging.utils import get_monthly_summary_data, initialize_scheduler
+from src.messaging.utils import (
+    get_monthly_summary_data,
+    get_monthly_summary_data_for_all_users,
+    initialize_scheduler,
+)
 
 from .mattermost_controller import MattermostController
 
@@ -41,68 +46,72 @@ def get_mattermost_controller() -> Optional[MattermostController]:
     return ctx.mattermost_controller
 
 
+@operation("mattermost_summaries")
 def send_monthly_summaries() -> None:
     """Send monthly summaries to all users."""
     logger.debug("Starting to send monthly summaries")
     ctx = get_app_context()
-    session = get_db()
-    users = User.read_all(session)
-    for user in users:
-        summary = get_monthly_summary(user, session)
-        if user.mattermost_username and ctx.mattermost_controller:
-            ctx.mattermost_controller.send_message(
-                recipient=user.mattermost_username, message=summary
-            )
-            logger.info(
-                "Monthly summary sent to user %s (%s)",
+    # Build the summaries first: posting to Mattermost must not hold the
+    # session and the streaming cursor open
+    with session_scope() as session:
+        summaries = get_monthly_summary_data_for_all_users(session)
+        users = User.stream(session, columns=("id", "name", "mattermost_username"))
+        recipients = [
+            (
                 user.name,
                 user.mattermost_username,
+                get_monthly_summary(user, session, data=summaries[user.id]),
             )
+            for user in users
+        ]
+    for name, username, summary in recipients:
+        if username and ctx.mattermost_controller:
+            ctx.mattermost_controller.send_message(recipient=username, message=summary)
+            logger.info("Monthly summary sent to user %s (%s)", name, username)
         else:
-            logger.warning(
-                "User %s does not have a Mattermost username, skipping.",
-                user.name,
-            )
+            logger.warning("User %s does not have a Mattermost username, skipping.", name)
     logger.info("Monthly summaries have been sent to all users")
 
 
-def get_monthly_summary(user: User, session: Any) -> str:
+def get_monthly_summary(user: User, session: Any, data: Optional[tuple] = None) -> str:
     """
     Generate a monthly summary for a given user.
 
     Args:
         user: The user to generate the summary for.
         session: Database session.
+        data: Precomputed summary data of the user (see
+            `get_monthly_summary_data_for_all_users`); queried if omitted.
 
     Returns:
         Formatted summary string.
     """
-    # pylint: disable=invalid-sequence-index
     translations: Dict[str, Any] = get_translations()
 
-    data = get_monthly_summary_data(user, session)
+    total_amount, product_purchases, start_date, end_date = data or get_monthly_summary_data(
+        user, session
+    )
 
     summary = translations["monthly_summary"]["title"].format(name=user.name) + "\n"
     summary += (
         translations["monthly_summary"]["period"].format(
-            start_date=data["start_date"],
-            end_date=data["end_date"],
+            start_date=start_date.strftime("%d.%m.%Y"),
+            end_date=end_date.strftime("%d.%m.%Y"),
         )
         + "\n"
     )
     summary += (
-        translations["monthly_summary"]["total_spent"].format(total_amount=data["total_amount"])
-        + "\n"
+        translations["monthly_summary"]["total_spent"].format(total_amount=total_amount) + "\n"
     )
     summary += (
         translations["monthly_summary"]["transaction_count"].format(
-            transaction_count=data["transaction_count"]
+            transaction_count=sum(p["quantity"] for p in product_purchases.values())
         )
         + "\n\n"
     )
     summary += translations["monthly_summary"]["product_table_header"] + "\n"
 
-    for product_name, details in data["product_purchases"].items():
+    for product_name, details in product_purchases.items():
         summary += (
             translations["monthly_summary"]["product_table_row"].format(
                 product_name=product_name,
@@ -2,15 +2,19 @@
 Utility functions for messaging modules.
 """
 
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy import func, select
 
-from src.database.models.item import Item
-from src.database.models.transaction import Transaction
+from src.database.models.purchase_rollup import PurchaseRollup
+from src.database.rollup import month_start
 from src.logmgr import logger
 
+UNKNOWN_PRODUCT = "Unknown Product"
+
 
 def initialize_scheduler(job_function):
     """Initialize the APScheduler to run monthly summaries."""
@@ -22,44 +26,75 @@ def initialize_scheduler(job_function):
     return scheduler
 
 
-def get_monthly_summary_data(user, session):
-    """
-    Generate monthly summary data for a given user.
-    Returns a tuple (total_amount, product_purchases, start_date, end_date).
-    """
+def get_last_month_bounds():
+    """Return the (start, end) datetimes of the previous calendar month."""
     today = datetime.today()
     first_day_of_current_month = today.replace(day=1)
     last_day_of_last_month = first_day_of_current_month - timedelta(days=1)
     first_day_of_last_month = last_day_of_last_month.replace(day=1)
+    return first_day_of_last_month, last_day_of_last_month
 
-    transactions = Transaction.read_all_for_user(session, user.id)
 
-    transactions_in_last_month = [
-        t for t in transactions if first_day_of_last_month <= t.date <= last_day_of_last_month
-    ]
+def _product_totals(start_date):
+    """Per user and item: units bought and spend in the month of `start_date`.
 
-    total_amount = 0.0
-    product_purchases = {}
+    Reads the monthly purchase rollup, which carries the item name, so the cost
+    depends neither on the size of the transaction history nor on `items`.
+    """
+    return (
+        select(
+            PurchaseRollup.user_id,
+            func.max(PurchaseRollup.item_name).label("name"),
+            func.sum(PurchaseRollup.quantity).label("quantity"),
+            func.sum(PurchaseRollup.spend).label("total_cost"),
+        )
+        .where(PurchaseRollup.month == month_start(start_date))
+        .group_by(PurchaseRollup.user_id, PurchaseRollup.item_id)
+    )
 
-    for t in transactions_in_last_month:
-        cost = float(t.cost)
-        total_amount += cost
 
-        item = Item.get_by_id(session, item_id=t.item_id) if t.item_id else None
-        product_name = item.name if item else "Unknown Product"
+def _add_product_total(data, row):
+    """Fold one aggregated row into a summary tuple; products are keyed by name."""
+    total_amount, product_purchases, start_date, end_date = data
+    product_name = row.name or UNKNOWN_PRODUCT
+    cost = float(row.total_cost)
 
-        if product_name in product_purchases:
-            product_purchases[product_name]["quantity"] += 1
-            product_purchases[product_name]["total_cost"] += cost
-        else:
-            product_purchases[product_name] = {
-                "quantity": 1,
-                "total_cost": cost,
-            }
+    if product_name in product_purchases:
+        product_purchases[product_name]["quantity"] += row.quantity
+        product_purchases[product_name]["total_cost"] += cost
+    else:
+        product_purchases[product_name] = {
+            "quantity": row.quantity,
+            "total_cost": cost,
+        }
+    return total_amount + cost, product_purchases, start_date, end_date
 
-    return (
-        total_amount,
-        product_purchases,
-        first_day_of_last_month,
-        last_day_of_last_month,
-    )
+
+def get_monthly_summary_data(user, session):
+    """
+    Generate monthly summary data for a given user.
+    Returns a tuple (total_amount, product_purchases, start_date, end_date).
+    """
+    start_date, end_date = get_last_month_bounds()
+    data = (0.0, {}, start_date, end_date)
+
+    rows = session.execute(_product_totals(start_date).where(PurchaseRollup.user_id == user.id))
+    for row in rows:
+        data = _add_product_total(data, row)
+    return data
+
+
+def get_monthly_summary_data_for_all_users(session):
+    """
+    Generate the monthly summary data of every user with a single grouped query.
+    Returns a mapping user id -> tuple as returned by `get_monthly_summary_data`;
+    users without transactions in the period map to an empty summary.
+    """
+    start_date, end_date = get_last_month_bounds()
+    summaries = defaultdict(lambda: (0.0, {}, start_date, end_date))
+
+    for row in session.execute(_product_totals(start_date)):
+        summaries[row.user_id] = _add_product_total(summaries[row.user_id], row)
+
+    logger.debug("Monthly summary data computed for %d users", len(summaries))
+    return summaries
@@ -0,0 +1,77 @@
+"""Run database work off the Tk thread and deliver the result back to the UI.
+
+Tk widgets may only be touched from the main thread. `run_in_background`
+submits a task to the database executor and polls its future with `after()`,
+so the callbacks run on the Tk thread once the result is there. While the task
+runs, an optional `busy` callback lets the screen show a busy state instead of
+freezing.
+"""
+
+import tkinter as tk
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from src.database.executor import db_executor
+from src.logmgr import logger
+
+POLL_INTERVAL_MS = 20
+
+
+def run_in_background(
+    widget,
+    task: Callable[..., Any],
+    *args,
+    on_success: Optional[Callable[[Any], None]] = None,
+    on_error: Optional[Callable[[BaseException], None]] = None,
+    busy: Optional[Callable[[bool], None]] = None,
+    **kwargs,
+) -> Future:
+    """Run `task(session, *args, **kwargs)` on the database executor.
+
+    `on_success(result)` or `on_error(exception)` are called on the Tk thread.
+    `busy(True)` is called right away and `busy(False)` before the result
+    callback. If `widget` is destroyed in the meantime (e.g. the user left the
+    screen), the result is dropped; `busy(False)` is still called.
+    """
+    future = db_executor.submit(task, *args, **kwargs)
+    if busy is not None:
+        busy(True)
+
+    def poll() -> None:
+        if not widget.winfo_exists():
+            future.cancel()
+            if busy is not None:
+                try:
+                    busy(False)
+                except tk.TclError:
+                    logger.debug("Busy state of a destroyed widget could not be reset")
+            return
+        if not future.done():
+            widget.after(POLL_INTERVAL_MS, poll)
+            return
+
+        if busy is not None:
+            busy(False)
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            if on_error is not None:
+                on_error(error)
+            else:
+                logger.error("Unhandled error of background task: %s", error)
+        elif on_success is not None and not future.cancelled():
+            on_success(future.result())
+
+    widget.after(POLL_INTERVAL_MS, poll)
+    return future
+
+
+def set_busy_cursor(widget, busy: bool) -> None:
+    """Show the "watch" cursor on the window of `widget` while busy.
+
+    The window is found through the widget's masters instead of asking Tk, so
+    the cursor can also be reset after `widget` was destroyed.
+    """
+    window = widget
+    while not isinstance(window, (tk.Tk, tk.Toplevel)):
+        window = window.master
+    window.configure(cursor="watch" if busy else "")
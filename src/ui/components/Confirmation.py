@@ -1,8 +1,7 @@
-from customtkinter import CTkButton, CTkFrame, CTkImage, CTkLabel, CTkToplevel
-from PIL import Image
+from customtkinter import CTkButton, CTkFrame, CTkLabel, CTkToplevel
 
 from src.localization.translator import get_translations
-from src.utils.paths import get_image_path
+from src.utils.assets import asset_registry
 
 
 class DeleteConfirmation(CTkToplevel):
@@ -37,8 +36,7 @@ class DeleteConfirmation(CTkToplevel):
         main_frame.grid_rowconfigure((0, 1, 2, 3), weight=1)
 
         # Load the delete icon
-        delete_img = Image.open(get_image_path("delete.png"))
-        self.delete_image = CTkImage(light_image=delete_img, dark_image=delete_img, size=(70, 80))
+        self.delete_image = asset_registry.image("delete.png", (70, 80))
 
         # Delete icon label
         icon_label = CTkLabel(main_frame, text="", image=self.delete_image, fg_color="white")
@@ -2,11 +2,10 @@
 
 import os
 
-from customtkinter import CTkFrame, CTkImage, CTkLabel
-from PIL import Image
+from customtkinter import CTkFrame, CTkLabel
 
 from src.logmgr import logger
-from src.utils.paths import get_image_path
+from src.utils.assets import asset_registry
 
 
 class ShowMessage(CTkFrame):
@@ -31,9 +30,7 @@ class ShowMessage(CTkFrame):
                 if not ext:
                     image += ".png"
 
-            img_path = get_image_path(image)
-            img = Image.open(img_path)
-            ctk_image = CTkImage(light_image=img, dark_image=img, size=(80, 80))
+            ctk_image = asset_registry.image(image, (80, 80))
 
             self.image_label = CTkLabel(self.main_frame, image=ctk_image, text="")
             self.image_label.grid(row=2, column=0, pady=10, padx=10, sticky="s")
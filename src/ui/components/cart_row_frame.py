@@ -0,0 +1,37 @@
+"""Cart line component: item card plus quantity selector."""
+
+from customtkinter import CTkFrame
+
+from src.ui.components.item_frame import ItemFrame
+from src.ui.components.quantity_frame import QuantityFrame
+
+
+class CartRowFrame(CTkFrame):
+    def __init__(self, master, line, update_total_price, *args, **kwargs):
+        super().__init__(master, *args, **kwargs)
+        quantity, item = line
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_columnconfigure(1, weight=1)
+
+        self.item_frame = ItemFrame(self, data=item, fg_color="white")
+        self.item_frame.grid(row=0, column=0, sticky="w")
+
+        self.quantity_frame = QuantityFrame(
+            self,
+            data=quantity,
+            update_total_price=update_total_price,
+            item_price=item.price,
+            border_width=1,
+            fg_color="white",
+            border_color="#D3D3D3",
+            corner_radius=15,
+        )
+        self.quantity_frame.grid(row=0, column=1, sticky="e", ipadx=10, ipady=5)
+
+    def set_line(self, line):
+        """Show another cart line in this row (used when list rows are recycled)."""
+        quantity, item = line
+        self.item_frame.set_item(item)
+        self.quantity_frame.set_data(quantity, item.price)
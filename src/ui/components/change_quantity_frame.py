@@ -1,7 +1,6 @@
-from customtkinter import CTkButton, CTkEntry, CTkFrame, CTkImage, CTkLabel, StringVar
-from PIL import Image
+from customtkinter import CTkButton, CTkEntry, CTkFrame, CTkLabel, StringVar
 
-from src.utils.paths import get_image_path
+from src.utils.assets import asset_registry
 
 
 class ChangeQuantityFrame(CTkFrame):
@@ -20,19 +19,16 @@ class ChangeQuantityFrame(CTkFrame):
             self.grid_columnconfigure(0, weight=1)
             self.grid_rowconfigure((0, 1, 2), weight=1)
 
-        # Load images for buttons using CTkImage
-        minus_img = Image.open(get_image_path("minus.png"))
-        self.minus_image = CTkImage(light_image=minus_img, dark_image=minus_img, size=(20, 20))
+        # Load images for buttons from the asset registry
+        self.minus_image = asset_registry.image("minus.png", (20, 20))
 
-        add_img = Image.open(get_image_path("add.png"))
-        self.add_image = CTkImage(light_image=add_img, dark_image=add_img, size=(20, 20))
+        self.add_image = asset_registry.image("add.png", (20, 20))
 
         vcmd = (self.register(self.validate_entry), "%P")
         self.data = StringVar(value="0")
 
         if icon_name:
-            icon_img = Image.open(get_image_path(icon_name))
-            self.icon_image = CTkImage(light_image=icon_img, dark_image=icon_img, size=(40, 40))
+            self.icon_image = asset_registry.image(icon_name, (40, 40))
             self.icon_label = CTkLabel(self, text="", width=40, height=40, image=self.icon_image)
             self.icon_label.grid(row=0, column=0, padx=(10, 0), sticky="w")
 
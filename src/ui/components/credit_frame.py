@@ -1,7 +1,6 @@
-from customtkinter import CTkButton, CTkEntry, CTkFrame, CTkImage, CTkLabel, StringVar
-from PIL import Image
+from customtkinter import CTkButton, CTkEntry, CTkFrame, CTkLabel, StringVar
 
-from src.utils.paths import get_image_path
+from src.utils.assets import asset_registry
 
 
 class CreditFrame(CTkFrame):
@@ -16,15 +15,12 @@ class CreditFrame(CTkFrame):
         self.grid_columnconfigure(3, weight=0)
         self.grid_rowconfigure(0, weight=1)
 
-        # Load images for buttons using CTkImage
-        credit_img = Image.open(get_image_path("credit.png"))
-        self.credit_image = CTkImage(light_image=credit_img, dark_image=credit_img, size=(40, 40))
+        # Load images for buttons from the asset registry
+        self.credit_image = asset_registry.image("credit.png", (40, 40))
 
-        minus_img = Image.open(get_image_path("minus.png"))
-        self.minus_image = CTkImage(light_image=minus_img, dark_image=minus_img, size=(30, 30))
+        self.minus_image = asset_registry.image("minus.png", (30, 30))
 
-        add_img = Image.open(get_image_path("add.png"))
-        self.add_image = CTkImage(light_image=add_img, dark_image=add_img, size=(30, 30))
+        self.add_image = asset_registry.image("add.png", (30, 30))
 
         self.credit_label = CTkLabel(self, text="", width=40, height=40, image=self.credit_image)
         self.credit_label.grid(row=0, column=0, padx=(10, 0), sticky="w")
@@ -3,11 +3,10 @@
 import tkinter as tk
 from typing import Optional
 
-from customtkinter import CTkFrame, CTkImage, CTkLabel
-from PIL import Image
+from customtkinter import CTkFrame, CTkLabel
 
 from src.logmgr import logger
-from src.utils.paths import get_image_path
+from src.utils.assets import asset_registry
 
 
 class DashboardCardFrame(CTkFrame):
@@ -48,9 +47,7 @@ class DashboardCardFrame(CTkFrame):
             if not image_filename.endswith(".png"):
                 image_filename += ".png"
 
-            img_path = get_image_path(image_filename)
-            img = Image.open(img_path)
-            ctk_image = CTkImage(light_image=img, dark_image=img, size=(80, 80))
+            ctk_image = asset_registry.image(image_filename, (80, 80))
 
             image_label = CTkLabel(self, image=ctk_image, text="")
             image_label.grid(row=0, column=0, rowspan=2, padx=10, pady=10, sticky="nsew")
@@ -77,12 +74,18 @@ class DashboardCardFrame(CTkFrame):
             title_label.grid(row=0, column=1, rowspan=2, sticky="w", padx=10)
 
         # Display value if present
+        self.value_label: Optional[CTkLabel] = None
         if value:
-            value_label = CTkLabel(
+            self.value_label = CTkLabel(
                 self,
                 text=str(value),
                 font=("Inter", 22, "bold"),
                 text_color="black",
                 anchor="n",
             )
-            value_label.grid(row=1, column=1, sticky="nw", padx=10, pady=(2, 10))
+            self.value_label.grid(row=1, column=1, sticky="nw", padx=10, pady=(2, 10))
+
+    def set_value(self, value: str) -> None:
+        """Update the displayed value of a card created with a value."""
+        if self.value_label is not None:
+            self.value_label.configure(text=str(value))
@@ -1,10 +1,9 @@
 """Reusable screen heading with back (and optional delete) action."""
 
-from customtkinter import CTkButton, CTkFrame, CTkImage, CTkLabel
-from PIL import Image
+from customtkinter import CTkButton, CTkFrame, CTkLabel
 
 from src.logmgr import logger
-from src.utils.paths import get_image_path
+from src.utils.assets import asset_registry
 
 
 class HeadingFrame(CTkFrame):
@@ -29,9 +28,8 @@ class HeadingFrame(CTkFrame):
         self.grid_columnconfigure((0, 1, 2), weight=1)
         self.grid_rowconfigure(0, weight=1)
 
-        # Load the back button image using CTkImage
-        back_image = Image.open(get_image_path("back.png"))
-        self.back_image = CTkImage(light_image=back_image, dark_image=back_image, size=(42, 32))
+        # Load the back button image from the asset registry
+        self.back_image = asset_registry.image("back.png", (42, 32))
 
         # Create the back button - aligned to left edge
         self.back_button = CTkButton(
@@ -56,11 +54,8 @@ class HeadingFrame(CTkFrame):
         self.heading_label.grid(row=0, column=1)
 
         if delete_button_function:
-            # Load the delete button image using CTkImage
-            delete_image = Image.open(get_image_path("delete.png"))
-            self.delete_image = CTkImage(
-                light_image=delete_image, dark_image=delete_image, size=(30, 35)
-            )
+            # Load the delete button image from the asset registry
+            self.delete_image = asset_registry.image("delete.png", (30, 35))
 
             # Create the delete button - aligned to right edge
             self.delete_button = CTkButton(
@@ -75,6 +70,10 @@ class HeadingFrame(CTkFrame):
             )
             self.delete_button.grid(row=0, column=2, sticky="e")
 
+    def set_back_button_function(self, back_button_function) -> None:
+        """Replace the back action, e.g. when a cached screen is shown from elsewhere."""
+        self._back_button_function = back_button_function
+
     def _on_back_pressed(self) -> None:
         fn = self._back_button_function
         fn_name = getattr(fn, "__qualname__", repr(fn))
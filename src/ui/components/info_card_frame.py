@@ -1,14 +1,18 @@
-from io import BytesIO
-from typing import Optional
+from functools import lru_cache
+from typing import Callable, Optional
 
 from customtkinter import CTkFrame, CTkImage, CTkLabel
 from PIL import Image
 
+from src.ui.image_loader import image_loader
+
 
 class InfoCardFrame(CTkFrame):
     """
     A generic frame for displaying an image (left) and two lines of text (right).
-    Used for Items and Users in lists.
+    Used for Items and Users in lists. Images are never decoded here, on the Tk
+    thread: pass a shared `image` (an asset), a pre-scaled `thumbnail`, or load
+    one with `load_thumbnail`.
     """
 
     def __init__(
@@ -16,8 +20,8 @@ class InfoCardFrame(CTkFrame):
         master,
         title: str,
         subtitle: str,
-        image_data: Optional[bytes] = None,
-        image_path: Optional[str] = None,
+        thumbnail: Optional[Image.Image] = None,
+        image: Optional[CTkImage] = None,
         *args,
         **kwargs
     ):
@@ -25,44 +29,79 @@ class InfoCardFrame(CTkFrame):
 
         # Image handling
         ctk_image = None
-        if image_data:
-            try:
-                image_bytes = BytesIO(image_data)
-                image_pil = Image.open(image_bytes)
-                ctk_image = CTkImage(light_image=image_pil, dark_image=image_pil, size=(60, 60))
-            except (OSError, ValueError):
-                pass  # Fallback to empty
-        elif image_path:
-            try:
-                image_pil = Image.open(image_path)
-                ctk_image = CTkImage(light_image=image_pil, dark_image=image_pil, size=(60, 60))
-            except (OSError, ValueError):
-                pass
+        if image is not None:
+            # Shared image, e.g. a static asset
+            ctk_image = image
+        elif thumbnail is not None:
+            # Already scaled to the card size, no decoding needed
+            ctk_image = CTkImage(light_image=thumbnail, dark_image=thumbnail, size=(60, 60))
 
         # Image Label
         if ctk_image:
-            image_label = CTkLabel(self, image=ctk_image, text="")
+            self.image_label = CTkLabel(self, image=ctk_image, text="")
         else:
-            image_label = CTkLabel(self, text="")
+            self.image_label = CTkLabel(self, text="")
 
-        image_label.grid(row=0, column=0, rowspan=2, padx=10, pady=10)
+        self.image_label.grid(row=0, column=0, rowspan=2, padx=10, pady=10)
 
         # Title (Top Line)
-        title_label = CTkLabel(
+        self.title_label = CTkLabel(
             self,
             text=title,
             font=("Arial", 16, "bold"),
             text_color="black",
             anchor="s",
         )
-        title_label.grid(row=0, column=1, sticky="sw", padx=10, pady=5)
+        self.title_label.grid(row=0, column=1, sticky="sw", padx=10, pady=5)
 
         # Subtitle (Bottom Line)
-        subtitle_label = CTkLabel(
+        self.subtitle_label = CTkLabel(
             self,
             text=subtitle,
             font=("Arial", 14),
             text_color="black",
             anchor="n",
         )
-        subtitle_label.grid(row=1, column=1, sticky="nw", padx=10, pady=5)
+        self.subtitle_label.grid(row=1, column=1, sticky="nw", padx=10, pady=5)
+
+    def set_text(self, title: str, subtitle: str) -> None:
+        """Replace both text lines, e.g. when the card is recycled for another row."""
+        self.title_label.configure(text=title)
+        self.subtitle_label.configure(text=subtitle)
+
+    def set_thumbnail(self, thumbnail: Optional[Image.Image]) -> None:
+        """Replace the image with a pre-scaled thumbnail, or a blank one if None."""
+        if thumbnail is None:
+            # Tk keeps showing the previous image if it is only unset
+            thumbnail = _blank_thumbnail()
+        ctk_image = CTkImage(light_image=thumbnail, dark_image=thumbnail, size=(60, 60))
+        self.image_label.configure(image=ctk_image)
+
+    def load_thumbnail(
+        self,
+        cached: Optional[Image.Image],
+        load: Optional[Callable[[], Optional[Image.Image]]],
+    ) -> None:
+        """Show `cached` right away, else a placeholder until `load()` returned on a worker.
+
+        Without `load` the card has no image.
+        """
+        if cached is None and load is not None:
+            self.image_label.configure(image=_placeholder_image())
+        image_loader.request(self, self.set_thumbnail, load, cached=cached)
+
+    def destroy(self):
+        image_loader.cancel(self)
+        super().destroy()
+
+
+@lru_cache(maxsize=1)
+def _blank_thumbnail() -> Image.Image:
+    return Image.new("RGBA", (60, 60), (0, 0, 0, 0))
+
+
+@lru_cache(maxsize=1)
+def _placeholder_image() -> CTkImage:
+    # Shown while the thumbnail loads; the same size, so the text does not move
+    placeholder = Image.new("RGBA", (60, 60), (230, 230, 230, 255))
+    return CTkImage(light_image=placeholder, dark_image=placeholder, size=(60, 60))
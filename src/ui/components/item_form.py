@@ -18,7 +18,7 @@ from src.logmgr import logger
 from src.ui.components.Barcode import AddBarcodeFrame
 from src.ui.components.change_quantity_frame import ChangeQuantityFrame
 from src.ui.components.Message import ShowMessage
-from src.utils.paths import get_image_path
+from src.utils.assets import asset_registry
 
 
 class ItemForm(CTkFrame):
@@ -50,11 +50,7 @@ class ItemForm(CTkFrame):
         self.configure(fg_color="transparent")
 
         # Load the image using CTkImage
-        upload_image_path = get_image_path("upload.png")
-        upload_image = Image.open(upload_image_path)
-        self.upload_icon = CTkImage(
-            light_image=upload_image, dark_image=upload_image, size=(80, 80)
-        )
+        self.upload_icon = asset_registry.image("upload.png", (80, 80))
 
         # Image Button
         self.image_button = CTkButton(
@@ -230,7 +226,9 @@ class ItemForm(CTkFrame):
             "file_path": self.file_path,
         }
 
-    def set_data(self, name, price, quantity, barcode, category=None, image_data=None):
+    def set_data(
+        self, name, price, quantity, barcode, category=None, image_data=None, thumbnail=None
+    ):
         self.name_entry.delete(0, "end")
         self.name_entry.insert(0, name)
 
@@ -244,7 +242,13 @@ class ItemForm(CTkFrame):
         if category:
             self.category_dropdown.set(category)
 
-        if image_data:
+        if thumbnail is not None:
+            # Pre-scaled rendition from the thumbnail cache, no decoding needed
+            self.uploaded_image = CTkImage(
+                light_image=thumbnail, dark_image=thumbnail, size=(100, 100)
+            )
+            self.image_button.configure(image=self.uploaded_image)
+        elif image_data:
             try:
                 with BytesIO(image_data) as image_bytes:
                     with Image.open(image_bytes) as img:
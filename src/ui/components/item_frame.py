@@ -1,9 +1,26 @@
+from src.database import ItemImage, session_scope
 from src.ui.components.info_card_frame import InfoCardFrame
+from src.utils.thumbnails import LIST_SIZE, thumbnail_cache
+
+
+def _load_image(image_hash: str):
+    with session_scope() as session:
+        return ItemImage.get_data(session, image_hash)
+
+
+def _get_thumbnail(data):
+    # Rows render the pre-scaled thumbnail; the original image is only
+    # loaded if no rendition exists yet. Runs on an image worker.
+    return thumbnail_cache.get(
+        data.id,
+        data.image_hash,
+        LIST_SIZE,
+        load_data=lambda: _load_image(data.image_hash),
+    )
 
 
 class ItemFrame(InfoCardFrame):
     def __init__(self, master, data, *args, **kwargs):
-        item_image = data.image
         item_name = data.name
         item_price = data.price
 
@@ -11,7 +28,21 @@ class ItemFrame(InfoCardFrame):
             master,
             title=item_name,
             subtitle=f"{item_price:.2f}€",
-            image_data=item_image,
             *args,
             **kwargs,
         )
+        self._show_thumbnail(data)
+
+    def set_item(self, data):
+        """Show another item in this card (used when list rows are recycled)."""
+        self.set_text(data.name, f"{data.price:.2f}€")
+        self._show_thumbnail(data)
+
+    def _show_thumbnail(self, data):
+        if not data.image_hash:
+            self.load_thumbnail(None, None)
+            return
+        self.load_thumbnail(
+            thumbnail_cache.peek(data.id, data.image_hash, LIST_SIZE),
+            lambda: _get_thumbnail(data),
+        )
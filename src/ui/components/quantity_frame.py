@@ -2,10 +2,9 @@
 
 import tkinter as tk
 
-from customtkinter import CTkButton, CTkEntry, CTkFrame, CTkImage
-from PIL import Image
+from customtkinter import CTkButton, CTkEntry, CTkFrame
 
-from src.utils.paths import get_image_path
+from src.utils.assets import asset_registry
 
 
 class QuantityFrame(CTkFrame):
@@ -20,12 +19,10 @@ class QuantityFrame(CTkFrame):
         self.grid_columnconfigure((0, 1, 2), weight=1)
         self.grid_rowconfigure((0), weight=1)
 
-        # Load images for buttons using CTkImage
-        add_image = Image.open(get_image_path("add.png"))
-        self.add_photo = CTkImage(light_image=add_image, dark_image=add_image, size=(30, 30))
+        # Load images for buttons from the asset registry
+        self.add_photo = asset_registry.image("add.png", (30, 30))
 
-        minus_image = Image.open(get_image_path("minus.png"))
-        self.minus_photo = CTkImage(light_image=minus_image, dark_image=minus_image, size=(30, 30))
+        self.minus_photo = asset_registry.image("minus.png", (30, 30))
 
         # Create and place the decrement button
         self.decrement_button = CTkButton(
@@ -69,6 +66,12 @@ class QuantityFrame(CTkFrame):
         )
         self.increment_button.grid(row=0, column=2, padx=(0, 10))
 
+    def set_data(self, data, item_price: float):
+        """Bind the selector to another cart line's quantity variable."""
+        self.data = data
+        self.item_price = item_price
+        self.entry.configure(textvariable=self.data)
+
     def increment(self):
         try:
             value = self.data.get()
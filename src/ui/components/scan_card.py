@@ -1,13 +1,12 @@
 """NFC scan prompt component."""
 
-from customtkinter import CTkButton, CTkFrame, CTkImage, CTkLabel
-from PIL import Image
+from customtkinter import CTkButton, CTkFrame, CTkLabel
 
 from src.localization.translator import get_translations
 from src.logmgr import logger
 from src.nfc_reader import NFCReader
 from src.ui.components.heading_frame import HeadingFrame
-from src.utils.paths import get_image_path
+from src.utils.assets import asset_registry
 
 
 class ScanCardFrame(CTkFrame):
@@ -49,15 +48,11 @@ class ScanCardFrame(CTkFrame):
         )
         self.heading_frame.grid(row=0, column=0, padx=20, pady=(20, 0), sticky="new")
 
-        # Load images using CTkImage
-        arrow_image = Image.open(get_image_path("arrow.png"))
-        self.bottom_image = CTkImage(light_image=arrow_image, dark_image=arrow_image, size=(60, 60))
+        # Load images from the asset registry
+        self.bottom_image = asset_registry.image("arrow.png", (60, 60))
 
-        # Load icon for the button using CTkImage
-        button_icon_image = Image.open(get_image_path("Card.png"))
-        self.button_icon = CTkImage(
-            light_image=button_icon_image, dark_image=button_icon_image, size=(105, 90)
-        )
+        # Load icon for the button from the asset registry
+        self.button_icon = asset_registry.image("Card.png", (105, 90))
 
         # Create and place the scan card button
         self.scan_card_button = CTkButton(
@@ -0,0 +1,117 @@
+"""Search bar of the admin listings.
+
+A search entry, an optional filter menu (e.g. the item categories) and a sort
+menu in one row. `on_change(query, filter_value, sort)` fires whenever one of
+them changes; `filter_value` is None while "all" is selected. Keystrokes are
+coalesced until Tk is idle, so a barcode scanner typing into the entry causes
+one search, not one per digit.
+"""
+
+from typing import Callable, Optional, Sequence
+
+from customtkinter import CTkEntry, CTkFrame, CTkOptionMenu
+
+_MENU_STYLE = {
+    "height": 40,
+    "font": ("Inter", 16, "bold"),
+    "dropdown_fg_color": "#2B2B2B",
+    "dropdown_text_color": "white",
+    "dropdown_hover_color": "#575757",
+    "dropdown_font": ("Inter", 16, "bold"),
+}
+
+
+class SearchBar(CTkFrame):
+    """Search entry with filter and sort menus."""
+
+    def __init__(
+        self,
+        parent,
+        placeholder: str,
+        sort_options: Sequence[str],
+        on_change: Callable[[str, Optional[str], str], None],
+        *args,
+        filter_all: Optional[str] = None,
+        **kwargs,
+    ):
+        super().__init__(parent, *args, **kwargs)
+
+        self.on_change = on_change
+        self.filter_all = filter_all
+        self._pending = None
+
+        self.configure(fg_color="transparent")
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.entry = CTkEntry(
+            self,
+            placeholder_text=placeholder,
+            height=40,
+            corner_radius=10,
+            font=("Inter", 16, "bold"),
+        )
+        self.entry.grid(row=0, column=0, sticky="ew")
+        self.entry.bind("<KeyRelease>", lambda _event: self._schedule(), add="+")
+
+        self.filter_menu: Optional[CTkOptionMenu] = None
+        if filter_all is not None:
+            self.filter_menu = CTkOptionMenu(
+                self,
+                values=[filter_all],
+                width=170,
+                command=lambda _value: self._schedule(),
+                **_MENU_STYLE,
+            )
+            self.filter_menu.grid(row=0, column=1, padx=(10, 0), sticky="e")
+
+        self.sort_menu = CTkOptionMenu(
+            self,
+            values=list(sort_options),
+            width=140,
+            command=lambda _value: self._schedule(),
+            **_MENU_STYLE,
+        )
+        self.sort_menu.grid(row=0, column=2, padx=(10, 0), sticky="e")
+
+    @property
+    def query(self) -> str:
+        """The text in the search entry."""
+        return self.entry.get()
+
+    @property
+    def filter_value(self) -> Optional[str]:
+        """The selected filter value, None for "all"."""
+        if self.filter_menu is None:
+            return None
+        value = self.filter_menu.get()
+        return None if value == self.filter_all else value
+
+    @property
+    def sort(self) -> str:
+        """The selected sort option."""
+        return self.sort_menu.get()
+
+    def set_filter_values(self, values: Sequence[str]) -> None:
+        """Offer `values` in the filter menu; a selection that is gone falls back to "all"."""
+        if self.filter_menu is None:
+            return
+        selected = self.filter_value
+        self.filter_menu.configure(values=[self.filter_all, *values])
+        if selected is not None and selected not in values:
+            self.filter_menu.set(self.filter_all)
+            self._schedule()
+
+    def _schedule(self) -> None:
+        if self._pending is None:
+            self._pending = self.after_idle(self._fire)
+
+    def _fire(self) -> None:
+        self._pending = None
+        self.on_change(self.query, self.filter_value, self.sort)
+
+    def destroy(self):
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+            self._pending = None
+        super().destroy()
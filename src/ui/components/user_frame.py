@@ -1,6 +1,6 @@
 from src.localization.translator import get_translations
 from src.ui.components.info_card_frame import InfoCardFrame
-from src.utils.paths import get_image_path
+from src.utils.assets import asset_registry
 
 
 class UserFrame(InfoCardFrame):
@@ -12,7 +12,15 @@ class UserFrame(InfoCardFrame):
             master,
             title=user_name,
             subtitle=self.translations["user"]["credit_balance"].format(user_credit=user_credit),
-            image_path=get_image_path("user-big.png"),
+            image=asset_registry.image("user-big.png", (60, 60)),
             *args,
             **kwargs
         )
+
+    def set_user(self, data):
+        """Show another user in this card (used when list rows are recycled)."""
+        _, user_name, user_credit = data
+        self.set_text(
+            user_name,
+            self.translations["user"]["credit_balance"].format(user_credit=user_credit),
+        )
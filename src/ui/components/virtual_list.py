@@ -0,0 +1,277 @@
+"""Virtualized list component.
+
+Building one widget tree per row up front makes long listings slow to open and
+memory hungry on the Pi. `VirtualList` only keeps the row widgets for the
+visible window, recycles them while scrolling and handles clicks, wheel and
+touch-drag scrolling through one set of delegated bindings.
+
+Rows have a fixed height. The caller provides two callbacks:
+
+- ``create_row(master, item)`` builds a row widget showing ``item``
+- ``bind_row(row, item)`` updates an existing row widget to show ``item``
+
+`on_select` fires on button release, not press, so the touch that switched to
+a screen cannot immediately select a row on it.
+
+The window, pool-slot and offset arithmetic are plain functions, so they are
+tested without a display.
+"""
+
+import math
+import tkinter as tk
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from customtkinter import CTkFrame, CTkScrollbar
+
+
+def pool_size(viewport_height: float, row_height: int) -> int:
+    """Rows needed to cover the viewport at any offset: a partly scrolled row at each edge."""
+    return math.ceil(viewport_height / row_height) + 1
+
+
+def pool_slot(index: int, size: int) -> int:
+    """Pool slot of the row showing item `index`; consecutive items never share one."""
+    return index % size
+
+
+def visible_range(offset: float, row_height: int, size: int, item_count: int) -> range:
+    """Indexes of the items the pool of `size` rows shows at `offset`."""
+    first = int(offset // row_height)
+    return range(first, min(item_count, first + size))
+
+
+def clamp_offset(offset: float, content_height: float, viewport_height: float) -> float:
+    """Keep the offset between the top and the last full page of the content."""
+    return min(max(0.0, offset), max(0.0, content_height - viewport_height))
+
+
+def offset_to_show(index: int, row_height: int, offset: float, viewport_height: float) -> float:
+    """Offset that makes item `index` fully visible with the least scrolling."""
+    top = index * row_height
+    bottom = top + row_height
+    if top < offset:
+        return top
+    if bottom > offset + viewport_height:
+        return bottom - viewport_height
+    return offset
+
+
+def index_at(y: float, offset: float, row_height: int, item_count: int) -> Optional[int]:
+    """Index of the item at `y` pixels below the top of the viewport, None below the last."""
+    index = int((offset + y) // row_height)
+    return index if 0 <= index < item_count else None
+
+
+class VirtualList(CTkFrame):
+    """Scrollable list that renders only the visible rows and recycles them."""
+
+    # Pointer travel (in px) after which a press is treated as a drag, not a click
+    DRAG_THRESHOLD = 10
+    WHEEL_STEP = 40
+
+    def __init__(
+        self,
+        master,
+        row_height: int,
+        create_row: Callable[[Any, Any], Any],
+        bind_row: Callable[[Any, Any], None],
+        *args,
+        on_select: Optional[Callable[[Any], None]] = None,
+        row_padding: int = 10,
+        **kwargs,
+    ):
+        super().__init__(master, *args, **kwargs)
+
+        self.row_height = row_height
+        self.row_padding = row_padding
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.on_select = on_select
+
+        self._items: List[Any] = []
+        self._offset: float = 0.0
+        self._rows: List[Any] = []
+        # Plain Tk frames around the rows; CTk widgets cannot be placed with a size
+        self._holders: List[tk.Frame] = []
+        # Index of the item each pooled row currently shows
+        self._row_index: List[Optional[int]] = []
+
+        self._press_y: Optional[int] = None
+        self._press_offset: float = 0.0
+        self._dragging = False
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self._viewport = CTkFrame(self, fg_color=self.cget("fg_color"), corner_radius=0)
+        self._viewport.grid(row=0, column=0, sticky="nsew")
+
+        self._scrollbar = CTkScrollbar(self, orientation="vertical", command=self.yview)
+        self._scrollbar.grid(row=0, column=1, sticky="ns", padx=(0, 4), pady=4)
+
+        # All row widgets carry this bind tag, so each event is bound once for the list
+        self._bind_tag = f"VirtualList{id(self)}"
+        self._bind_delegated(self._viewport)
+        self.bind_class(self._bind_tag, "<ButtonPress-1>", self._on_press)
+        self.bind_class(self._bind_tag, "<B1-Motion>", self._on_drag)
+        self.bind_class(self._bind_tag, "<ButtonRelease-1>", self._on_release)
+        self.bind_class(self._bind_tag, "<MouseWheel>", self._on_mousewheel)
+        self.bind_class(self._bind_tag, "<Button-4>", self._on_mousewheel)
+        self.bind_class(self._bind_tag, "<Button-5>", self._on_mousewheel)
+
+        self._viewport.bind("<Configure>", lambda _event: self._render(), add="+")
+
+    @property
+    def items(self) -> List[Any]:
+        """The items currently shown by the list."""
+        return self._items
+
+    def set_items(self, items: Sequence[Any]) -> None:
+        """Replace the shown items, keeping the scroll position where possible."""
+        self._items = list(items)
+        self._row_index = [None] * len(self._rows)
+        self._offset = self._clamp(self._offset)
+        self._render()
+
+    def refresh(self, index: Optional[int] = None) -> None:
+        """Re-bind one visible row (or all of them) after its item changed in place."""
+        for slot, row_index in enumerate(self._row_index):
+            if index is None or row_index == index:
+                self._row_index[slot] = None
+        self._render()
+
+    def scroll_to(self, index: int) -> None:
+        """Scroll the minimum distance needed to make an item fully visible."""
+        self._set_offset(
+            offset_to_show(index, self.row_height, self._offset, self._viewport_height())
+        )
+
+    def yview(self, *args) -> None:
+        """Scrollbar protocol (``moveto``/``scroll``), mirroring Tk's yview."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._set_offset(float(args[1]) * self._content_height())
+        elif args[0] == "scroll":
+            step = self._viewport_height() if args[2] == "pages" else self.row_height
+            self._set_offset(self._offset + int(args[1]) * step)
+
+    def _content_height(self) -> int:
+        return len(self._items) * self.row_height
+
+    def _viewport_height(self) -> float:
+        # winfo_* reports device pixels, row placement uses unscaled CTk units
+        return self._viewport.winfo_height() / self._get_widget_scaling()
+
+    def _clamp(self, offset: float) -> float:
+        return clamp_offset(offset, self._content_height(), self._viewport_height())
+
+    def _set_offset(self, offset: float) -> None:
+        offset = self._clamp(offset)
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def _bind_delegated(self, widget) -> None:
+        """Add the list's bind tag to a widget and all of its descendants."""
+        tags = widget.bindtags()
+        if self._bind_tag not in tags:
+            widget.bindtags(tags + (self._bind_tag,))
+        for child in widget.winfo_children():
+            self._bind_delegated(child)
+
+    def _ensure_pool(self, size: int) -> None:
+        """Grow the row pool to `size` rows; rows are never destroyed while the list lives."""
+        while len(self._rows) < size and len(self._rows) < len(self._items):
+            index = len(self._rows)
+            holder = tk.Frame(
+                self._viewport,
+                bg=self._apply_appearance_mode(self._viewport.cget("fg_color")),
+                borderwidth=0,
+                highlightthickness=0,
+            )
+            row = self.create_row(holder, self._items[index])
+            row.pack(fill="both", expand=True)
+            self._bind_delegated(holder)
+            self._holders.append(holder)
+            self._rows.append(row)
+            self._row_index.append(index)
+        # Slots are assigned by index modulo pool size; growing invalidates them
+        if len(self._row_index) != len(self._rows) or any(
+            row_index is not None and pool_slot(row_index, len(self._rows)) != slot
+            for slot, row_index in enumerate(self._row_index)
+        ):
+            self._row_index = [None] * len(self._rows)
+
+    def _render(self) -> None:
+        viewport_height = self._viewport_height()
+        self._ensure_pool(pool_size(viewport_height, self.row_height))
+
+        scaling = self._get_widget_scaling()
+        shown: Dict[int, int] = {}
+        for index in visible_range(
+            self._offset, self.row_height, len(self._rows), len(self._items)
+        ):
+            slot = pool_slot(index, len(self._rows))
+            row = self._rows[slot]
+            if self._row_index[slot] != index:
+                self.bind_row(row, self._items[index])
+                self._row_index[slot] = index
+            self._holders[slot].place(
+                x=round(self.row_padding * scaling),
+                y=round((index * self.row_height - self._offset + self.row_padding) * scaling),
+                relwidth=1.0,
+                width=-round(2 * self.row_padding * scaling),
+                height=round((self.row_height - 2 * self.row_padding) * scaling),
+            )
+            shown[slot] = index
+
+        for slot, holder in enumerate(self._holders):
+            if slot not in shown:
+                holder.place_forget()
+
+        content_height = self._content_height()
+        if content_height <= 0:
+            self._scrollbar.set(0.0, 1.0)
+        else:
+            self._scrollbar.set(
+                self._offset / content_height,
+                min(1.0, (self._offset + viewport_height) / content_height),
+            )
+
+    def _index_at(self, y_root: int) -> Optional[int]:
+        y = (y_root - self._viewport.winfo_rooty()) / self._get_widget_scaling()
+        return index_at(y, self._offset, self.row_height, len(self._items))
+
+    def _on_press(self, event) -> None:
+        self._press_y = event.y_root
+        self._press_offset = self._offset
+        self._dragging = False
+
+    def _on_drag(self, event) -> None:
+        if self._press_y is None:
+            return
+        distance = event.y_root - self._press_y
+        if not self._dragging and abs(distance) < self.DRAG_THRESHOLD:
+            return
+        self._dragging = True
+        self._set_offset(self._press_offset - distance / self._get_widget_scaling())
+
+    def _on_release(self, event) -> None:
+        was_click = self._press_y is not None and not self._dragging
+        self._press_y = None
+        self._dragging = False
+        if not was_click or self.on_select is None:
+            return
+        index = self._index_at(event.y_root)
+        if index is not None:
+            self.on_select(self._items[index])
+
+    def _on_mousewheel(self, event) -> None:
+        if event.num == 4:
+            steps = -1
+        elif event.num == 5:
+            steps = 1
+        else:
+            steps = -1 if event.delta > 0 else 1
+        self._set_offset(self._offset + steps * self.WHEEL_STEP)
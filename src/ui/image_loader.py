@@ -0,0 +1,252 @@
+"""Background loading of card images.
+
+Item cards (list and cart rows) read their thumbnail while they were built or
+re-bound, on the Tk thread: from the memory cache if possible, else from the
+PNG on disk or, for old items, by decoding the original photo from the
+database. A screen with many cards stalled until all of them were decoded.
+
+A card now shows its image right away only if it is in memory; otherwise it
+shows a placeholder and `image_loader.request` loads the image on a small pool
+of worker threads:
+
+- Requests made while handling one event are queued together once Tk is idle,
+  ordered by the position of their card on the screen, so the visible cards
+  load first, top to bottom, and the spare row below the list comes last.
+- Results are collected by polling with `after()` and applied on the Tk
+  thread in the same order, a few per poll, so the screen stays responsive.
+- A new request for a card replaces its pending one, e.g. when a list row is
+  recycled while scrolling. When the navigator switches screens all pending
+  requests are cancelled; those of a cached screen are resumed when it is
+  shown again.
+
+The wait from request to image is logged at debug level and summarized on
+shutdown. `ui.image_workers` sets the number of workers.
+"""
+
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from heapq import heappop, heappush
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from src.logmgr import logger
+
+DEFAULT_WORKERS = 2
+
+POLL_INTERVAL_MS = 20
+
+# Results applied per poll; the rest follows with the next one
+MAX_APPLY_PER_POLL = 8
+
+Loader = Callable[[], Optional[Image.Image]]
+Applier = Callable[[Optional[Image.Image]], None]
+
+
+@dataclass(eq=False)
+class ImageRequest:
+    """One image to load for one card."""
+
+    card: Any
+    load: Loader
+    apply: Applier
+    requested: float
+    priority: int = 0
+    cancelled: bool = False
+
+
+@dataclass
+class LoadStats:
+    """Accumulated image requests and their waits."""
+
+    requested: int = 0
+    cached: int = 0
+    loaded: int = 0
+    cancelled: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+
+    def add_wait(self, wait_ms: float) -> None:
+        """Record one image applied after loading."""
+        self.loaded += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+
+class ImageLoader:  # pylint: disable=too-many-instance-attributes
+    """Loads card images on worker threads and applies them on the Tk thread.
+
+    All methods except the workers' run on the Tk thread.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS) -> None:
+        self.root = None
+        self.workers = workers
+        self.stats = LoadStats()
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._results: queue.SimpleQueue = queue.SimpleQueue()
+        self._threads: List[threading.Thread] = []
+        self._sequence = itertools.count()
+        # id(card) -> its pending request
+        self._pending: Dict[int, ImageRequest] = {}
+        # id(card) -> request cancelled by a screen change, until the screen is shown again
+        self._parked: Dict[int, ImageRequest] = {}
+        self._batch: List[ImageRequest] = []
+        self._ready: List[Tuple[int, int, ImageRequest, Optional[Image.Image]]] = []
+        self._flush_after = None
+        self._poll_after = None
+
+    def attach(self, root, workers: Optional[int] = None) -> None:
+        """Schedule the deliveries on `root`."""
+        self.root = root
+        if workers is not None:
+            self.workers = max(1, int(workers))
+        logger.info("Card images are loaded by %d workers", self.workers)
+
+    def request(
+        self, card, apply: Applier, load: Optional[Loader], cached: Optional[Image.Image] = None
+    ) -> None:
+        """Show an image in `card` with `apply(image)`.
+
+        With `cached` (or nothing to `load`) it is applied right away; else
+        `load()` runs on a worker and its image is applied later. Replaces the
+        card's pending request.
+        """
+        self.cancel(card)
+        self.stats.requested += 1
+        if cached is not None or load is None:
+            self.stats.cached += 1
+            apply(cached)
+            return
+
+        request = ImageRequest(card=card, load=load, apply=apply, requested=time.perf_counter())
+        self._pending[id(card)] = request
+        self._batch.append(request)
+        if self.root is None:
+            self.root = card.winfo_toplevel()
+        if self._flush_after is None:
+            self._flush_after = self.root.after_idle(self._flush)
+
+    def cancel(self, card) -> None:
+        """Drop the pending request of `card`, if any."""
+        self._parked.pop(id(card), None)
+        request = self._pending.pop(id(card), None)
+        if request is not None:
+            request.cancelled = True
+            self.stats.cancelled += 1
+
+    def cancel_all(self) -> None:
+        """Cancel every pending request, e.g. because the screen changes."""
+        for key, request in self._pending.items():
+            request.cancelled = True
+            self.stats.cancelled += 1
+            self._parked[key] = request
+        self._pending.clear()
+
+    def resume(self, screen) -> None:
+        """Request the images of `screen` again that were cancelled when it was left."""
+        prefix = f"{screen}."
+        for key, request in list(self._parked.items()):
+            if not request.card.winfo_exists():
+                del self._parked[key]
+            elif str(request.card).startswith(prefix):
+                del self._parked[key]
+                self.request(request.card, request.apply, request.load)
+
+    def _flush(self) -> None:
+        self._flush_after = None
+        batch, self._batch = self._batch, []
+        # Lay out the cards first, so their position on the screen is known
+        self.root.update_idletasks()
+        for request in batch:
+            if request.cancelled or not request.card.winfo_exists():
+                continue
+            request.priority = request.card.winfo_rooty()
+            self._queue.put((request.priority, next(self._sequence), request))
+        self._start_workers()
+        self._schedule_poll()
+
+    def _start_workers(self) -> None:
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work, name=f"image-worker-{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            _priority, _sequence, request = self._queue.get()
+            if request is None:
+                return
+            if request.cancelled:
+                continue
+            try:
+                image = request.load()
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Loading a card image failed")
+                image = None
+            self._results.put((request, image))
+
+    def _schedule_poll(self) -> None:
+        if self._poll_after is None:
+            self._poll_after = self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self) -> None:
+        self._poll_after = None
+        while True:
+            try:
+                request, image = self._results.get_nowait()
+            except queue.Empty:
+                break
+            heappush(self._ready, (request.priority, next(self._sequence), request, image))
+
+        applied = 0
+        while self._ready and applied < MAX_APPLY_PER_POLL:
+            _priority, _sequence, request, image = heappop(self._ready)
+            if request.cancelled or not request.card.winfo_exists():
+                continue
+            del self._pending[id(request.card)]
+            request.apply(image)
+            applied += 1
+            wait_ms = (time.perf_counter() - request.requested) * 1000
+            self.stats.add_wait(wait_ms)
+            logger.debug("Card image applied after %.1f ms", wait_ms)
+
+        if self._pending:
+            self._schedule_poll()
+        else:
+            # Only cancelled results are left
+            self._ready.clear()
+
+    def report(self) -> None:
+        """Log the accumulated requests and waits."""
+        stats = self.stats
+        logger.info(
+            "Card images: %d requested, %d from memory, %d loaded "
+            "(avg wait %.1f ms, max %.1f ms), %d cancelled",
+            stats.requested,
+            stats.cached,
+            stats.loaded,
+            stats.total_wait_ms / stats.loaded if stats.loaded else 0.0,
+            stats.max_wait_ms,
+            stats.cancelled,
+        )
+
+    def shutdown(self) -> None:
+        """Stop the workers; queued requests are dropped."""
+        self.cancel_all()
+        self._parked.clear()
+        for _thread in self._threads:
+            # Sorts after every request
+            self._queue.put((float("inf"), next(self._sequence), None))
+        self._threads = []
+
+
+# Process-wide image loader instance
+image_loader = ImageLoader()
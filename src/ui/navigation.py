@@ -1,28 +1,163 @@
-"""UI navigation helpers.
+"""UI navigation.
 
-This module centralizes navigation utilities for the CustomTkinter UI.
+Screens are direct children of the root window, gridded into the same cell.
+Destroying the current screen on every transition rebuilt each screen from
+scratch on every visit (images opened, widgets created, grids configured).
+The `navigator` keeps the screens it built in a bounded LRU cache instead and
+switches between them with `tkraise`:
 
-- `clear_root` enforces a single-screen model by destroying the current screen.
+- `show(key, factory, **state)` shows the cached screen for `key` or builds it
+  with `factory(root)`. A reused screen gets `on_show(**state)` to refresh its
+  data; a freshly built one got its state from the factory.
+- `show_transient(factory)` builds a screen that is not cached (the forms); it
+  is destroyed when the next screen is shown.
+- The screen that is left gets `on_hide()`, e.g. to stop a reader or to unbind
+  keys. Both hooks are optional. Card images it is still loading are
+  cancelled and resumed when it is shown again (see `image_loader`).
+
+Other children of the root (messages, the scan-card prompt) are destroyed on
+every transition, as before.
+
+Every transition is timed from the call until Tk is idle again, i.e. until the
+new screen is laid out, per screen and split into built and reused screens.
+The times are logged at debug level and summarized on shutdown. With
+`ui.screen_cache_size` set to 0 every screen is rebuilt on every visit, like
+before the cache, so both can be compared on the same device.
 """
 
 from __future__ import annotations
 
+import time
 import tkinter as tk
-from typing import Tuple, Type
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
 
 from src.logmgr import logger
+from src.ui.image_loader import image_loader
+
+DEFAULT_CACHE_SIZE = 5
+
+
+@dataclass
+class TransitionStats:
+    """Accumulated transition times to one screen."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def add(self, elapsed_ms: float) -> None:
+        """Record one transition."""
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+
+class Navigator:
+    """Shows one screen at a time, keeping recently used screens alive."""
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.root = None
+        self.cache_size = cache_size
+        self.current = None
+        # (screen name, built) -> transition times
+        self.stats: Dict[Tuple[str, bool], TransitionStats] = {}
+        self._screens: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def attach(self, root, cache_size: Optional[int] = None) -> None:
+        """Use `root` as the parent of all screens."""
+        self.root = root
+        if cache_size is not None:
+            self.cache_size = max(0, int(cache_size))
+        logger.info("Screen navigation with a cache of %d screens", self.cache_size)
 
+    def show(self, key: Hashable, factory: Callable[[Any], Any], **state) -> Any:
+        """Show the screen cached under `key`, built with `factory(root)` if there is none."""
+        return self._show(key if self.cache_size > 0 else None, factory, state)
 
-def clear_root(parent, keep_types: Tuple[Type, ...] = ()) -> None:
-    """Destroy all direct children of parent except instances of keep_types."""
-    for child in parent.winfo_children():
-        if keep_types and isinstance(child, keep_types):
-            continue
-        try:
-            child.destroy()
-        except (tk.TclError, RuntimeError):
-            logger.exception(
-                "clear_root failed destroying %s#%s",
-                child.__class__.__name__,
-                id(child),
+    def show_transient(self, factory: Callable[[Any], Any]) -> Any:
+        """Build and show a screen that is destroyed when it is left."""
+        return self._show(None, factory, {})
+
+    def _show(self, key: Optional[Hashable], factory: Callable[[Any], Any], state) -> Any:
+        started = time.perf_counter()
+        screen = self._screens.get(key) if key is not None else None
+        if screen is not None and not screen.winfo_exists():
+            del self._screens[key]
+            screen = None
+
+        previous = self.current
+        if previous is not None and previous is not screen and previous.winfo_exists():
+            self._call(previous, "on_hide")
+            # Images still loading for the screen that is left are not needed now
+            image_loader.cancel_all()
+
+        built = screen is None
+        if built:
+            screen = factory(self.root)
+        if key is not None:
+            self._screens[key] = screen
+            self._screens.move_to_end(key)
+
+        screen.grid(row=0, column=0, sticky="nsew")
+        screen.tkraise()
+        self.current = screen
+        self._clear(keep=screen)
+        if not built:
+            self._call(screen, "on_show", **state)
+            image_loader.resume(screen)
+        self._evict()
+        self.root.after_idle(self._record, type(screen).__name__, built, started)
+        return screen
+
+    @staticmethod
+    def _call(screen, hook: str, **state) -> None:
+        method = getattr(screen, hook, None)
+        if callable(method):
+            method(**state)
+
+    def _clear(self, keep) -> None:
+        """Destroy all children of the root except `keep` and the cached screens."""
+        cached = {id(screen) for screen in self._screens.values()}
+        for child in self.root.winfo_children():
+            if child is keep or id(child) in cached:
+                continue
+            try:
+                child.destroy()
+            except (tk.TclError, RuntimeError):
+                logger.exception(
+                    "Navigation failed destroying %s#%s",
+                    child.__class__.__name__,
+                    id(child),
+                )
+
+    def _evict(self) -> None:
+        while len(self._screens) > self.cache_size:
+            # The visible screen is the most recently used one, so it is never evicted
+            _key, screen = self._screens.popitem(last=False)
+            logger.debug("Evicting cached screen %s", type(screen).__name__)
+            screen.destroy()
+
+    def _record(self, name: str, built: bool, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats.setdefault((name, built), TransitionStats()).add(elapsed_ms)
+        logger.debug(
+            "Transition to %s (%s) took %.1f ms", name, "built" if built else "reused", elapsed_ms
+        )
+
+    def report(self) -> None:
+        """Log the accumulated transition times."""
+        for (name, built), stats in sorted(self.stats.items()):
+            logger.info(
+                "Transitions to %s (%s): %d, avg %.1f ms, max %.1f ms",
+                name,
+                "built" if built else "reused",
+                stats.count,
+                stats.total_ms / stats.count,
+                stats.max_ms,
             )
+
+
+# Process-wide navigator instance
+navigator = Navigator()
@@ -3,19 +3,35 @@
 Shows high-level counters (users/items) and provides navigation into admin flows.
 """
 
-from customtkinter import CTkFrame, CTkImage, CTkLabel
-from PIL import Image
+from typing import Optional, Tuple
 
-from src.database import Item, User, get_db
+from customtkinter import CTkFrame, CTkLabel
+
+from src.database import Item, User
+from src.database.instrumentation import operation
+from src.database.item_catalog import item_catalog
+from src.database.user_cache import CachedUser, user_cache
 from src.localization.translator import get_translations
 from src.logmgr import logger
+from src.ui.background import run_in_background, set_busy_cursor
 from src.ui.components.dashboard_card_frame import DashboardCardFrame
 from src.ui.components.Message import ShowMessage
-from src.ui.navigation import clear_root
+from src.ui.navigation import navigator
 from src.ui.screens.item_listing import ItemListFrame
 from src.ui.screens.user_listing import UserListFrame
 from src.ui.screens.user_main import UserMainPage
-from src.utils.paths import get_image_path
+from src.utils.assets import asset_registry
+
+
+def load_counts(session) -> Tuple[int, int]:
+    """Database task: return the user and item counts shown on the dashboard."""
+    return User.get_count(session), Item.get_count(session)
+
+
+@operation("admin_dashboard")
+def _load_dashboard(session, user_id: int) -> Tuple[int, int, Optional[CachedUser]]:
+    """Database task: return the counts and the refreshed admin."""
+    return (*load_counts(session), user_cache.refresh(session, user_id))
 
 
 class AdminMainFrame(CTkFrame):
@@ -23,7 +39,7 @@ class AdminMainFrame(CTkFrame):
 
     LEFT_CLICK_EVENT = "<ButtonRelease-1>"
 
-    def __init__(self, parent, main_menu, user: User, user_count: int, item_count: int):
+    def __init__(self, parent, main_menu, user: CachedUser, user_count: int, item_count: int):
         super().__init__(parent)
 
         self.parent = parent
@@ -33,8 +49,6 @@ class AdminMainFrame(CTkFrame):
         self.main_menu = main_menu
         self.translations = get_translations()
 
-        self.session = get_db()
-
         # Configure the grid for the main frame
         self.grid(row=0, column=0, sticky="nsew")
         self.grid_columnconfigure((0, 1, 2), weight=1)
@@ -42,9 +56,8 @@ class AdminMainFrame(CTkFrame):
 
         self.configure(width=800, height=480, fg_color="transparent")
 
-        # Load and display the logo image using CTkImage
-        logo_image = Image.open(get_image_path("logo.png"))
-        self.logo_image = CTkImage(light_image=logo_image, dark_image=logo_image, size=(90, 90))
+        # Load and display the logo image from the asset registry
+        self.logo_image = asset_registry.image("logo.png", (90, 90))
         self.logo_label = CTkLabel(self, text="", image=self.logo_image)
         self.logo_label.grid(row=2, column=0, columnspan=3)
 
@@ -113,11 +126,19 @@ class AdminMainFrame(CTkFrame):
 
     def back_button_pressed(self):
         """Refresh the admin dashboard (used as back target from sub-screens)."""
-        clear_root(self.parent)
-        user_count = User.get_count(self.session)
-        item_count = Item.get_count(self.session)
-        user = User.get_by_id(self.session, self.user.id)
+        # The sub-screen stays visible until the counts are there
+        run_in_background(
+            self.parent,
+            _load_dashboard,
+            self.user.id,
+            on_success=lambda data: self._show_dashboard(*data),
+            on_error=lambda _error: self._show_dashboard(
+                self.user_count, self.item_count, self.user
+            ),
+            busy=lambda busy: set_busy_cursor(self.parent, busy),
+        )
 
+    def _show_dashboard(self, user_count: int, item_count: int, user: Optional[CachedUser]):
         if user is None:
             logger.error(
                 "Admin user no longer exists (id=%s). Returning to main menu.",
@@ -126,12 +147,7 @@ class AdminMainFrame(CTkFrame):
 
             # Return to main menu/login screen.
             try:
-                if callable(self.main_menu):
-                    self.main_menu(self.parent).grid(row=0, column=0, sticky="nsew")
-                elif hasattr(self.main_menu, "show"):
-                    self.main_menu.show()
-                else:
-                    logger.error("Unsupported main_menu type: %s", type(self.main_menu))
+                navigator.show(self.main_menu, self.main_menu)
             except Exception:  # pylint: disable=broad-exception-caught
                 logger.exception("Failed to navigate back to main menu")
 
@@ -146,46 +162,58 @@ class AdminMainFrame(CTkFrame):
             self.parent.after(5000, message.destroy)
             return
 
-        AdminMainFrame(
-            self.parent,
-            main_menu=self.main_menu,
+        navigator.show(
+            AdminMainFrame,
+            lambda root: AdminMainFrame(
+                root,
+                main_menu=self.main_menu,
+                user=user,
+                user_count=user_count,
+                item_count=item_count,
+            ),
             user=user,
             user_count=user_count,
             item_count=item_count,
         )
 
+    def on_show(self, user: CachedUser, user_count: int, item_count: int):
+        """Shown again from the cache: update the admin and the counters."""
+        self.user = user
+        self.user_count = user_count
+        self.item_count = item_count
+        self.user_count_frame.set_value(str(user_count))
+        self.item_count_frame.set_value(str(item_count))
+
     def user_count_clicked(self, _event):
         """Open the user listing screen."""
-        clear_root(self.parent)
-        users = User.read_all(self.session)
-
-        def back_to_admin() -> None:
-            self.back_button_pressed()
-
-        UserListFrame(
-            self.parent,
-            self.translations["user"]["user_list"],
-            back_to_admin,
-            users=users,
-        ).grid(row=0, column=0, sticky="nsew")
+        # The listing (re)loads its rows in the background
+        navigator.show(
+            UserListFrame,
+            lambda root: UserListFrame(
+                root, self.translations["user"]["user_list"], self.back_button_pressed
+            ),
+            back_button_function=self.back_button_pressed,
+            reload=True,
+        )
 
     def item_count_clicked(self, _event):
         """Open the item listing screen."""
-        clear_root(self.parent)
-        items = Item.read_all(self.session)
-
-        def back_to_admin() -> None:
-            self.back_button_pressed()
-
-        ItemListFrame(
-            self.parent,
-            self.translations["items"]["item_list"],
-            back_to_admin,
-            items,
-        ).grid(row=0, column=0, sticky="nsew")
+        # The listing (re)loads its rows in the background
+        navigator.show(
+            ItemListFrame,
+            lambda root: ItemListFrame(
+                root, self.translations["items"]["item_list"], self.back_button_pressed
+            ),
+            back_button_function=self.back_button_pressed,
+            reload=True,
+        )
 
     def item_purchase_clicked(self, _event):
         """Open the item purchase flow (user main page)."""
-        clear_root(self.parent)
-        items = Item.read_all(self.session)
-        UserMainPage(self.parent, main_menu=self.main_menu, user=self.user, items=items)
+        items = item_catalog.all_items()
+        navigator.show(
+            UserMainPage,
+            lambda root: UserMainPage(root, main_menu=self.main_menu, user=self.user, items=items),
+            user=self.user,
+            items=items,
+        )
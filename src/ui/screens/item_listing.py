@@ -1,32 +1,49 @@
 """Item listing screen.
 
-Provides a scrollable list of items for admin flows.
+Provides a scrollable list of items for admin flows, searchable by name,
+category and barcode, filterable by category and sortable.
 """
 
 import time
-from typing import List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from customtkinter import CTkButton, CTkFrame, CTkScrollableFrame
+from customtkinter import CTkButton, CTkFrame
+from sqlalchemy import Row
 
-from src.database import Item, get_db
+from src.database import Item
+from src.database.change_feed import MAX_PATCH_ROWS, change_feed, patch_rows
+from src.database.instrumentation import operation
 from src.localization.translator import get_translations
 from src.logmgr import logger
+from src.ui.background import run_in_background, set_busy_cursor
 from src.ui.components.heading_frame import HeadingFrame
 from src.ui.components.item_frame import ItemFrame
-from src.ui.navigation import clear_root
+from src.ui.components.search_bar import SearchBar
+from src.ui.components.virtual_list import VirtualList
+from src.ui.navigation import navigator
 from src.ui.screens.new_item import AddNewItemFrame
 from src.ui.screens.update_item import UpdateItemFrame
+from src.utils.search_index import SearchIndex, normalize
 
 
 class ItemListFrame(CTkFrame):
     """Screen that lists items and navigates to create/update screens."""
 
-    # Use release instead of press to avoid accidental re-navigation
-    # when switching screens (common with touchscreens).
-    LEFT_CLICK_EVENT = "<ButtonRelease-1>"
+    # Card (80px) plus vertical padding
+    ROW_HEIGHT = 100
+
+    # Rows only show and search these; loading them as a projection avoids hydrating entities
+    COLUMNS = ("id", "name", "price", "image_hash", "category", "barcode")
+    SEARCH_FIELDS = ("name", "category", "barcode")
 
     def __init__(
-        self, parent, heading_text: str, back_button_function, items: List[Item], *args, **kwargs
+        self,
+        parent,
+        heading_text: str,
+        back_button_function,
+        *args,
+        items: Optional[List[Row]] = None,
+        **kwargs,
     ):
         super().__init__(parent, *args, **kwargs)
 
@@ -34,9 +51,14 @@ class ItemListFrame(CTkFrame):
         self.heading_text: str = heading_text
         self.back_button_function = back_button_function
         self.translations = get_translations()
-        self.items: List[Item] = items
-
-        self.session = get_db()
+        self.items: List[Row] = items or []
+        self.index = SearchIndex(self.SEARCH_FIELDS)
+        # Sort option -> (key, descending); no key ranks search matches, else id order
+        self.sorts: Dict[str, Tuple[Optional[Callable[[Row], Any]], bool]] = {
+            self.translations["general"]["sort_relevance"]: (None, False),
+            self.translations["general"]["sort_name"]: (lambda item: normalize(item.name), False),
+            self.translations["items"]["sort_price"]: (lambda item: item.price, False),
+        }
 
         # Prevent immediate re-navigation caused by the same click/touch event
         # that triggered a screen transition (e.g. back button -> list item click).
@@ -44,8 +66,9 @@ class ItemListFrame(CTkFrame):
 
         self.grid_columnconfigure((0, 1), weight=1)
         self.grid_rowconfigure(0, weight=0)
-        self.grid_rowconfigure(1, weight=1)
-        self.grid_rowconfigure(2, weight=0)
+        self.grid_rowconfigure(1, weight=0)
+        self.grid_rowconfigure(2, weight=1)
+        self.grid_rowconfigure(3, weight=0)
 
         self.configure(width=800, height=480, fg_color="transparent")
 
@@ -58,9 +81,25 @@ class ItemListFrame(CTkFrame):
         )
         self.heading_frame.grid(row=0, column=0, columnspan=2, padx=20, pady=(20, 0), sticky="new")
 
-        self.item_list_frame: CTkScrollableFrame | None = None
+        self.search_bar = SearchBar(
+            self,
+            placeholder=self.translations["general"]["search"],
+            sort_options=list(self.sorts),
+            on_change=self._on_search,
+            filter_all=self.translations["items"]["all_categories"],
+            width=760,
+        )
+        self.search_bar.grid(row=1, column=0, columnspan=2, padx=20, pady=(10, 0), sticky="ew")
+
+        # Edits made while the listing is hidden are patched in when it is shown again
+        self._changes = change_feed.subscribe(Item)
+
+        self.item_list_frame: VirtualList | None = None
         self._create_list_frame()
-        self._populate_items(self.items)
+        if items is None:
+            self._reload()
+        else:
+            self._on_items_loaded((self.items, self._build_index(self.items)))
 
         self.add_new_item_button = CTkButton(
             self,
@@ -70,81 +109,157 @@ class ItemListFrame(CTkFrame):
             font=("Inter", 18, "bold"),
             command=self.add_new_item,
         )
-        self.add_new_item_button.grid(row=2, column=0, columnspan=2, padx=20, pady=10, sticky="ew")
+        self.add_new_item_button.grid(row=3, column=0, columnspan=2, padx=20, pady=10, sticky="ew")
 
     def _create_list_frame(self) -> None:
         """Create (or recreate) the scrollable list container."""
         if self.item_list_frame is not None and self.item_list_frame.winfo_exists():
             self.item_list_frame.destroy()
 
-        self.item_list_frame = CTkScrollableFrame(self, width=760, height=300, fg_color="white")
-        self.item_list_frame.grid(row=1, column=0, columnspan=2, padx=20, pady=20, sticky="nsew")
-        self.item_list_frame.grid_columnconfigure(0, weight=1)
+        self.item_list_frame = VirtualList(
+            self,
+            row_height=self.ROW_HEIGHT,
+            create_row=self._create_row,
+            bind_row=self._bind_row,
+            on_select=lambda item: self.update_item(None, item.id),
+            width=760,
+            height=300,
+            fg_color="white",
+        )
+        self.item_list_frame.grid(row=2, column=0, columnspan=2, padx=20, pady=10, sticky="nsew")
+
+    @classmethod
+    @operation("item_listing")
+    def load_items(cls, session) -> List[Row]:
+        """Load the listing rows as a column projection ordered by id."""
+        return list(Item.stream(session, columns=cls.COLUMNS))
+
+    @classmethod
+    @operation("item_listing_patch")
+    def load_items_by_id(cls, session, ids: List[int]) -> List[Row]:
+        """Load the listing rows of the given ids."""
+        return list(Item.stream(session, columns=cls.COLUMNS, where=[Item.id.in_(ids)]))
+
+    @classmethod
+    def _build_index(cls, items: List[Row]) -> SearchIndex:
+        index = SearchIndex(cls.SEARCH_FIELDS)
+        index.rebuild(items)
+        return index
+
+    @classmethod
+    def load_indexed_items(cls, session) -> Tuple[List[Row], SearchIndex]:
+        """Load the listing rows and build their search index (off the Tk thread)."""
+        items = cls.load_items(session)
+        return items, cls._build_index(items)
+
+    def _reload(self) -> None:
+        """Load the rows on a database worker and show them once they are there."""
+        run_in_background(
+            self,
+            self.load_indexed_items,
+            on_success=self._on_items_loaded,
+            busy=lambda busy: set_busy_cursor(self, busy),
+        )
 
-    def _populate_items(self, items: List[Item]) -> None:
-        """Populate the scrollable list with item rows and bindings."""
-        if self.item_list_frame is None:
-            return
+    def _on_items_loaded(self, result: Tuple[List[Row], SearchIndex]) -> None:
+        self.items, self.index = result
+        self._show_matches()
 
-        for i in range(len(items)):
-            self.item_list_frame.grid_rowconfigure(i, weight=1)
+    def _on_items_patched(self, changes, rows: List[Row]) -> None:
+        self.items = patch_rows(self.items, changes, rows)
+        self.index.patch(changes, rows)
+        self._show_matches()
 
-        for indx, item in enumerate(items):
-            sub_frame = CTkFrame(self.item_list_frame, fg_color="white", width=740, height=60)
-            sub_frame.grid(row=indx, column=0, padx=10, pady=10, sticky="nsew")
+    def _on_search(self, _query: str, _category: Optional[str], _sort: str) -> None:
+        self._show_matches()
+        if self.item_list_frame is not None:
+            self.item_list_frame.scroll_to(0)
 
-            # Configure grid for sub_frame
-            sub_frame.grid_rowconfigure(0, weight=1)
-            sub_frame.grid_columnconfigure(0, weight=1)
-            sub_frame.grid_columnconfigure(1, weight=1)
+    def _show_matches(self) -> None:
+        """Show the items matching the search bar; only the visible rows are built."""
+        if self.item_list_frame is None:
+            return
 
-            # Add widgets to the sub_frame
-            item_frame = ItemFrame(sub_frame, data=item, fg_color="white")
-            item_frame.grid(row=0, column=0, sticky="w")
+        self.search_bar.set_filter_values(self.index.values("category"))
+        category = self.search_bar.filter_value
+        sort_key, descending = self.sorts[self.search_bar.sort]
+        started = time.perf_counter()
+        items = self.index.search(
+            self.search_bar.query,
+            where=None if category is None else lambda item: item.category == category,
+            sort_key=sort_key,
+            reverse=descending,
+        )
+        logger.debug(
+            "Item search matched %d of %d rows in %.1f ms",
+            len(items),
+            len(self.index),
+            (time.perf_counter() - started) * 1000,
+        )
+        self.item_list_frame.set_items(items)
 
-            sub_frame.bind(
-                self.LEFT_CLICK_EVENT,
-                lambda event, item_id=item.id: self.update_item(event, item_id),
-            )
+    @staticmethod
+    def _create_row(master, item: Row) -> ItemFrame:
+        return ItemFrame(master, data=item, fg_color="white")
 
-            item_frame.bind(
-                self.LEFT_CLICK_EVENT,
-                lambda event, item_id=item.id: self.update_item(event, item_id),
-            )
+    @staticmethod
+    def _bind_row(row: ItemFrame, item: Row) -> None:
+        row.set_item(item)
 
-            # Bind all children of sub_frame to update_item
-            for child in sub_frame.winfo_children():
-                child.bind(
-                    self.LEFT_CLICK_EVENT,
-                    lambda event, item_id=item.id: self.update_item(event, item_id),
-                )
+    def return_to_items_listing(self):
+        """Show this listing again after returning from a sub-screen."""
+        # The cached screen patches in the changed rows in the background
+        navigator.show(
+            ItemListFrame,
+            lambda root: ItemListFrame(
+                root,
+                self.heading_text,
+                self.back_button_function,
+                width=800,
+                height=480,
+                fg_color="transparent",
+            ),
+        )
 
-            # Bind all children of item_frame to update_item
-            for child in item_frame.winfo_children():
-                child.bind(
-                    self.LEFT_CLICK_EVENT,
-                    lambda event, item_id=item.id: self.update_item(event, item_id),
-                )
+    def on_show(self, back_button_function=None, reload: bool = False):
+        """Shown again from the cache: patch in the changed rows, keeping the scroll position.
+
+        With `reload` (opened from the dashboard) all rows are read again, which
+        also picks up changes made by other kiosks.
+        """
+        if back_button_function is not None:
+            self.back_button_function = back_button_function
+            self.heading_frame.set_back_button_function(back_button_function)
+        if reload:
+            self._changes.drain()
+            self._reload()
+        else:
+            self._apply_changes()
+
+    def _apply_changes(self) -> None:
+        """Re-read only the rows changed since the listing was shown last and patch them in."""
+        changes = self._changes.drain()
+        if not changes:
+            return
+        if len(changes) > MAX_PATCH_ROWS:
+            self._reload()
+            return
+        run_in_background(
+            self,
+            self.load_items_by_id,
+            list(changes),
+            on_success=lambda rows: self._on_items_patched(changes, rows),
+            busy=lambda busy: set_busy_cursor(self, busy),
+        )
 
-    def return_to_items_listing(self):
-        """Recreate this listing screen after returning from a sub-screen."""
-        clear_root(self.parent)
-        items = Item.read_all(self.session)
-        ItemListFrame(
-            self.parent,
-            self.heading_text,
-            self.back_button_function,
-            items,
-            width=800,
-            height=480,
-            fg_color="transparent",
-        ).grid(row=0, column=0, sticky="nsew")
+    def destroy(self):
+        change_feed.unsubscribe(self._changes)
+        super().destroy()
 
     def _show_listing(self) -> None:
         # Deprecated with single-screen navigation (kept for compatibility if called).
-        self.items = Item.read_all(self.session)
         self._create_list_frame()
-        self._populate_items(self.items)
+        self._reload()
         self.grid(row=0, column=0, sticky="nsew")
 
     def add_new_item(self):
@@ -156,18 +271,18 @@ class ItemListFrame(CTkFrame):
         # Lock immediately to avoid creating multiple frames on double-tap.
         self._nav_lock_until = now + 1.0
         try:
-            clear_root(self.parent)
 
             def back_to_list() -> None:
                 self.return_to_items_listing()
 
-            new_item_frame = AddNewItemFrame(
-                self.parent,
-                back_button_function=back_to_list,
-                width=800,
-                height=480,
+            navigator.show_transient(
+                lambda root: AddNewItemFrame(
+                    root,
+                    back_button_function=back_to_list,
+                    width=800,
+                    height=480,
+                )
             )
-            new_item_frame.grid(row=0, column=0, sticky="nsew")
         except Exception:  # pylint: disable=broad-exception-caught
             logger.exception("Opening add-item screen failed | list=%s", id(self))
             raise
@@ -182,19 +297,19 @@ class ItemListFrame(CTkFrame):
         self._nav_lock_until = now + 1.0
 
         try:
-            clear_root(self.parent)
 
             def back_to_list() -> None:
                 self.return_to_items_listing()
 
-            update_item_frame = UpdateItemFrame(
-                self.parent,
-                back_button_function=back_to_list,
-                item_id=item_id,
-                width=800,
-                height=480,
+            navigator.show_transient(
+                lambda root: UpdateItemFrame(
+                    root,
+                    back_button_function=back_to_list,
+                    item_id=item_id,
+                    width=800,
+                    height=480,
+                )
             )
-            update_item_frame.grid(row=0, column=0, sticky="nsew")
         except Exception:  # pylint: disable=broad-exception-caught
             logger.exception(
                 "Opening update-item screen failed | list=%s item_id=%s",
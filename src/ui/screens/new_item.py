@@ -1,12 +1,14 @@
 from customtkinter import CTkButton, CTkFrame
 from sqlalchemy.exc import IntegrityError, OperationalError, SQLAlchemyError
 
-from src.database import Item, get_new_session
+from src.database import Item, ItemImage, session_scope
+from src.database.item_catalog import item_catalog
 from src.localization.translator import get_translations
 from src.logmgr import logger
 from src.ui.components.heading_frame import HeadingFrame
 from src.ui.components.item_form import ItemForm
 from src.ui.components.Message import ShowMessage
+from src.utils.thumbnails import thumbnail_cache
 
 
 class AddNewItemFrame(CTkFrame):
@@ -81,8 +83,7 @@ class AddNewItemFrame(CTkFrame):
             self.parent.after(5000, self.message.destroy)
             return
 
-        session = get_new_session()
-        try:
+        with session_scope() as session:
             # Check if an item with the same barcode already exists
             existing_item = Item.get_by_barcode(session, barcode)
             if existing_item:
@@ -113,19 +114,22 @@ class AddNewItemFrame(CTkFrame):
                     self.parent.after(5000, self.message.destroy)
                     return
 
-            # Create a new Item instance
+            # Create a new Item instance, the image is stored separately by its hash
             new_item = Item(
                 name=name,
                 price=price,
                 category=category,
                 quantity=quantity,
                 barcode=barcode,
-                image=image_data,
+                image_hash=ItemImage.store(session, image_data) if image_data else None,
             )
 
             # Save the new item to the database
             try:
                 new_item.create(session)
+                item_catalog.upsert(new_item)
+                if image_data:
+                    thumbnail_cache.generate(new_item.id, new_item.image_hash, image_data)
             except (IntegrityError, OperationalError):
                 try:
                     session.rollback()
@@ -157,7 +161,5 @@ class AddNewItemFrame(CTkFrame):
                 )
                 self.parent.after(5000, self.message.destroy)
                 return
-        finally:
-            session.close()
 
         self.back_button_function()
@@ -3,7 +3,9 @@
 import sqlalchemy.exc
 from customtkinter import CTkButton, CTkFrame
 
-from src.database import User, get_db
+from src.database import User, session_scope
+from src.database.credit_ledger import OPENING, record_entry
+from src.database.user_cache import user_cache
 from src.localization.translator import get_translations
 from src.logmgr import logger
 from src.ui.components.heading_frame import HeadingFrame
@@ -25,8 +27,6 @@ class AddUserFrame(CTkFrame):
 
         self.message = None
 
-        self.session = get_db()
-
         self.configure(width=800, height=480, fg_color="transparent")
 
         self.grid_columnconfigure((0, 1), weight=1)
@@ -78,51 +78,58 @@ class AddUserFrame(CTkFrame):
 
             return
 
-        # Check if a user with the same NFC ID already exists
-        try:
-            existing_user = User.get_by_nfcid(self.session, nfcid)
-        except sqlalchemy.exc.SQLAlchemyError:
-            logger.exception("Error checking existing user by NFCID")
-            self.message = ShowMessage(
-                self.parent,
-                image="unsuccessful",
-                heading=self.translations["admin"]["error_adding_user"],
-                text=self.translations["admin"].get(
-                    "error_checking_user",
-                    self.translations["admin"]["error_adding_user"],
-                ),
-            )
-            self.parent.after(5000, self.message.destroy)
-            return
-        if existing_user:
-            logger.warning("User with NFCID %s already exists", nfcid)
-            # Show message if user already exists
-            self.message = ShowMessage(
-                self.parent,
-                image="unsuccessful",
-                heading=self.translations["admin"]["error_adding_user"],
-                text=self.translations["nfc"]["card_already_used"],
-            )
-            self.parent.after(5000, self.message.destroy)
-            return
-
-        # Create a new User instance
-        logger.info("Creating new user: %s", name)
-        new_user = User(nfcid=nfcid, name=name, type=user_type, credit=user_credits)
-
-        # Save the new user to the database
-        try:
-            new_user.create(self.session)
-        except sqlalchemy.exc.SQLAlchemyError as e:
-            logger.exception("Error creating user")
-            self.message = ShowMessage(
-                self.parent,
-                image="unsuccessful",
-                heading=self.translations["admin"]["error_adding_user"],
-                text=str(e),
-            )
-            self.parent.after(5000, self.message.destroy)
-            return
+        with session_scope() as session:
+            # Check if a user with the same NFC ID already exists
+            try:
+                existing_user = User.get_by_nfcid(session, nfcid)
+            except sqlalchemy.exc.SQLAlchemyError:
+                session.rollback()
+                logger.exception("Error checking existing user by NFCID")
+                self.message = ShowMessage(
+                    self.parent,
+                    image="unsuccessful",
+                    heading=self.translations["admin"]["error_adding_user"],
+                    text=self.translations["admin"].get(
+                        "error_checking_user",
+                        self.translations["admin"]["error_adding_user"],
+                    ),
+                )
+                self.parent.after(5000, self.message.destroy)
+                return
+            if existing_user:
+                logger.warning("User with NFCID %s already exists", nfcid)
+                # Show message if user already exists
+                self.message = ShowMessage(
+                    self.parent,
+                    image="unsuccessful",
+                    heading=self.translations["admin"]["error_adding_user"],
+                    text=self.translations["nfc"]["card_already_used"],
+                )
+                self.parent.after(5000, self.message.destroy)
+                return
+
+            # Create a new User instance
+            logger.info("Creating new user: %s", name)
+            new_user = User(nfcid=nfcid, name=name, type=user_type, credit=user_credits)
+
+            # Save the new user to the database
+            try:
+                new_user.create(session, commit=False)
+                session.flush()
+                record_entry(session, new_user.id, float(user_credits), OPENING)
+                session.commit()
+                user_cache.put(new_user)
+            except (sqlalchemy.exc.SQLAlchemyError, ValueError) as e:
+                session.rollback()
+                logger.exception("Error creating user")
+                self.message = ShowMessage(
+                    self.parent,
+                    image="unsuccessful",
+                    heading=self.translations["admin"]["error_adding_user"],
+                    text=str(e),
+                )
+                self.parent.after(5000, self.message.destroy)
+                return
 
         logger.info("User created successfully")
 
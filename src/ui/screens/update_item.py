@@ -1,11 +1,13 @@
 from customtkinter import CTkButton, CTkFrame
 
-from src.database import Item, get_db
+from src.database import Item, ItemImage, session_scope
+from src.database.item_catalog import item_catalog
 from src.localization.translator import get_translations
 from src.ui.components.Confirmation import DeleteConfirmation
 from src.ui.components.heading_frame import HeadingFrame
 from src.ui.components.item_form import ItemForm
 from src.ui.components.Message import ShowMessage
+from src.utils.thumbnails import FORM_SIZE, thumbnail_cache
 
 
 class UpdateItemFrame(CTkFrame):
@@ -17,8 +19,6 @@ class UpdateItemFrame(CTkFrame):
         self.back_button_function = back_button_function
         self.translations = get_translations()
 
-        self.session = get_db()
-
         self.configure(width=800, height=480, fg_color="transparent")
 
         # Configure the grid for the frame
@@ -57,16 +57,26 @@ class UpdateItemFrame(CTkFrame):
         self.initialize_item()
 
     def initialize_item(self):
-        item = Item.get_by_id(self.session, self.item_id)
-        if item:
-            self.item_form.set_data(
-                name=item.name,
-                price=item.price,
-                quantity=item.quantity,
-                barcode=item.barcode,
-                image_data=item.image,
-                category=item.category,
-            )
+        with session_scope() as session:
+            item = Item.get_by_id(session, self.item_id)
+            if item:
+                self.item_form.set_data(
+                    name=item.name,
+                    price=item.price,
+                    quantity=item.quantity,
+                    barcode=item.barcode,
+                    thumbnail=(
+                        thumbnail_cache.get(
+                            item.id,
+                            item.image_hash,
+                            FORM_SIZE,
+                            load_data=lambda: ItemImage.get_data(session, item.image_hash),
+                        )
+                        if item.image_hash
+                        else None
+                    ),
+                    category=item.category,
+                )
 
     def update_item(self):
         data = self.item_form.get_data()
@@ -99,48 +109,60 @@ class UpdateItemFrame(CTkFrame):
             self.parent.after(5000, self.message.destroy)
             return
 
-        # Check if another item with the same barcode already exists
-        existing_item = Item.get_by_barcode(self.session, barcode)
-        if existing_item and existing_item.id != self.item_id:
-            self.message = ShowMessage(
-                self.parent,
-                image="unsuccessful",
-                heading=self.translations["items"]["error_updating_item"],
-                text=self.translations["items"]["barcode_already_exists"],
-            )
-            self.parent.after(5000, self.message.destroy)
-            return
-
         # Read the image file as binary data if a new file was selected
         image_data = None
         if file_path:
             with open(file_path, "rb") as file:
                 image_data = file.read()
 
-        # Update the item in the database
-        item = Item.get_by_id(self.session, self.item_id)
-        if item:
-            update_kwargs = {
-                "name": name,
-                "price": price,
-                "category": category,
-                "quantity": quantity,
-                "barcode": barcode,
-            }
-            if image_data:
-                update_kwargs["image"] = image_data
-
-            item.update(self.session, **update_kwargs)
+        with session_scope() as session:
+            # Check if another item with the same barcode already exists
+            existing_item = Item.get_by_barcode(session, barcode)
+            if existing_item and existing_item.id != self.item_id:
+                self.message = ShowMessage(
+                    self.parent,
+                    image="unsuccessful",
+                    heading=self.translations["items"]["error_updating_item"],
+                    text=self.translations["items"]["barcode_already_exists"],
+                )
+                self.parent.after(5000, self.message.destroy)
+                return
+
+            # Update the item in the database
+            item = Item.get_by_id(session, self.item_id)
+            if item:
+                update_kwargs = {
+                    "name": name,
+                    "price": price,
+                    "category": category,
+                    "quantity": quantity,
+                    "barcode": barcode,
+                }
+                previous_image_hash = item.image_hash
+                if image_data:
+                    update_kwargs["image_hash"] = ItemImage.store(session, image_data)
+
+                item.update(session, **update_kwargs)
+                item_catalog.upsert(item)
+                if image_data:
+                    thumbnail_cache.generate(item.id, item.image_hash, image_data)
+                if item.image_hash != previous_image_hash:
+                    ItemImage.prune(session, previous_image_hash)
 
         self.back_button_function()
 
     def confirm_delete(self):
-        # Fetch the item by ID
-        item_instance = Item.get_by_id(self.session, self.item_id)
-
-        # If the item exists, delete the user
-        if item_instance:
-            item_instance.delete(self.session)
+        with session_scope() as session:
+            # Fetch the item by ID
+            item_instance = Item.get_by_id(session, self.item_id)
+
+            # If the item exists, delete the user
+            if item_instance:
+                image_hash = item_instance.image_hash
+                item_instance.delete(session)
+                item_catalog.remove(self.item_id)
+                thumbnail_cache.discard(self.item_id)
+                ItemImage.prune(session, image_hash)
 
         self.back_button_function()
 
@@ -1,13 +1,19 @@
 import math
 from datetime import datetime, timedelta
 from tkinter import Canvas
+from typing import Dict, Optional, Tuple
 
 import sqlalchemy.exc
 from customtkinter import CTkButton, CTkEntry, CTkFrame, CTkLabel, CTkOptionMenu
 
-from src.database import Transaction, User, get_db
+from src.database import User, session_scope
+from src.database.credit_ledger import delete_entries, set_credit
+from src.database.instrumentation import operation
+from src.database.rollup import get_category_spend
+from src.database.user_cache import user_cache
 from src.localization.translator import get_translations
 from src.logmgr import logger
+from src.ui.background import run_in_background, set_busy_cursor
 from src.ui.components.Confirmation import DeleteConfirmation
 from src.ui.components.credit_frame import CreditFrame
 from src.ui.components.heading_frame import HeadingFrame
@@ -15,6 +21,27 @@ from src.ui.components.Message import ShowMessage
 from src.ui.components.scan_card import ScanCardFrame
 
 
+@operation("user_details")
+def _load_user_and_spend(session, user_id: int) -> Tuple[Optional[User], Dict[str, float], bool]:
+    """Database task: load the user and the category spend shown in the pie chart.
+
+    Returns the spend of the last month, or of all time (flagged by the last
+    element) if the user bought nothing in the last month.
+    """
+    user = User.get_by_id(session, user_id)
+    if user is None:
+        return None, {}, False
+
+    # The rollup has monthly granularity: "last month" covers the calendar
+    # months overlapping the last 30 days.
+    since = datetime.now() - timedelta(days=30)
+    last_month_totals = get_category_spend(session, user_id, since=since)
+    logger.debug("Category totals in the last month: %s", last_month_totals)
+    if last_month_totals:
+        return user, last_month_totals, False
+    return user, get_category_spend(session, user_id), True
+
+
 class UpdateUserFrame(CTkFrame):
     def __init__(self, parent, back_button_function, user_id: int, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
@@ -28,8 +55,8 @@ class UpdateUserFrame(CTkFrame):
         self.user_id: int = user_id
         self.translations = get_translations()
         self.nfcid: str = ""
-
-        self.session = get_db()
+        # Credit shown in the form; an edit is booked as the difference to it
+        self.loaded_credit: Optional[float] = None
 
         self.configure(width=800, height=480, fg_color="transparent")
 
@@ -310,7 +337,15 @@ class UpdateUserFrame(CTkFrame):
 
     def initialize_user(self):
         logger.debug("Calling initialize_user for user_id=%s", self.user_id)
-        user = User.get_by_id(self.session, self.user_id)
+        run_in_background(
+            self,
+            _load_user_and_spend,
+            self.user_id,
+            on_success=lambda data: self._on_user_loaded(*data),
+            busy=lambda busy: set_busy_cursor(self, busy),
+        )
+
+    def _on_user_loaded(self, user: Optional[User], category_totals, show_all_time: bool):
         if user:
             name = user.name
             nfcid = user.nfcid
@@ -329,26 +364,11 @@ class UpdateUserFrame(CTkFrame):
             self.name_entry.delete(0, "end")
             self.name_entry.insert(0, name)
             self.credits_frame.set_entry_text(str(credit))
+            self.loaded_credit = credit
             self.user_type_menu.set(user_type)
             self.nfcid = nfcid
 
-            transactions = Transaction.read_all_for_user(self.session, self.user_id)
-            logger.debug("Number of transactions found: %d", len(transactions))
-
-            last_month_transactions = self.get_transactions_last_month(transactions)
-            logger.debug(
-                "Number of transactions in the last month: %d",
-                len(last_month_transactions),
-            )
-
-            # If no transactions in the last month, show all-time transactions
-            show_all_time = False
-            if last_month_transactions:
-                category_percentages = self.calculate_category_percentage(last_month_transactions)
-            else:
-                category_percentages = self.calculate_category_percentage(transactions)
-                show_all_time = True
-
+            category_percentages = self.calculate_category_percentage(category_totals)
             logger.debug("Calculated category percentages: %s", category_percentages)
 
             # Draw the pie chart
@@ -357,38 +377,12 @@ class UpdateUserFrame(CTkFrame):
         else:
             logger.debug("No user found with user_id=%s", self.user_id)
 
-    def get_transactions_last_month(self, transactions):
-        logger.debug("Filtering transactions from the last month")
-        current_date = datetime.now()
-        start_date = current_date - timedelta(days=30)
-
-        filtered_transactions = []
-        for transaction in transactions:
-            date_transaction = transaction.date
-            if start_date <= date_transaction <= current_date:
-                filtered_transactions.append(transaction)
-
-        logger.debug("Filtered transactions count: %d", len(filtered_transactions))
-        return filtered_transactions
-
-    def calculate_category_percentage(self, transactions):
+    def calculate_category_percentage(self, category_totals):
         logger.debug("Calculating category percentages")
-        category_totals = {}
-        total_amount = sum(float(transaction.cost) for transaction in transactions)
+        total_amount = sum(category_totals.values())
 
         logger.debug("Total transaction amount: %f", total_amount)
 
-        for transaction in transactions:
-            category = transaction.category
-            amount = float(transaction.cost)
-
-            if category in category_totals:
-                category_totals[category] += amount
-            else:
-                category_totals[category] = amount
-
-            logger.debug("Updated category '%s' with amount %f", category, amount)
-
         if total_amount > 0:
             category_percentages = {
                 category: (amount / total_amount) * 100
@@ -427,53 +421,78 @@ class UpdateUserFrame(CTkFrame):
             self.parent.after(5000, self.message.destroy)
             return
 
-        existing_user = User.get_by_nfcid(self.session, nfcid)
-        logger.debug("Checking existing_user with nfcid='%s': %s", nfcid, existing_user)
+        with session_scope() as session:
+            existing_user = User.get_by_nfcid(session, nfcid)
+            logger.debug("Checking existing_user with nfcid='%s': %s", nfcid, existing_user)
+
+            if existing_user and existing_user.id != self.user_id:
+                logger.debug("NFCID '%s' is already used by user_id '%s'", nfcid, existing_user.id)
+                self.message = ShowMessage(
+                    self.parent,
+                    image="unsuccessful",
+                    heading=self.translations["admin"]["error_updating_user"],
+                    text=self.translations["nfc"]["card_already_used"],
+                )
+                self.parent.after(5000, self.message.destroy)
+            else:
+                user_instance = User.get_by_id(session, self.user_id)
+                logger.debug("Updating user: %s", user_instance)
+                if user_instance:
+                    try:
+                        seen = (
+                            self.loaded_credit
+                            if self.loaded_credit is not None
+                            else user_instance.credit
+                        )
+                        user_instance.update(
+                            session, commit=False, nfcid=nfcid, name=name, type=user_type
+                        )
+                        set_credit(session, self.user_id, seen, float(user_credits))
+                        session.commit()
+                        user_cache.put(user_instance)
+                        logger.debug("User updated successfully")
+                    except (sqlalchemy.exc.SQLAlchemyError, ValueError) as e:
+                        session.rollback()
+                        logger.exception("Error updating user")
+                        self.message = ShowMessage(
+                            self.parent,
+                            image="unsuccessful",
+                            heading=self.translations["admin"]["error_updating_user"],
+                            text=str(e),
+                        )
+                        self.parent.after(5000, self.message.destroy)
+                        return
+                else:
+                    logger.debug("User with user_id=%s not found", self.user_id)
+                self.back_button_function()
 
-        if existing_user and existing_user.id != self.user_id:
-            logger.debug("NFCID '%s' is already used by user_id '%s'", nfcid, existing_user.id)
+    def confirm_delete(self):
+        logger.debug("Confirming deletion of user with user_id=%s", self.user_id)
+        try:
+            with session_scope() as session:
+                user_instance = User.get_by_id(session, self.user_id)
+                if user_instance:
+                    delete_entries(session, self.user_id)
+                    user_instance.delete(session)
+                    user_cache.remove(self.user_id)
+                    logger.debug("User deleted")
+                else:
+                    logger.debug("User to delete not found")
+        except sqlalchemy.exc.SQLAlchemyError as e:
+            # Purchases keep their user, so a user who bought something cannot be deleted
+            logger.exception("Error deleting user")
             self.message = ShowMessage(
                 self.parent,
                 image="unsuccessful",
-                heading=self.translations["admin"]["error_updating_user"],
-                text=self.translations["nfc"]["card_already_used"],
+                heading=self.translations["admin"]["error_deleting_user"],
+                text=(
+                    self.translations["admin"]["user_has_purchases"]
+                    if isinstance(e, sqlalchemy.exc.IntegrityError)
+                    else str(e)
+                ),
             )
             self.parent.after(5000, self.message.destroy)
-        else:
-            user_instance = User.get_by_id(self.session, self.user_id)
-            logger.debug("Updating user: %s", user_instance)
-            if user_instance:
-                try:
-                    user_instance.update(
-                        self.session,
-                        nfcid=nfcid,
-                        name=name,
-                        type=user_type,
-                        credit=user_credits,
-                    )
-                    logger.debug("User updated successfully")
-                except (sqlalchemy.exc.SQLAlchemyError, ValueError) as e:
-                    logger.exception("Error updating user")
-                    self.message = ShowMessage(
-                        self.parent,
-                        image="unsuccessful",
-                        heading=self.translations["admin"]["error_updating_user"],
-                        text=str(e),
-                    )
-                    self.parent.after(5000, self.message.destroy)
-                    return
-            else:
-                logger.debug("User with user_id=%s not found", self.user_id)
-            self.back_button_function()
-
-    def confirm_delete(self):
-        logger.debug("Confirming deletion of user with user_id=%s", self.user_id)
-        user_instance = User.get_by_id(self.session, self.user_id)
-        if user_instance:
-            user_instance.delete(self.session)
-            logger.debug("User deleted")
-        else:
-            logger.debug("User to delete not found")
+            return
         self.back_button_function()
 
     def delete_user(self):
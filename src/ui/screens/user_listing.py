@@ -1,32 +1,49 @@
 """User listing screen.
 
-Provides a scrollable list of users for admin flows.
+Provides a scrollable list of users for admin flows, searchable by name, NFC
+id and email, filterable by user type and sortable.
 """
 
 import time
-from typing import List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from customtkinter import CTkButton, CTkFrame, CTkScrollableFrame
+from customtkinter import CTkButton, CTkFrame
+from sqlalchemy import Row
 
-from src.database import User, get_db
+from src.database import User
+from src.database.change_feed import MAX_PATCH_ROWS, change_feed, patch_rows
+from src.database.instrumentation import operation
 from src.localization.translator import get_translations
 from src.logmgr import logger
+from src.ui.background import run_in_background, set_busy_cursor
 from src.ui.components.heading_frame import HeadingFrame
+from src.ui.components.search_bar import SearchBar
 from src.ui.components.user_frame import UserFrame
-from src.ui.navigation import clear_root
+from src.ui.components.virtual_list import VirtualList
+from src.ui.navigation import navigator
 from src.ui.screens.new_user import AddUserFrame
 from src.ui.screens.update_user import UpdateUserFrame
+from src.utils.search_index import SearchIndex, normalize
 
 
 class UserListFrame(CTkFrame):
     """Screen that lists users and navigates to create/update screens."""
 
-    # Use release instead of press to avoid accidental re-navigation
-    # when switching screens (common with touchscreens).
-    LEFT_CLICK_EVENT = "<ButtonRelease-1>"
+    # Card (80px) plus vertical padding
+    ROW_HEIGHT = 100
+
+    # Rows only show and search these; loading them as a projection avoids hydrating entities
+    COLUMNS = ("id", "name", "credit", "type", "nfcid", "email")
+    SEARCH_FIELDS = ("name", "nfcid", "email")
 
     def __init__(
-        self, parent, heading_text: str, back_button_function, users: List[User], *args, **kwargs
+        self,
+        parent,
+        heading_text: str,
+        back_button_function,
+        *args,
+        users: Optional[List[Row]] = None,
+        **kwargs,
     ):
         super().__init__(parent, *args, **kwargs)
 
@@ -34,8 +51,14 @@ class UserListFrame(CTkFrame):
         self.back_button_function = back_button_function
         self.heading_text: str = heading_text
         self.translations = get_translations()
-
-        self.session = get_db()
+        self.users: List[Row] = users or []
+        self.index = SearchIndex(self.SEARCH_FIELDS)
+        # Sort option -> (key, descending); no key ranks search matches, else id order
+        self.sorts: Dict[str, Tuple[Optional[Callable[[Row], Any]], bool]] = {
+            self.translations["general"]["sort_relevance"]: (None, False),
+            self.translations["general"]["sort_name"]: (lambda user: normalize(user.name), False),
+            self.translations["user"]["sort_credit"]: (lambda user: user.credit, False),
+        }
 
         # Prevent immediate re-navigation caused by the same click/touch event
         # that triggered a screen transition (e.g. back button -> list item click).
@@ -45,8 +68,9 @@ class UserListFrame(CTkFrame):
 
         self.grid_columnconfigure((0, 1), weight=1)
         self.grid_rowconfigure(0, weight=0)
-        self.grid_rowconfigure(1, weight=1)
-        self.grid_rowconfigure(2, weight=0)
+        self.grid_rowconfigure(1, weight=0)
+        self.grid_rowconfigure(2, weight=1)
+        self.grid_rowconfigure(3, weight=0)
 
         self.heading_frame = HeadingFrame(
             self,
@@ -57,9 +81,25 @@ class UserListFrame(CTkFrame):
         )
         self.heading_frame.grid(row=0, column=0, columnspan=2, padx=20, pady=(20, 0), sticky="new")
 
-        self.user_list_frame: CTkScrollableFrame | None = None
+        self.search_bar = SearchBar(
+            self,
+            placeholder=self.translations["general"]["search"],
+            sort_options=list(self.sorts),
+            on_change=self._on_search,
+            filter_all=self.translations["user"]["all_types"],
+            width=760,
+        )
+        self.search_bar.grid(row=1, column=0, columnspan=2, padx=20, pady=(10, 0), sticky="ew")
+
+        # Edits made while the listing is hidden are patched in when it is shown again
+        self._changes = change_feed.subscribe(User)
+
+        self.user_list_frame: VirtualList | None = None
         self._create_list_frame()
-        self._populate_users(users)
+        if users is None:
+            self._reload()
+        else:
+            self._on_users_loaded((self.users, self._build_index(self.users)))
 
         self.add_new_user_button = CTkButton(
             self,
@@ -69,61 +109,102 @@ class UserListFrame(CTkFrame):
             font=("Inter", 18, "bold"),
             command=self.add_new_user,
         )
-        self.add_new_user_button.grid(row=2, column=0, columnspan=2, padx=20, pady=10, sticky="ew")
+        self.add_new_user_button.grid(row=3, column=0, columnspan=2, padx=20, pady=10, sticky="ew")
 
     def _create_list_frame(self) -> None:
         """Create (or recreate) the scrollable list container."""
         if self.user_list_frame is not None and self.user_list_frame.winfo_exists():
             self.user_list_frame.destroy()
 
-        self.user_list_frame = CTkScrollableFrame(self, width=760, height=300, fg_color="white")
-        self.user_list_frame.grid(row=1, column=0, columnspan=2, padx=20, pady=20, sticky="nsew")
-        self.user_list_frame.grid_columnconfigure(0, weight=1)
-
-    def _populate_users(self, users: List[User]) -> None:
-        """Populate the scrollable list with user rows and bindings."""
-        if self.user_list_frame is None:
-            return
-
-        for i in range(len(users)):
-            self.user_list_frame.grid_rowconfigure(i, weight=1)
+        self.user_list_frame = VirtualList(
+            self,
+            row_height=self.ROW_HEIGHT,
+            create_row=self._create_row,
+            bind_row=self._bind_row,
+            on_select=lambda user: self.update_user(None, user.id),
+            width=760,
+            height=300,
+            fg_color="white",
+        )
+        self.user_list_frame.grid(row=2, column=0, columnspan=2, padx=20, pady=10, sticky="nsew")
+
+    @classmethod
+    @operation("user_listing")
+    def load_users(cls, session) -> List[Row]:
+        """Load the listing rows as a column projection ordered by id."""
+        return list(User.stream(session, columns=cls.COLUMNS))
+
+    @classmethod
+    @operation("user_listing_patch")
+    def load_users_by_id(cls, session, ids: List[int]) -> List[Row]:
+        """Load the listing rows of the given ids."""
+        return list(User.stream(session, columns=cls.COLUMNS, where=[User.id.in_(ids)]))
+
+    @classmethod
+    def _build_index(cls, users: List[Row]) -> SearchIndex:
+        index = SearchIndex(cls.SEARCH_FIELDS)
+        index.rebuild(users)
+        return index
+
+    @classmethod
+    def load_indexed_users(cls, session) -> Tuple[List[Row], SearchIndex]:
+        """Load the listing rows and build their search index (off the Tk thread)."""
+        users = cls.load_users(session)
+        return users, cls._build_index(users)
+
+    def _reload(self) -> None:
+        """Load the rows on a database worker and show them once they are there."""
+        run_in_background(
+            self,
+            self.load_indexed_users,
+            on_success=self._on_users_loaded,
+            busy=lambda busy: set_busy_cursor(self, busy),
+        )
 
-        for indx, user in enumerate(users):
-            sub_frame = CTkFrame(self.user_list_frame, fg_color="white", width=740, height=60)
-            sub_frame.grid(row=indx, column=0, padx=10, pady=10, sticky="nsew")
+    def _on_users_loaded(self, result: Tuple[List[Row], SearchIndex]) -> None:
+        self.users, self.index = result
+        self._show_matches()
 
-            # Configure grid for sub_frame
-            sub_frame.grid_rowconfigure(0, weight=1)
-            sub_frame.grid_columnconfigure(0, weight=1)
-            sub_frame.grid_columnconfigure(1, weight=1)
+    def _on_users_patched(self, changes, rows: List[Row]) -> None:
+        self.users = patch_rows(self.users, changes, rows)
+        self.index.patch(changes, rows)
+        self._show_matches()
 
-            # Add widgets to the sub_frame
-            user_frame = UserFrame(
-                sub_frame, data=(user.id, user.name, user.credit), fg_color="white"
-            )
-            user_frame.grid(row=0, column=0, sticky="w")
+    def _on_search(self, _query: str, _user_type: Optional[str], _sort: str) -> None:
+        self._show_matches()
+        if self.user_list_frame is not None:
+            self.user_list_frame.scroll_to(0)
 
-            sub_frame.bind(
-                self.LEFT_CLICK_EVENT,
-                lambda event, user_id=user.id: self.update_user(event, user_id),
-            )
+    def _show_matches(self) -> None:
+        """Show the users matching the search bar; only the visible rows are built."""
+        if self.user_list_frame is None:
+            return
 
-            user_frame.bind(
-                self.LEFT_CLICK_EVENT,
-                lambda event, user_id=user.id: self.update_user(event, user_id),
-            )
+        self.search_bar.set_filter_values(self.index.values("type"))
+        user_type = self.search_bar.filter_value
+        sort_key, descending = self.sorts[self.search_bar.sort]
+        started = time.perf_counter()
+        users = self.index.search(
+            self.search_bar.query,
+            where=None if user_type is None else lambda user: user.type == user_type,
+            sort_key=sort_key,
+            reverse=descending,
+        )
+        logger.debug(
+            "User search matched %d of %d rows in %.1f ms",
+            len(users),
+            len(self.index),
+            (time.perf_counter() - started) * 1000,
+        )
+        self.user_list_frame.set_items(users)
 
-            for child in sub_frame.winfo_children():
-                child.bind(
-                    self.LEFT_CLICK_EVENT,
-                    lambda event, user_id=user.id: self.update_user(event, user_id),
-                )
+    @staticmethod
+    def _create_row(master, user: Row) -> UserFrame:
+        return UserFrame(master, data=(user.id, user.name, user.credit), fg_color="white")
 
-            for child in user_frame.winfo_children():
-                child.bind(
-                    self.LEFT_CLICK_EVENT,
-                    lambda event, user_id=user.id: self.update_user(event, user_id),
-                )
+    @staticmethod
+    def _bind_row(row: UserFrame, user: Row) -> None:
+        row.set_user((user.id, user.name, user.credit))
 
     def update_user(self, _event, user_id):
         """Navigate to the update-user screen for the selected user."""
@@ -135,13 +216,11 @@ class UserListFrame(CTkFrame):
         self._nav_lock_until = now + 1.0
 
         try:
-            clear_root(self.parent)
 
             def back_to_list() -> None:
                 self.return_to_user_listing()
 
-            update_user_frame = UpdateUserFrame(self.parent, back_to_list, user_id)
-            update_user_frame.grid(row=0, column=0, sticky="nsew")
+            navigator.show_transient(lambda root: UpdateUserFrame(root, back_to_list, user_id))
         except Exception:  # pylint: disable=broad-exception-caught
             logger.exception(
                 "Opening update-user screen failed | list=%s user_id=%s",
@@ -151,24 +230,59 @@ class UserListFrame(CTkFrame):
             raise
 
     def return_to_user_listing(self):
-        """Recreate this listing screen after returning from a sub-screen."""
-        clear_root(self.parent)
-        users: List[User] = User.read_all(self.session)
-        UserListFrame(
-            self.parent,
-            self.heading_text,
-            self.back_button_function,
-            users=users,
-            width=800,
-            height=480,
-            fg_color="transparent",
-        ).grid(row=0, column=0, sticky="nsew")
+        """Show this listing again after returning from a sub-screen."""
+        # The cached screen patches in the changed rows in the background
+        navigator.show(
+            UserListFrame,
+            lambda root: UserListFrame(
+                root,
+                self.heading_text,
+                self.back_button_function,
+                width=800,
+                height=480,
+                fg_color="transparent",
+            ),
+        )
+
+    def on_show(self, back_button_function=None, reload: bool = False):
+        """Shown again from the cache: patch in the changed rows, keeping the scroll position.
+
+        With `reload` (opened from the dashboard) all rows are read again, which
+        also picks up changes made by other kiosks.
+        """
+        if back_button_function is not None:
+            self.back_button_function = back_button_function
+            self.heading_frame.set_back_button_function(back_button_function)
+        if reload:
+            self._changes.drain()
+            self._reload()
+        else:
+            self._apply_changes()
+
+    def _apply_changes(self) -> None:
+        """Re-read only the rows changed since the listing was shown last and patch them in."""
+        changes = self._changes.drain()
+        if not changes:
+            return
+        if len(changes) > MAX_PATCH_ROWS:
+            self._reload()
+            return
+        run_in_background(
+            self,
+            self.load_users_by_id,
+            list(changes),
+            on_success=lambda rows: self._on_users_patched(changes, rows),
+            busy=lambda busy: set_busy_cursor(self, busy),
+        )
+
+    def destroy(self):
+        change_feed.unsubscribe(self._changes)
+        super().destroy()
 
     def _show_listing(self) -> None:
         # Deprecated with single-screen navigation (kept for compatibility if called).
-        users: List[User] = User.read_all(self.session)
         self._create_list_frame()
-        self._populate_users(users)
+        self._reload()
         self.grid(row=0, column=0, sticky="nsew")
 
     def add_new_user(self):
@@ -180,19 +294,19 @@ class UserListFrame(CTkFrame):
         # Lock immediately to avoid creating multiple frames on double-tap.
         self._nav_lock_until = now + 1.0
         try:
-            clear_root(self.parent)
 
             def back_to_list() -> None:
                 self.return_to_user_listing()
 
-            new_user_frame = AddUserFrame(
-                self.parent,
-                back_button_function=back_to_list,
-                width=800,
-                height=480,
-                fg_color="transparent",
+            navigator.show_transient(
+                lambda root: AddUserFrame(
+                    root,
+                    back_button_function=back_to_list,
+                    width=800,
+                    height=480,
+                    fg_color="transparent",
+                )
             )
-            new_user_frame.grid(row=0, column=0, sticky="nsew")
         except Exception:  # pylint: disable=broad-exception-caught
             logger.exception("Opening add-user screen failed | list=%s", id(self))
             raise
@@ -4,43 +4,133 @@ This screen is shown after a user logs in (e.g. via NFC). It manages the
 shopping cart UI, checkout transaction, and optional notifications.
 """
 
-from datetime import datetime
+import uuid
+from dataclasses import dataclass
 from tkinter import IntVar
-from typing import List
-
-import sqlalchemy.exc
-from customtkinter import CTkButton, CTkFrame, CTkImage, CTkScrollableFrame
-from PIL import Image
-
-from src.database import Item, User, get_db
-from src.database.models.transaction import Transaction
+from typing import List, Optional, Sequence, Tuple
+
+from customtkinter import CTkButton, CTkFrame
+
+from src.database import Item, User
+from src.database.checkout import (
+    CheckoutOutcomeUnknown,
+    CheckoutResult,
+    InsufficientCreditError,
+    InsufficientStockError,
+    is_connection_error,
+    perform_checkout,
+)
+from src.database.instrumentation import operation
+from src.database.item_catalog import CatalogItem, item_catalog
+from src.database.offline_journal import JournalEntry, offline_journal
+from src.database.user_cache import CachedUser, user_cache
 from src.localization.translator import get_system_language, get_translations
 from src.lock.gpio_manager import get_gpio_controller
 from src.logmgr import logger
 from src.messaging.email import get_email_controller
 from src.messaging.mattermost import get_mattermost_controller
 from src.sounds.sound_manager import get_sound_controller
-from src.ui.components.item_frame import ItemFrame
+from src.ui.background import run_in_background, set_busy_cursor
+from src.ui.components.cart_row_frame import CartRowFrame
 from src.ui.components.Message import ShowMessage
-from src.ui.components.quantity_frame import QuantityFrame
-from src.ui.navigation import clear_root
-from src.utils.paths import get_image_path
+from src.ui.components.virtual_list import VirtualList
+from src.ui.navigation import navigator
+from src.utils.assets import asset_registry
+
+# Stock below which admins are notified after a checkout
+CRITICAL_STOCK_LEVEL = 3
+
+# Credit below which the user is notified after a checkout
+LOW_BALANCE_LEVEL = 3.0
+
+
+@dataclass(frozen=True)
+class _Recipient:
+    """Contact details of a user to notify.
+
+    A plain snapshot, so the worker's session can be closed before the Tk thread
+    sends the notifications.
+    """
+
+    id: int
+    name: str
+    email: Optional[str]
+    mattermost_username: Optional[str]
+
+    @classmethod
+    def from_user(cls, user: User) -> "_Recipient":
+        """Create a snapshot from an ORM user."""
+        return cls(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            mattermost_username=user.mattermost_username,
+        )
+
+
+@dataclass
+class _CheckoutOutcome:
+    """Committed checkout plus the notification recipients loaded by the worker."""
+
+    result: CheckoutResult
+    # User with contact details, only loaded when the credit is low
+    user: Optional[_Recipient]
+    # Admins, only loaded when an item fell below the critical stock level
+    admins: List[_Recipient]
+
+
+@operation("checkout")
+def _checkout_with_recipients(
+    session, user_id: int, lines: Sequence[Tuple[int, int]], client_key: str
+) -> _CheckoutOutcome:
+    """Database task: check out and load the rows the notifications need."""
+    result = perform_checkout(session, user_id, lines, client_key=client_key)
+    user: Optional[_Recipient] = None
+    if result.credit < LOW_BALANCE_LEVEL:
+        # Contact details are not part of the cached user
+        user_instance = User.get_by_id(session, user_id)
+        if user_instance is not None:
+            user = _Recipient.from_user(user_instance)
+    admins: List[_Recipient] = []
+    if any(item.quantity < CRITICAL_STOCK_LEVEL for item in result.items):
+        admins = [_Recipient.from_user(admin) for admin in User.get_admins(session)]
+    return _CheckoutOutcome(result=result, user=user, admins=admins)
+
+
+def _has_pending_checkouts(_session) -> bool:
+    """Background task that does not touch the database: query the journal file."""
+    return offline_journal.has_pending()
+
+
+def _record_offline(
+    _session, user_id: int, lines: Sequence[Tuple[int, int]], client_key: str
+) -> JournalEntry:
+    """Background task that does not touch the database: journal the checkout."""
+    return offline_journal.record(user_id, lines, client_key)
 
 
 class UserMainPage(CTkFrame):
     """Main user screen for selecting items and checking out."""
 
-    def __init__(self, root, main_menu, user: User, items: List[Item], *args, **kwargs):
+    # Card (80px) plus vertical padding
+    CART_ROW_HEIGHT = 100
+
+    def __init__(
+        self, root, main_menu, user: CachedUser, items: List[CatalogItem], *args, **kwargs
+    ):
         super().__init__(root, *args, **kwargs)
 
         self.barcode: str = ""
-        self.items: List[Item] = items
+        self.items: List[CatalogItem] = items
         self.displayed_items = {}
 
         root.bind("<Key>", self.on_barcode_scan)
 
         self.grid(row=0, column=0, sticky="nsew")
 
+        # Automatic logout scheduled after a checkout
+        self._logout_after: Optional[str] = None
+
         self.gpio_controller = get_gpio_controller()
         self.email_controller = get_email_controller()
         self.sound_controller = get_sound_controller()
@@ -53,29 +143,36 @@ class UserMainPage(CTkFrame):
 
         self.root = root
         self.main_menu = main_menu
-        self.user: User = user
+        self.user: CachedUser = user
         self.translations = get_translations()
 
         self.total_price = 0.0
 
-        self.session = get_db()
+        self.checkout_pending = False
 
-        user_img = Image.open(get_image_path("user.png"))
-        user_image = CTkImage(light_image=user_img, dark_image=user_img)
+        user_image = asset_registry.image("user.png")
 
-        credit_img = Image.open(get_image_path("credit.png"))
-        credit_image = CTkImage(light_image=credit_img, dark_image=credit_img)
+        credit_image = asset_registry.image("credit.png")
 
-        self.item_frame = CTkScrollableFrame(self, fg_color="white", width=760, height=260)
-        self.item_frame.grid(
+        self.cart_list = VirtualList(
+            self,
+            row_height=self.CART_ROW_HEIGHT,
+            create_row=lambda master, line: CartRowFrame(
+                master, line, self.update_total_price, fg_color="white"
+            ),
+            bind_row=lambda row, line: row.set_line(line),
+            width=760,
+            height=260,
+            fg_color="white",
+        )
+        self.cart_list.grid(
             row=1, rowspan=2, column=0, columnspan=4, padx=20, pady=10, sticky="nsew"
         )
-        self.item_frame.grid_columnconfigure(0, weight=1)
 
         self.shopping_cart = []
 
         # Welcome label
-        welcome_label = CTkButton(
+        self.welcome_label = CTkButton(
             self,
             image=user_image,
             text=self.translations["user"]["welcome_user_message"].format(user_name=self.user.name),
@@ -86,7 +183,7 @@ class UserMainPage(CTkFrame):
             width=290,
             height=60,
         )
-        welcome_label.grid(row=0, column=0, columnspan=2, pady=10, padx=(20, 10), sticky="ew")
+        self.welcome_label.grid(row=0, column=0, columnspan=2, pady=10, padx=(20, 10), sticky="ew")
 
         # Credits label
         self.credits_label = CTkButton(
@@ -103,7 +200,7 @@ class UserMainPage(CTkFrame):
         self.credits_label.grid(row=0, column=2, columnspan=2, pady=10, padx=(10, 20), sticky="ew")
 
         # Cancel and checkout buttons
-        cancel_button = CTkButton(
+        self.cancel_button = CTkButton(
             self,
             text=self.translations["buttons"]["cancel_button"],
             width=280,
@@ -116,7 +213,7 @@ class UserMainPage(CTkFrame):
             hover_color="#333",
             command=self.logout,
         )
-        cancel_button.grid(row=3, column=0, columnspan=2, pady=20, padx=(20, 10), sticky="ew")
+        self.cancel_button.grid(row=3, column=0, columnspan=2, pady=20, padx=(20, 10), sticky="ew")
 
         self.checkout_button = CTkButton(
             self,
@@ -167,30 +264,8 @@ class UserMainPage(CTkFrame):
             self.shopping_cart.append((quantity, item))  # Store quantity and item details
             self.update_total_price()
 
-            indx = len(self.displayed_items)  # New row index
-            self.item_frame.grid_rowconfigure(indx, weight=1)
-            sub_frame = CTkFrame(self.item_frame, fg_color="white", width=740, height=60)
-            sub_frame.grid(row=indx, column=0, padx=10, pady=10, sticky="nsew")
-
-            # Configure grid for sub_frame
-            sub_frame.grid_rowconfigure(0, weight=1)
-            sub_frame.grid_columnconfigure(0, weight=1)
-            sub_frame.grid_columnconfigure(1, weight=1)
-
-            # Add widgets to the sub_frame
-            ItemFrame(sub_frame, data=item, fg_color="white").grid(row=0, column=0, sticky="w")
-
-            quantity_frame = QuantityFrame(
-                sub_frame,
-                data=quantity,
-                update_total_price=self.update_total_price,
-                item_price=item.price,
-                border_width=1,
-                fg_color="white",
-                border_color="#D3D3D3",
-                corner_radius=15,
-            )
-            quantity_frame.grid(row=0, column=1, sticky="e", ipadx=10, ipady=5)
+            self.cart_list.set_items(self.shopping_cart)
+            self.cart_list.scroll_to(len(self.shopping_cart) - 1)
 
             # Store the quantity widget and item details in displayed_items
             self.displayed_items[item_id] = (quantity, item)
@@ -205,27 +280,43 @@ class UserMainPage(CTkFrame):
             text=self.translations["buttons"]["checkout_button"].format(total=self.total_price)
         )
 
+    def on_show(self, user: CachedUser, items: List[CatalogItem]):
+        """Shown again from the cache: start with an empty cart for `user`."""
+        self.user = user
+        self.items = items
+        self.barcode = ""
+        self.shopping_cart = []
+        self.displayed_items = {}
+        self.cart_list.set_items(self.shopping_cart)
+        self.update_total_price()
+        self.welcome_label.configure(
+            text=self.translations["user"]["welcome_user_message"].format(user_name=user.name)
+        )
+        self.credits_label.configure(
+            text=self.translations["user"]["credits_message"].format(user_credit=user.credit)
+        )
+        self.root.bind("<Key>", self.on_barcode_scan)
+
+    def on_hide(self):
+        """Stop taking barcodes and drop a pending automatic logout."""
+        self.root.unbind("<Key>")
+        if self._logout_after is not None:
+            self.root.after_cancel(self._logout_after)
+            self._logout_after = None
+
     def logout(self):
-        clear_root(self.root)
+        self._logout_after = None
         self.gpio_controller.deactivate()
-        self.main_menu(self.root).grid(row=0, column=0, sticky="nsew")
+        navigator.show(self.main_menu, self.main_menu)
 
     def checkout(self):
-        """Validate cart and execute checkout as one DB transaction."""
+        """Validate the cart and run the checkout on a database worker."""
         logger.debug("Starting checkout process")
         if self.total_price == 0:
             logger.debug("No items in the shopping cart")
             return
-
-        user_credit = self.user.credit
-        if self.total_price > float(user_credit):
-            logger.debug(
-                (
-                    f"Insufficient credit for checkout. Total price: {self.total_price}, "
-                    f"User credit: {user_credit}"
-                )
-            )
-            self._handle_insufficient_credit()
+        if self.checkout_pending:
+            logger.debug("Checkout already in progress")
             return
 
         # First validate all items are available in requested quantities
@@ -241,117 +332,158 @@ class UserMainPage(CTkFrame):
                 self._handle_insufficient_quantity(item)
                 return
 
-        # If validation passed, process the checkout
-        try:
-            self._process_checkout(user_credit)
-            logger.debug("Checkout process completed successfully")
-        except (ValueError, sqlalchemy.exc.SQLAlchemyError):
-            logger.exception("Checkout failed")
-            self._handle_checkout_error()
-
-    def _process_checkout(self, user_credit):
-        """Perform the checkout transaction (row locks, updates, commit/rollback)."""
-        current_datetime = datetime.now()
-        logger.debug("Processing checkout at %s", current_datetime)
-
-        try:
-            # Process all items in one loop
-            for quantity, item_in_cart in self.shopping_cart:
-                requested_quantity = int(quantity.get())
-                logger.debug(
-                    (
-                        f"Processing item {item_in_cart.id} with requested quantity "
-                        f"{requested_quantity}"
-                    )
-                )
-
-                if requested_quantity <= 0:
-                    logger.debug(
-                        "Skipping item %s due to non-positive quantity",
-                        item_in_cart.id,
-                    )
-                    continue
-
-                # Re-fetch item with row lock to prevent race conditions
-                locked_item = (
-                    self.session.query(Item).filter_by(id=item_in_cart.id).with_for_update().first()
-                )
+        # The credit is checked by the conditional debit of `perform_checkout`, so a
+        # stale cached credit (e.g. topped up on another kiosk) does not reject the cart.
+        lines = [(item.id, int(quantity.get())) for quantity, item in self.shopping_cart]
+        # Identifies the checkout on the server, so a journaled retry is replayed at most once
+        client_key = str(uuid.uuid4())
+        if not offline_journal.is_enabled:
+            self._submit_checkout(lines, client_key)
+            return
+        # The checkout stays busy between the two tasks: the second one is
+        # submitted by the callback of the first, before Tk handles another event
+        run_in_background(
+            self,
+            _has_pending_checkouts,
+            on_success=lambda pending: self._on_pending_checked(pending, lines, client_key),
+            on_error=lambda error: self._on_checkout_failed(error, lines, client_key),
+            busy=self._set_checkout_busy,
+        )
 
-                if not locked_item:
-                    raise ValueError(f"Item {item_in_cart.name} not found")
+    def _on_pending_checked(self, pending: bool, lines: List[Tuple[int, int]], client_key: str):
+        if pending:
+            # The server was unreachable recently: queue behind the journaled checkouts
+            self._journal_checkout(lines, client_key)
+        else:
+            self._submit_checkout(lines, client_key)
 
-                # Validate quantity against the locked row
-                if locked_item.quantity < requested_quantity:
-                    raise ValueError(
-                        f"Insufficient stock for {locked_item.name}. "
-                        f"Available: {locked_item.quantity}, Requested: {requested_quantity}"
-                    )
+    def _submit_checkout(self, lines: List[Tuple[int, int]], client_key: str):
+        run_in_background(
+            self,
+            _checkout_with_recipients,
+            self.user.id,
+            lines,
+            client_key,
+            on_success=self._on_checkout_done,
+            on_error=lambda error: self._on_checkout_failed(error, lines, client_key),
+            busy=self._set_checkout_busy,
+        )
 
-                # Update item quantity - NO COMMIT YET
-                new_quantity = locked_item.quantity - requested_quantity
-                logger.debug(
-                    "Updating item %s quantity to %s",
-                    locked_item.id,
-                    new_quantity,
-                )
-                locked_item.update(self.session, commit=False, quantity=new_quantity)
-
-                # Create transaction - NO COMMIT YET
-                new_transaction = Transaction(
-                    item_id=locked_item.id,
-                    user_id=self.user.id,
-                    date=current_datetime,
-                    cost=str(locked_item.price * requested_quantity),
-                    category=locked_item.category,
-                )
-                logger.debug("Creating transaction for item %s", locked_item.id)
-                new_transaction.create(self.session, commit=False)
+    def _journal_checkout(self, lines: List[Tuple[int, int]], client_key: str):
+        """Validate the cart against the caches and journal it for a later replay."""
+        run_in_background(
+            self,
+            _record_offline,
+            self.user.id,
+            lines,
+            client_key,
+            on_success=self._on_checkout_journaled,
+            on_error=self._on_journal_failed,
+            busy=self._set_checkout_busy,
+        )
 
-            # Update user credit - NO COMMIT YET
-            # Lock user row to prevent race conditions on credit
-            locked_user = (
-                self.session.query(User).filter_by(id=self.user.id).with_for_update().first()
-            )
+    def _set_checkout_busy(self, busy: bool):
+        self.checkout_pending = busy
+        self.checkout_button.configure(state="disabled" if busy else "normal")
+        # The screen is reused for the next user, so it must not be left with a result pending
+        self.cancel_button.configure(state="disabled" if busy else "normal")
+        set_busy_cursor(self, busy)
 
-            if not locked_user:
-                raise ValueError("User not found")
+    def _on_checkout_done(self, outcome: "_CheckoutOutcome"):
+        """Post-commit actions; the returned rows carry the new stock."""
+        result = outcome.result
+        user_cache.set_credit(self.user.id, result.credit)
 
-            if locked_user.credit < self.total_price:
-                raise ValueError("Insufficient credit")
+        if outcome.user is not None:
+            self._notify_low_balance(outcome.user, result.credit)
 
-            new_credit = float(locked_user.credit) - self.total_price
-            locked_user.update(self.session, commit=False, credit=new_credit)
+        for updated_item in result.items:
+            item_catalog.upsert(updated_item)
+            self.check_product_stock_and_notify(updated_item, outcome.admins)
 
-            # COMMIT EVERYTHING AT ONCE
-            self.session.commit()
-            logger.info("Checkout transaction committed successfully")
+        self._finish_checkout(result.credit)
 
-            # Post-commit actions (Notifications)
-            if locked_user:
-                self._check_low_balance(locked_user, new_credit)
+    def _on_checkout_journaled(self, entry: JournalEntry):
+        """The checkout is journaled; the caches already carry the new credit and stock."""
+        self._finish_checkout(entry.credit)
 
-            for quantity, item_in_cart in self.shopping_cart:
-                # Re-fetch to get the updated quantity for notification check
-                updated_item = Item.get_by_id(self.session, item_in_cart.id)
-                if updated_item:
-                    self.check_product_stock_and_notify(updated_item)
+    def _finish_checkout(self, credit: float):
+        self._show_success_message()
+        self.credits_label.configure(
+            text=self.translations["user"]["credits_message"].format(user_credit=credit)
+        )
+        self.items = item_catalog.all_items()
 
-            self._show_success_message()
-            self.credits_label.configure(
-                text=self.translations["user"]["credits_message"].format(user_credit=new_credit)
+        if self.sound_controller:
+            logger.debug("Playing positive sound on successful checkout")
+            self.sound_controller.play_sound("positive")
+
+        logger.debug("Checkout process completed successfully")
+        self._logout_after = self.root.after(5000, self.logout)
+
+    def _on_checkout_failed(
+        self, error: BaseException, lines: List[Tuple[int, int]], client_key: str
+    ):
+        if offline_journal.is_enabled and isinstance(error, CheckoutOutcomeUnknown):
+            # Maybe committed: the replay skips it if the server has the key
+            logger.warning(
+                "Checkout outcome unknown, journaling checkout %s: %s", client_key, error
+            )
+            self._journal_checkout(lines, client_key)
+        elif offline_journal.is_enabled and is_connection_error(error):
+            logger.warning("Database unreachable, journaling checkout: %s", error)
+            self._journal_checkout(lines, client_key)
+        elif isinstance(error, InsufficientStockError):
+            # Another kiosk sold the stock since the cart was filled
+            logger.info("Checkout rejected: %s", error)
+            run_in_background(
+                self,
+                item_catalog.refresh,
+                error.item_id,
+                on_success=self._on_stock_reloaded,
+                on_error=lambda _error: self._handle_checkout_error(),
+            )
+        elif isinstance(error, InsufficientCreditError):
+            logger.info("Checkout rejected: %s", error)
+            self._handle_insufficient_credit()
+            run_in_background(
+                self,
+                user_cache.refresh,
+                self.user.id,
+                on_success=self._on_user_refreshed,
             )
-            self.items = Item.read_all(self.session)
+        else:
+            logger.error("Checkout failed: %s", error)
+            self._handle_checkout_error()
 
-            if self.sound_controller:
-                logger.debug("Playing positive sound on successful checkout")
-                self.sound_controller.play_sound("positive")
+    def _on_journal_failed(self, error: BaseException):
+        if isinstance(error, InsufficientStockError):
+            logger.info("Offline checkout rejected: %s", error)
+            item = item_catalog.get_by_id(error.item_id)
+            if item is None:
+                self._handle_checkout_error()
+            else:
+                self._handle_insufficient_quantity(item)
+        elif isinstance(error, InsufficientCreditError):
+            logger.info("Offline checkout rejected: %s", error)
+            self._handle_insufficient_credit()
+        else:
+            logger.error("Offline checkout failed: %s", error)
+            self._handle_checkout_error()
 
-            self.root.after(5000, self.logout)
+    def _on_stock_reloaded(self, item: Optional[CatalogItem]):
+        if item is None:
+            self._handle_checkout_error()
+            return
+        self._handle_insufficient_quantity(item)
 
-        except (ValueError, sqlalchemy.exc.SQLAlchemyError):
-            self.session.rollback()
-            logger.exception("Checkout failed, rolled back")
-            raise
+    def _on_user_refreshed(self, user: Optional[CachedUser]):
+        if user is None:
+            return
+        self.user = user
+        self.credits_label.configure(
+            text=self.translations["user"]["credits_message"].format(user_credit=user.credit)
+        )
 
     def _handle_insufficient_credit(self):
         if self.sound_controller:
@@ -391,10 +523,7 @@ class UserMainPage(CTkFrame):
         logger.debug("Showing insufficient quantity message for item %s", item.id)
         self.root.after(5000, self.message.destroy)
 
-    def _check_low_balance(self, user_instance, credit):
-        if credit >= 3.0:
-            return
-
+    def _notify_low_balance(self, user_instance: _Recipient, credit: float):
         if user_instance.email:
             self.email_controller.notify_low_balance(
                 recipient=user_instance.email,
@@ -426,13 +555,11 @@ class UserMainPage(CTkFrame):
             # Append the scanned character to the barcode string
             self.barcode += event.char
 
-    def check_product_stock_and_notify(self, item: Item):
+    def check_product_stock_and_notify(self, item: Item, admins: List[_Recipient]):
         """Notify admins when stock is below a critical threshold."""
         logger.debug("Checking stock levels for item %s", item.id)
-        critical_stock_level = 3  # Define threshold
 
-        if item.quantity < critical_stock_level:  # Assuming available_quantity is part of item
-            admins: List[User] = User.get_admins(self.session)
+        if item.quantity < CRITICAL_STOCK_LEVEL:
             for admin in admins:
                 if admin.email:
                     self.email_controller.notify_low_stock(
@@ -450,8 +577,22 @@ class UserMainPage(CTkFrame):
 
     def search_product(self, barcode_value: str):
         """Lookup an item by barcode and add it to the cart if found."""
-        item: Item = Item.get_by_barcode(self.session, barcode_value)
+        item = item_catalog.get_by_barcode(barcode_value)
+        if item:
+            self._on_product_found(barcode_value, item)
+            return
+
+        # Catalog miss: the item may have been created by another kiosk
+        run_in_background(
+            self,
+            operation("barcode_lookup")(item_catalog.lookup),
+            barcode_value,
+            on_success=lambda found: self._on_product_found(barcode_value, found),
+            on_error=lambda _error: self._on_product_found(barcode_value, None),
+            busy=lambda busy: set_busy_cursor(self, busy),
+        )
 
+    def _on_product_found(self, barcode_value: str, item: Optional[CatalogItem]):
         if item:
             self.add_item_to_list(item)
             logger.debug(
@@ -4,22 +4,24 @@ Shows the kiosk start screen and handles NFC-based login, routing to either the
 user or admin flow.
 """
 
-from typing import List
+from typing import List, Optional
 
-from customtkinter import CTkFrame, CTkImage, CTkLabel
-from PIL import Image
+from customtkinter import CTkFrame, CTkLabel
 
-from src.database import Item, User, get_db
+from src.database.instrumentation import operation
+from src.database.item_catalog import CatalogItem, item_catalog
+from src.database.user_cache import CachedUser, user_cache
 from src.localization.translator import get_translations
 from src.lock.gpio_manager import get_gpio_controller
 from src.logmgr import logger
 from src.nfc_reader import NFCReader
 from src.sounds.sound_manager import get_sound_controller
+from src.ui.background import run_in_background, set_busy_cursor
 from src.ui.components.Message import ShowMessage
-from src.ui.navigation import clear_root
-from src.ui.screens.admin_main import AdminMainFrame
+from src.ui.navigation import navigator
+from src.ui.screens.admin_main import AdminMainFrame, load_counts
 from src.ui.screens.user_main import UserMainPage
-from src.utils.paths import get_image_path
+from src.utils.assets import asset_registry
 
 
 class KioskMainFrame(CTkFrame):
@@ -30,7 +32,6 @@ class KioskMainFrame(CTkFrame):
 
         self.translations = get_translations()
         self.nfc_reader = NFCReader()
-        self.session = get_db()
         self.gpio_controller = get_gpio_controller()
         self.sound_controller = get_sound_controller()
 
@@ -43,11 +44,9 @@ class KioskMainFrame(CTkFrame):
         self.grid_rowconfigure((0, 1, 2, 3, 4, 5), weight=1)
         self.grid_columnconfigure(0, weight=1)
 
-        top_img = Image.open(get_image_path("logo.png"))
-        self.top_image = CTkImage(light_image=top_img, dark_image=top_img, size=(80, 80))
+        self.top_image = asset_registry.image("logo.png", (80, 80))
 
-        bottom_img = Image.open(get_image_path("arrow.png"))
-        self.bottom_image = CTkImage(light_image=bottom_img, dark_image=bottom_img, size=(60, 60))
+        self.bottom_image = asset_registry.image("arrow.png", (60, 60))
 
         self.top_image_label = CTkLabel(self, image=self.top_image, text="")
         self.top_image_label.grid(row=1, column=0)
@@ -59,10 +58,7 @@ class KioskMainFrame(CTkFrame):
         )
         self.welcome_label.grid(row=2, column=0)
 
-        button_icon_img = Image.open(get_image_path("Card.png"))
-        self.button_icon = CTkImage(
-            light_image=button_icon_img, dark_image=button_icon_img, size=(105, 90)
-        )
+        self.button_icon = asset_registry.image("Card.png", (105, 90))
 
         self.scan_card_label = CTkLabel(
             self,
@@ -83,35 +79,49 @@ class KioskMainFrame(CTkFrame):
 
         self.nfc_reader.register_callback(self.login)
 
-    def navigate_to_admin(self, user: User):
+    def on_show(self):
+        """Shown again from the cache: read cards again."""
+        self.nfc_reader = NFCReader()
+        self.nfc_reader.register_callback(self.login)
+
+    def on_hide(self):
+        """Stop reading cards while another screen is shown."""
+        self.cleanup_resources()
+
+    def navigate_to_admin(self, user: CachedUser):
         self.gpio_controller.activate()
-        try:
-            clear_root(self.parent)
-            user_count: int = User.get_count(self.session)
-            item_count: int = Item.get_count(self.session)
-            AdminMainFrame(
-                self.parent,
+        run_in_background(
+            self,
+            operation("admin_dashboard")(load_counts),
+            on_success=lambda counts: self._show_admin(user, *counts),
+            on_error=lambda _error: self._show_admin(user, 0, 0),
+            busy=lambda busy: set_busy_cursor(self, busy),
+        )
+
+    def _show_admin(self, user: CachedUser, user_count: int, item_count: int):
+        navigator.show(
+            AdminMainFrame,
+            lambda root: AdminMainFrame(
+                root,
                 main_menu=KioskMainFrame,
                 user=user,
                 user_count=user_count,
                 item_count=item_count,
-            )
-        finally:
-            self.cleanup_resources()
+            ),
+            user=user,
+            user_count=user_count,
+            item_count=item_count,
+        )
 
-    def navigate_to_customer(self, user: User):
+    def navigate_to_customer(self, user: CachedUser):
         self.gpio_controller.activate()
-        try:
-            clear_root(self.parent)
-            items: List[Item] = Item.read_all(self.session)
-            UserMainPage(
-                self.parent,
-                main_menu=KioskMainFrame,
-                user=user,
-                items=items,
-            )
-        finally:
-            self.cleanup_resources()
+        items: List[CatalogItem] = item_catalog.all_items()
+        navigator.show(
+            UserMainPage,
+            lambda root: UserMainPage(root, main_menu=KioskMainFrame, user=user, items=items),
+            user=user,
+            items=items,
+        )
 
     def showUserNotFoundScreen(self):
         self.message = ShowMessage(
@@ -130,17 +140,38 @@ class KioskMainFrame(CTkFrame):
         self.after(0, lambda: self._process_login(current_id))
 
     def _process_login(self, current_id: str):
+        if navigator.current is not self:
+            # A card read just before the screen was left
+            return
         if current_id:
             logger.info("Scanned NFC ID: %s", current_id)
-            user: User = User.get_by_nfcid(self.session, current_id)
-            if user:
+            user = user_cache.get(current_id)
+            if user and user.type == self.translations["user"]["user"]:
                 self.handle_type(user)
-            else:
-                # Show warning message, "USER Not Found"
-                self.showUserNotFoundScreen()
-                logger.error("No user with this ID found")
+                return
+            # Cache miss, or a cached admin whose role may have been revoked
+            # since: resolve the card from the database before the admin
+            # screen opens the door
+            run_in_background(
+                self,
+                operation("login")(user_cache.revalidate if user else user_cache.lookup),
+                current_id,
+                on_success=self._on_user_resolved,
+                on_error=lambda _error: self.showUserNotFoundScreen(),
+                busy=lambda busy: set_busy_cursor(self, busy),
+            )
 
-    def handle_type(self, user: User):
+    def _on_user_resolved(self, user: Optional[CachedUser]):
+        if navigator.current is not self:
+            return
+        if user:
+            self.handle_type(user)
+        else:
+            # Show warning message, "USER Not Found"
+            self.showUserNotFoundScreen()
+            logger.error("No user with this ID found")
+
+    def handle_type(self, user: CachedUser):
         if user.type == self.translations["user"]["user"]:
             self.navigate_to_customer(user)
         elif user.type == self.translations["admin"]["admin"]:
@@ -0,0 +1,105 @@
+"""Tk main-loop stall instrumentation.
+
+A blocked main loop (e.g. a database query on the Tk thread) freezes the
+touchscreen. The monitor schedules a heartbeat with `after()` and measures how
+late it fires: the lateness is the time the loop could not process events.
+Stalls above a threshold are logged as they happen, and a summary (count,
+total and maximum stall time) is logged periodically and on shutdown, so the
+effect of moving work off the Tk thread can be compared between versions.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from src.logmgr import logger
+
+DEFAULT_INTERVAL_MS = 100
+DEFAULT_THRESHOLD_MS = 150
+# Seconds between two periodic summaries
+REPORT_INTERVAL_S = 600
+
+
+@dataclass
+class StallStats:
+    """Accumulated stall statistics since the monitor was started."""
+
+    heartbeats: int = 0
+    stalls: int = 0
+    total_stall_ms: float = 0.0
+    max_stall_ms: float = 0.0
+
+
+class MainLoopMonitor:
+    """Heartbeat on the Tk main loop that records how long it was blocked."""
+
+    def __init__(
+        self,
+        root,
+        interval_ms: int = DEFAULT_INTERVAL_MS,
+        threshold_ms: int = DEFAULT_THRESHOLD_MS,
+    ) -> None:
+        self.root = root
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.stats = StallStats()
+        self._after_id: Optional[str] = None
+        self._expected = 0.0
+        self._last_report = 0.0
+
+    def start(self) -> None:
+        """Start the heartbeat."""
+        if self._after_id is not None:
+            return
+        self._last_report = time.monotonic()
+        self._schedule()
+        logger.info(
+            "Main loop stall monitor started (interval=%d ms, threshold=%d ms)",
+            self.interval_ms,
+            self.threshold_ms,
+        )
+
+    def stop(self) -> None:
+        """Stop the heartbeat and log the summary."""
+        if self._after_id is None:
+            return
+        try:
+            self.root.after_cancel(self._after_id)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # The interpreter may already be gone on shutdown
+            pass
+        self._after_id = None
+        self.report()
+
+    def report(self) -> None:
+        """Log the accumulated stall statistics."""
+        stats = self.stats
+        logger.info(
+            "Main loop stalls: %d of %d heartbeats, total %.0f ms, max %.0f ms",
+            stats.stalls,
+            stats.heartbeats,
+            stats.total_stall_ms,
+            stats.max_stall_ms,
+        )
+
+    def _schedule(self) -> None:
+        self._expected = time.monotonic() + self.interval_ms / 1000
+        self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def _tick(self) -> None:
+        now = time.monotonic()
+        lateness_ms = max(0.0, (now - self._expected) * 1000)
+
+        stats = self.stats
+        stats.heartbeats += 1
+        if lateness_ms >= self.threshold_ms:
+            stats.stalls += 1
+            stats.total_stall_ms += lateness_ms
+            stats.max_stall_ms = max(stats.max_stall_ms, lateness_ms)
+            logger.warning("Main loop stalled for %.0f ms", lateness_ms)
+
+        if now - self._last_report >= REPORT_INTERVAL_S:
+            self._last_report = now
+            self.report()
+
+        self._schedule()
@@ -0,0 +1,105 @@
+"""Shared static assets.
+
+Screens and components used to open the same icons (`logo.png`, `add.png`,
+`minus.png`, ...) with PIL and wrap them in a new `CTkImage` every time they
+were constructed, and every email read `logo.png` from disk again. The
+registry decodes each file in `src/images` once and hands out shared objects:
+
+- `image(name, size, dark=None)`: one `CTkImage` per file, size and dark
+  variant. Sharing it also shares the scaled photo images CustomTkinter
+  creates from it, so an icon is only resized once per scaling factor.
+- `pil(name)`: the decoded `PIL.Image`, e.g. to build other images from it.
+- `data(name)`: the raw file bytes, e.g. for an email attachment.
+
+`preload` decodes the common assets up front, so the first screens do not
+pay for it; it runs at startup unless `ui.preload_assets` is false.
+"""
+
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from customtkinter import CTkImage
+from PIL import Image
+
+from src.logmgr import logger
+from src.utils.paths import get_image_path
+
+# Icons used by the welcome, purchase and admin screens and their components
+PRELOAD = (
+    "logo.png",
+    "arrow.png",
+    "Card.png",
+    "user.png",
+    "credit.png",
+    "add.png",
+    "minus.png",
+    "back.png",
+    "delete.png",
+    "upload.png",
+)
+
+ImageKey = Tuple[str, Tuple[int, int], Optional[str]]
+
+
+class AssetRegistry:
+    """Thread-safe cache of decoded static images, their `CTkImage`s and raw bytes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._decoded: Dict[str, Image.Image] = {}
+        self._images: Dict[ImageKey, CTkImage] = {}
+        self._data: Dict[str, bytes] = {}
+
+    def pil(self, name: str) -> Image.Image:
+        """Return the decoded image; raises OSError/ValueError like `Image.open`."""
+        with self._lock:
+            image = self._decoded.get(name)
+        if image is not None:
+            return image
+        with Image.open(get_image_path(name)) as opened:
+            opened.load()
+            image = opened.copy()
+        with self._lock:
+            # Another thread may have decoded it in the meantime; keep the first one
+            return self._decoded.setdefault(name, image)
+
+    def image(
+        self, name: str, size: Tuple[int, int] = (20, 20), dark: Optional[str] = None
+    ) -> CTkImage:
+        """Return the shared `CTkImage` of `name` (and `dark` for dark mode) at `size`."""
+        key = (name, tuple(size), dark)
+        with self._lock:
+            image = self._images.get(key)
+        if image is not None:
+            return image
+        light_image = self.pil(name)
+        dark_image = self.pil(dark) if dark else light_image
+        image = CTkImage(light_image=light_image, dark_image=dark_image, size=key[1])
+        with self._lock:
+            return self._images.setdefault(key, image)
+
+    def data(self, name: str) -> bytes:
+        """Return the raw bytes of the file; raises OSError if it cannot be read."""
+        with self._lock:
+            data = self._data.get(name)
+        if data is not None:
+            return data
+        with open(get_image_path(name), "rb") as asset:
+            data = asset.read()
+        with self._lock:
+            return self._data.setdefault(name, data)
+
+    def preload(self, names: Iterable[str] = PRELOAD) -> None:
+        """Decode `names` now; missing or broken files are logged and skipped."""
+        loaded = 0
+        for name in names:
+            try:
+                self.pil(name)
+                loaded += 1
+            except (OSError, ValueError) as e:
+                logger.warning("Cannot preload asset %s: %s", name, e)
+        logger.info("Preloaded %d assets", loaded)
+
+
+# Process-wide registry instance
+asset_registry = AssetRegistry()
@@ -4,6 +4,7 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 SRC_DIR = PROJECT_ROOT / "src"
 IMAGES_DIR = SRC_DIR / "images"
 CONFIG_FILE = PROJECT_ROOT / "config.json"
+CACHE_DIR = PROJECT_ROOT / "cache"
 
 
 def get_image_path(filename: str) -> str:
@@ -19,3 +20,8 @@ def get_config_path() -> str:
 def get_template_dir() -> str:
     """Returns the absolute path to the email templates directory."""
     return str(SRC_DIR / "messaging" / "email" / "templates")
+
+
+def get_thumbnail_dir() -> str:
+    """Returns the absolute path to the item thumbnail cache directory."""
+    return str(CACHE_DIR / "thumbnails")
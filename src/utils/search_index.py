@@ -0,0 +1,211 @@
+"""In-memory search over the rows of the admin listings.
+
+The item and user listings showed every row in id order, so finding one entry
+among a few thousand meant scrolling. A `SearchIndex` keeps the searchable
+fields of the listing rows (e.g. item name, category and barcode) in memory
+and answers a query without a database round trip:
+
+- every word of the query has to match a word of the row: as its prefix
+  (ranked first) or as a substring; a word of three characters or more that
+  matches nothing exactly matches fuzzily, by sharing at least half of its
+  trigrams, so most typos still find the entry,
+- `where` filters the matches (e.g. by category) and `sort_key` orders them;
+  without a sort key the best matches come first, then by id.
+
+Text is compared without case and accents. Substring and fuzzy matches are
+looked up in an inverted trigram index and prefixes in a sorted word list, so
+a query only touches the rows that can match. The owner keeps the index
+current with `put` and `discard`; the listings do so with the rows they patch
+from the change feed. Not thread-safe; the listings use it on the Tk thread.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Share of the trigrams of a query word a row word needs to match fuzzily
+FUZZY_SIMILARITY = 0.5
+
+# Scores per query word; a fuzzy match scores its similarity (below 1)
+PREFIX_SCORE = 3.0
+SUBSTRING_SCORE = 2.0
+
+_WORD = re.compile(r"\w+")
+_LAST_CHAR = chr(0x10FFFF)
+
+
+def normalize(text: str) -> str:
+    """Lower-case `text` and strip its accents."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def words(text: str) -> List[str]:
+    """The normalized words of `text`."""
+    return _WORD.findall(normalize(text))
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _padded_trigrams(word: str) -> Set[str]:
+    # The padding gives word starts and ends trigrams of their own
+    return _trigrams(f" {word} ")
+
+
+@dataclass(frozen=True)
+class _Entry:
+    row: Any
+    text: str
+    words: Tuple[str, ...]
+    grams: FrozenSet[str]
+
+
+class SearchIndex:
+    """Prefix, substring and fuzzy search over some text fields of rows with an `id`."""
+
+    def __init__(self, fields: Sequence[str]) -> None:
+        self.fields = tuple(fields)
+        self._entries: Dict[int, _Entry] = {}
+        # (word, row id), sorted, for prefix lookups
+        self._words: List[Tuple[str, int]] = []
+        # trigram -> ids of the rows with a word containing it
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def rebuild(self, rows: Iterable[Any]) -> None:
+        """Index `rows` instead of the current ones."""
+        self._entries.clear()
+        self._words = []
+        self._postings.clear()
+        for row in rows:
+            entry = self._entry(row)
+            self._entries[row.id] = entry
+            self._add_postings(row.id, entry)
+            self._words.extend((word, row.id) for word in entry.words)
+        self._words.sort()
+
+    def put(self, row: Any) -> None:
+        """Index a new row, or the new version of an indexed one."""
+        self.discard(row.id)
+        entry = self._entry(row)
+        self._entries[row.id] = entry
+        self._add_postings(row.id, entry)
+        for word in entry.words:
+            insort(self._words, (word, row.id))
+
+    def discard(self, row_id: int) -> None:
+        """Remove a row from the index if it is there."""
+        entry = self._entries.pop(row_id, None)
+        if entry is None:
+            return
+        for gram in entry.grams:
+            postings = self._postings[gram]
+            postings.discard(row_id)
+            if not postings:
+                del self._postings[gram]
+        for word in entry.words:
+            del self._words[bisect_left(self._words, (word, row_id))]
+
+    def patch(self, row_ids: Iterable[int], fresh_rows: Iterable[Any]) -> None:
+        """Re-index the changed `row_ids` given their re-read rows; missing ones are removed."""
+        fresh = {row.id: row for row in fresh_rows}
+        for row_id in row_ids:
+            if row_id in fresh:
+                self.put(fresh[row_id])
+            else:
+                self.discard(row_id)
+
+    def values(self, field: str) -> List[str]:
+        """The distinct values of `field`, sorted, e.g. for a filter menu."""
+        return sorted(
+            {value for entry in self._entries.values() if (value := getattr(entry.row, field))}
+        )
+
+    def search(
+        self,
+        query: str,
+        where: Optional[Callable[[Any], bool]] = None,
+        sort_key: Optional[Callable[[Any], Any]] = None,
+        reverse: bool = False,
+    ) -> List[Any]:
+        """The rows matching every word of `query` (all rows if it is empty)."""
+        tokens = words(query)
+        if tokens:
+            scores = self._match(tokens)
+            # Best score first, equal scores by id (the sort is stable, also reversed)
+            ids = sorted(sorted(scores), key=scores.__getitem__, reverse=True)
+            rows = [self._entries[row_id].row for row_id in ids]
+        else:
+            rows = [entry.row for entry in self._entries.values()]
+            if not sort_key:
+                rows.sort(key=lambda row: row.id)
+        if where is not None:
+            rows = [row for row in rows if where(row)]
+        if sort_key is not None:
+            # Stable, so equal keys keep their relevance order
+            rows.sort(key=sort_key, reverse=reverse)
+        return rows
+
+    def _entry(self, row: Any) -> _Entry:
+        values = [str(value) for field in self.fields if (value := getattr(row, field)) is not None]
+        row_words = tuple(dict.fromkeys(word for value in values for word in words(value)))
+        grams = frozenset(gram for word in row_words for gram in _padded_trigrams(word))
+        return _Entry(row=row, text=" ".join(row_words), words=row_words, grams=grams)
+
+    def _add_postings(self, row_id: int, entry: _Entry) -> None:
+        for gram in entry.grams:
+            self._postings[gram].add(row_id)
+
+    def _match(self, tokens: List[str]) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for position, token in enumerate(tokens):
+            token_scores = self._match_token(token)
+            if position == 0:
+                scores = token_scores
+            else:
+                scores = {
+                    row_id: score + token_scores[row_id]
+                    for row_id, score in scores.items()
+                    if row_id in token_scores
+                }
+            if not scores:
+                break
+        return scores
+
+    def _match_token(self, token: str) -> Dict[int, float]:
+        # Words starting with the token sort between it and the token + the last code point
+        start = bisect_left(self._words, (token,))
+        end = bisect_left(self._words, (token + _LAST_CHAR,), lo=start)
+        scores = dict.fromkeys((row_id for _word, row_id in self._words[start:end]), PREFIX_SCORE)
+        if len(token) < 3:
+            return scores
+
+        # Substrings: rows with every trigram of the token, checked against the text
+        postings = sorted((self._postings.get(gram, set()) for gram in _trigrams(token)), key=len)
+        candidates = postings[0].difference(scores).intersection(*postings[1:])
+        for row_id in candidates:
+            if token in self._entries[row_id].text:
+                scores[row_id] = SUBSTRING_SCORE
+
+        if scores:
+            return scores
+
+        # Fuzzy: only for words without an exact match, which are likely misspelt
+        grams = _padded_trigrams(token)
+        counts: Counter = Counter()
+        for gram in grams:
+            counts.update(self._postings.get(gram, ()))
+        needed = FUZZY_SIMILARITY * len(grams)
+        for row_id, count in counts.items():
+            if count >= needed and row_id not in scores:
+                scores[row_id] = count / len(grams)
+        return scores
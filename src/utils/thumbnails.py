@@ -0,0 +1,156 @@
+"""Pre-scaled item thumbnail cache.
+
+List rows and the cart used to decode the full-resolution item photo with PIL
+for every row and let `CTkImage` scale it down each time a list was rebuilt.
+The cache stores square renditions per item id + image hash, in memory (LRU)
+and as PNG files on disk, so a full photo is decoded once when an item is saved
+and never again while rendering lists.
+"""
+
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from PIL import Image, UnidentifiedImageError
+
+from src.logmgr import logger
+from src.utils.paths import get_thumbnail_dir
+
+# Rendition edge lengths: list/cart rows and the item form preview
+LIST_SIZE = 60
+FORM_SIZE = 100
+SIZES = (LIST_SIZE, FORM_SIZE)
+
+DEFAULT_MAX_ENTRIES = 512
+
+CacheKey = Tuple[int, str, int]
+
+
+class ThumbnailCache:
+    """Thread-safe two-level (memory LRU + disk) cache of item thumbnails."""
+
+    def __init__(self, directory: Path, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._images: "OrderedDict[CacheKey, Image.Image]" = OrderedDict()
+
+    def peek(self, item_id: int, image_hash: str, size: int) -> Optional[Image.Image]:
+        """Return the rendition if it is in memory, without touching the disk."""
+        key = (item_id, image_hash, size)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def get(
+        self,
+        item_id: int,
+        image_hash: str,
+        size: int,
+        load_data: Optional[Callable[[], Optional[bytes]]] = None,
+    ) -> Optional[Image.Image]:
+        """Return the rendition of an item image.
+
+        Looks in memory first, then on disk. On a full miss, e.g. for images
+        saved before the cache existed, `load_data` is called to fetch the
+        original bytes and all renditions are generated from them.
+        """
+        key = (item_id, image_hash, size)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                return image
+
+        image = self._read(key)
+        if image is not None:
+            self._remember(key, image)
+            return image
+
+        if load_data is None:
+            return None
+        data = load_data()
+        if not data:
+            return None
+        logger.debug("Thumbnail cache miss for item %s, generating renditions", item_id)
+        return self.generate(item_id, image_hash, data).get(size)
+
+    def generate(self, item_id: int, image_hash: str, data: bytes) -> Dict[int, Image.Image]:
+        """Decode an original image once and store all renditions.
+
+        Returns a dict of size -> rendition; it is empty if the data cannot be decoded.
+        """
+        try:
+            with Image.open(BytesIO(data)) as original:
+                original.load()
+                if original.mode not in ("RGB", "RGBA"):
+                    original = original.convert("RGBA")
+                renditions = {
+                    size: original.resize((size, size), Image.Resampling.LANCZOS) for size in SIZES
+                }
+        except (UnidentifiedImageError, OSError, ValueError) as e:
+            logger.error("Cannot create thumbnails for item %s: %s", item_id, e)
+            return {}
+
+        self.discard(item_id)
+        for size, image in renditions.items():
+            key = (item_id, image_hash, size)
+            self._write(key, image)
+            self._remember(key, image)
+        return renditions
+
+    def discard(self, item_id: int) -> None:
+        """Drop all renditions of an item, e.g. after its image changed or it was deleted."""
+        with self._lock:
+            for key in [key for key in self._images if key[0] == item_id]:
+                del self._images[key]
+        for path in self.directory.glob(f"{item_id}_*.png"):
+            try:
+                path.unlink()
+            except OSError:
+                logger.warning("Cannot remove thumbnail %s", path)
+
+    def clear(self) -> None:
+        """Forget all in-memory renditions; files on disk are kept."""
+        with self._lock:
+            self._images.clear()
+
+    def _path(self, key: CacheKey) -> Path:
+        item_id, image_hash, size = key
+        return self.directory / f"{item_id}_{image_hash}_{size}.png"
+
+    def _read(self, key: CacheKey) -> Optional[Image.Image]:
+        path = self._path(key)
+        if not path.is_file():
+            return None
+        try:
+            with Image.open(path) as image:
+                image.load()
+                return image.copy()
+        except (UnidentifiedImageError, OSError) as e:
+            logger.warning("Ignoring unreadable thumbnail %s: %s", path, e)
+            return None
+
+    def _write(self, key: CacheKey, image: Image.Image) -> None:
+        path = self._path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            image.save(path, format="PNG")
+        except OSError as e:
+            # The memory cache still works, the rendition is just regenerated next start.
+            logger.warning("Cannot persist thumbnail %s: %s", path, e)
+
+    def _remember(self, key: CacheKey, image: Image.Image) -> None:
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self.max_entries:
+                self._images.popitem(last=False)
+
+
+# Process-wide cache instance
+thumbnail_cache = ThumbnailCache(Path(get_thumbnail_dir()))
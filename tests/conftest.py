@@ -0,0 +1,43 @@
+"""Shared fixtures: a SQLite database migrated through the bundled Alembic chain."""
+
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.database.schema import get_alembic_config
+
+
+def _enforce_foreign_keys(dbapi_connection, _connection_record):
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+@pytest.fixture
+def enforce_foreign_keys():
+    """Whether the test database enforces foreign keys; parametrize to test both."""
+    return True
+
+
+@pytest.fixture
+def engine(tmp_path, enforce_foreign_keys):
+    """Engine on a fresh SQLite file upgraded from empty to the head revision.
+
+    Its connections enforce foreign keys, as PostgreSQL does, unless
+    `enforce_foreign_keys` is false, as for the kiosk's own SQLite database.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'kiosk.db'}")
+    with engine.begin() as connection:
+        command.upgrade(get_alembic_config(connection), "head")
+    # Only after migrating: batch migrations recreate referenced tables
+    engine.dispose()
+    if enforce_foreign_keys:
+        event.listen(engine, "connect", _enforce_foreign_keys)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    """Session on the migrated database."""
+    with sessionmaker(bind=engine)() as session:
+        yield session
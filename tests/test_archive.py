@@ -0,0 +1,44 @@
+"""Archiving months with checkouts that are linked from the credit ledger."""
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from src.database.archive import TransactionArchive, add_months
+from src.database.checkout import perform_checkout
+from src.database.credit_ledger import CHECKOUT, OPENING, record_entry
+from src.database.models.checkout import Checkout
+from src.database.models.credit_ledger import CreditLedgerEntry
+from src.database.models.item import Item
+from src.database.models.user import User
+
+
+@pytest.mark.parametrize(
+    "enforce_foreign_keys", [True, False], ids=["foreign-keys", "no-foreign-keys"]
+)
+def test_archive_month_with_ledger_linked_checkouts(session, tmp_path):
+    """The checkouts are archived, their ledger entries stay with the link cleared."""
+    user = User(name="Test", nfcid="archive", type="User", credit=10.0)
+    item = Item(name="Mate", price=2.0, quantity=5, category="Drinks", barcode="4001")
+    session.add_all([user, item])
+    session.flush()
+    record_entry(session, user.id, 10.0, OPENING)
+    session.commit()
+    result = perform_checkout(session, user.id, [(item.id, 2)])
+
+    archive = TransactionArchive()
+    archive.configure({"horizon_months": 1, "directory": str(tmp_path / "archive")})
+    archived = archive.archive(session, today=add_months(date.today(), 2))
+
+    assert archived == 1
+    assert session.scalar(select(func.count()).select_from(Checkout)) == 0
+    debit = session.scalars(
+        select(CreditLedgerEntry).where(CreditLedgerEntry.kind == CHECKOUT)
+    ).one()
+    assert debit.checkout_id is None
+    assert debit.amount == -4.0
+    assert session.get(User, user.id).credit == 6.0
+
+    (record,) = archive.read_transactions(session, user_id=user.id, since=datetime(2000, 1, 1))
+    assert record.checkout_id == result.checkout_id
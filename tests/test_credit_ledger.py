@@ -0,0 +1,59 @@
+"""Deleting users with credit ledger entries."""
+
+from datetime import datetime
+
+import pytest
+import sqlalchemy.exc
+from sqlalchemy import func, select
+
+from src.database.checkout import perform_checkout
+from src.database.credit_ledger import OPENING, delete_entries, record_entry, take_snapshots
+from src.database.models.credit_ledger import CreditLedgerEntry, CreditSnapshot
+from src.database.models.item import Item
+from src.database.models.user import User
+
+
+def _add_user(session, nfcid: str) -> User:
+    user = User(name="Test", nfcid=nfcid, type="User", credit=10.0)
+    session.add(user)
+    session.flush()
+    record_entry(session, user.id, 10.0, OPENING)
+    session.commit()
+    return user
+
+
+def _count(session, model, user_id: int) -> int:
+    return session.scalar(select(func.count()).select_from(model).where(model.user_id == user_id))
+
+
+def test_user_with_ledger_entries_can_be_deleted(session):
+    """The entries and snapshots of the user go with it."""
+    user = _add_user(session, "ledger")
+    take_snapshots(session, datetime.now())
+    session.commit()
+    user_id = user.id
+
+    delete_entries(session, user_id)
+    user.delete(session)
+
+    assert session.get(User, user_id) is None
+    assert _count(session, CreditLedgerEntry, user_id) == 0
+    assert _count(session, CreditSnapshot, user_id) == 0
+
+
+def test_user_with_purchases_cannot_be_deleted(session):
+    """Purchases keep their user, so the delete fails and nothing is removed."""
+    user = _add_user(session, "buyer")
+    item = Item(name="Mate", price=2.0, quantity=5, category="Drinks", barcode="4001")
+    session.add(item)
+    session.commit()
+    perform_checkout(session, user.id, [(item.id, 1)])
+    user_id = user.id
+
+    delete_entries(session, user_id)
+    with pytest.raises(sqlalchemy.exc.IntegrityError):
+        user.delete(session)
+    session.rollback()
+
+    assert session.get(User, user_id) is not None
+    assert _count(session, CreditLedgerEntry, user_id) == 2
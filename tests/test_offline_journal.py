@@ -0,0 +1,112 @@
+"""A checkout whose commit lost the connection is charged at most once."""
+
+from contextlib import contextmanager
+
+import pytest
+import sqlalchemy.exc
+from sqlalchemy import func, select
+
+import src.database.offline_journal as offline_journal_module
+from src.database.checkout import CheckoutOutcomeUnknown, perform_checkout
+from src.database.item_catalog import item_catalog
+from src.database.models.checkout import Checkout
+from src.database.models.item import Item
+from src.database.models.user import User
+from src.database.offline_journal import OfflineJournal
+from src.database.user_cache import user_cache
+
+CLIENT_KEY = "3f0c2a52-5d1e-4d7a-9a7e-0c8f4b1d2e6a"
+
+
+@pytest.fixture
+def journal(tmp_path, session, monkeypatch):
+    """A journal file replaying into the test session, with the caches it debits."""
+
+    @contextmanager
+    def test_scope():
+        yield session
+        session.commit()
+
+    monkeypatch.setattr(offline_journal_module, "session_scope", test_scope)
+    journal = OfflineJournal()
+    journal.open({"path": str(tmp_path / "journal.db")})
+    yield journal
+    journal.close()
+    user_cache.clear()
+    item_catalog.clear()
+
+
+@pytest.fixture
+def customer(session):
+    """A cached user with 10.00 credit and a cached item at 2.00."""
+    user = User(name="Test", nfcid="journal", type="User", credit=10.0)
+    item = Item(name="Mate", price=2.0, quantity=5, category="Drinks", barcode="4001")
+    session.add_all([user, item])
+    session.commit()
+    user_cache.put(user)
+    item_catalog.upsert(item)
+    return user, item
+
+
+def _checkouts(session) -> int:
+    return session.scalar(select(func.count()).select_from(Checkout))
+
+
+def test_lost_commit_raises_unknown_outcome(session, customer, monkeypatch):
+    """A connection error from the commit does not claim that nothing was written."""
+    user, item = customer
+
+    def lose_connection():
+        raise sqlalchemy.exc.OperationalError("COMMIT", {}, Exception("server closed"))
+
+    monkeypatch.setattr(session, "commit", lose_connection)
+    with pytest.raises(CheckoutOutcomeUnknown) as raised:
+        perform_checkout(session, user.id, [(item.id, 1)], client_key=CLIENT_KEY)
+    assert raised.value.client_key == CLIENT_KEY
+
+
+def test_replay_skips_a_checkout_the_server_committed(session, journal, customer):
+    """The commit went through before the connection was lost: the replay does not charge again."""
+    user, item = customer
+    perform_checkout(session, user.id, [(item.id, 1)], client_key=CLIENT_KEY)
+    journal.record(user.id, [(item.id, 1)], CLIENT_KEY)
+
+    journal.replay()
+
+    assert journal.pending() == []
+    assert journal.conflicts() == []
+    assert _checkouts(session) == 1
+    session.refresh(user)
+    assert user.credit == pytest.approx(8.0)
+
+
+def test_replay_commits_a_checkout_the_server_lost(session, journal, customer):
+    """The commit did not go through: the replay commits it once, with its key."""
+    user, item = customer
+    journal.record(user.id, [(item.id, 1)], CLIENT_KEY)
+
+    journal.replay()
+    journal.replay()
+
+    assert journal.pending() == []
+    assert _checkouts(session) == 1
+    assert session.scalar(select(Checkout.client_key)) == CLIENT_KEY
+    session.refresh(user)
+    assert user.credit == pytest.approx(8.0)
+
+
+def test_interrupted_replay_is_resumed_by_key(tmp_path, session, journal, customer):
+    """An entry caught mid-replay goes back to pending and is skipped if it was committed."""
+    user, item = customer
+    entry = journal.record(user.id, [(item.id, 1)], CLIENT_KEY)
+    perform_checkout(session, user.id, [(item.id, 1)], client_key=CLIENT_KEY)
+    journal._set_status(entry.id, offline_journal_module.REPLAYING)
+    journal.close()
+
+    journal.open({"path": str(tmp_path / "journal.db")})
+    assert [pending.client_key for pending in journal.pending()] == [CLIENT_KEY]
+    journal.replay()
+
+    assert journal.pending() == []
+    assert journal.conflicts() == []
+    assert _checkouts(session) == 1
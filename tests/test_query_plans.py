@@ -0,0 +1,57 @@
+"""The hot queries use the indexes added by the migrations.
+
+Each query is run the way the application runs it; the SQL it emits is then
+explained with `EXPLAIN QUERY PLAN` and the plan has to search the index.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from src.database.archive import TransactionArchive
+from src.database.models.item import Item
+from src.database.models.user import User
+
+
+def _explain(session, run_query) -> str:
+    """The query plan of the statements `run_query(session)` executes, as one string."""
+    statements = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        statements.append((statement, parameters))
+
+    connection = session.connection()
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        run_query(session)
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+
+    driver = connection.connection.dbapi_connection
+    plans = []
+    for statement, parameters in statements:
+        rows = driver.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        plans.extend(row[-1] for row in rows)
+    return "\n".join(plans)
+
+
+@pytest.mark.parametrize(
+    "run_query, index",
+    [
+        pytest.param(lambda s: User.get_by_nfcid(s, "04a1b2c3"), "ix_users_nfcid", id="login"),
+        pytest.param(lambda s: Item.get_by_barcode(s, "4001234"), "ix_items_barcode", id="barcode"),
+        pytest.param(
+            lambda s: TransactionArchive().read_transactions(
+                s, user_id=1, since=datetime(2026, 9, 1), until=datetime(2026, 10, 1)
+            ),
+            "ix_transactions_user_id_date",
+            id="user-date-range",
+        ),
+        pytest.param(User.get_admins, "ix_users_type", id="admin-listing"),
+    ],
+)
+def test_hot_query_searches_index(session, run_query, index):
+    """The plan of the query searches `index` instead of scanning the table."""
+    plan = _explain(session, run_query)
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan, plan
@@ -0,0 +1,40 @@
+"""Cached admin logins are revalidated against the database."""
+
+from src.database.models.user import User
+from src.database.user_cache import UserCache
+
+
+def _add_user(session, nfcid: str, user_type: str) -> User:
+    user = User(name="Alex", nfcid=nfcid, credit=10.0, type=user_type)
+    session.add(user)
+    session.commit()
+    return user
+
+
+def test_revalidate_sees_a_revoked_admin_role(session):
+    """A cache hit still says admin; revalidation returns the demoted user and caches it."""
+    cache = UserCache()
+    user = _add_user(session, "04a1", "Admin")
+    cache.put(user)
+
+    user.type = "User"
+    session.commit()
+
+    assert cache.get("04a1").type == "Admin"
+    assert cache.revalidate(session, "04a1").type == "User"
+    assert cache.get("04a1").type == "User"
+
+
+def test_revalidate_forgets_a_deleted_user(session):
+    """A user deleted elsewhere is not resolved from the stale entry."""
+    cache = UserCache()
+    user = _add_user(session, "04a2", "Admin")
+    cache.put(user)
+    user_id = user.id
+
+    session.delete(user)
+    session.commit()
+
+    assert cache.revalidate(session, "04a2") is None
+    assert cache.get("04a2") is None
+    assert cache.get_by_id(user_id) is None
@@ -0,0 +1,88 @@
+"""Window, pool-slot and offset arithmetic of the virtualized list."""
+
+import pytest
+
+from src.ui.components.virtual_list import (
+    clamp_offset,
+    index_at,
+    offset_to_show,
+    pool_size,
+    pool_slot,
+    visible_range,
+)
+
+ROW_HEIGHT = 100
+
+
+@pytest.mark.parametrize("viewport_height, expected", [(400, 5), (450, 6), (50, 2), (0, 1)])
+def test_pool_covers_partly_scrolled_rows(viewport_height, expected):
+    """One row more than fits, for the row cut off at the top and bottom."""
+    assert pool_size(viewport_height, ROW_HEIGHT) == expected
+
+
+@pytest.mark.parametrize(
+    "offset, item_count, expected",
+    [
+        (0, 1000, range(0, 5)),
+        (50, 1000, range(0, 5)),
+        (250, 1000, range(2, 7)),
+        (99_600, 1000, range(996, 1000)),
+        (0, 3, range(0, 3)),
+        (0, 0, range(0, 0)),
+    ],
+)
+def test_visible_range(offset, item_count, expected):
+    """The first row is the one at the offset; the window ends with the pool or the items."""
+    assert visible_range(offset, ROW_HEIGHT, 5, item_count) == expected
+
+
+@pytest.mark.parametrize("offset", [0, 50, 250, 12_345, 99_600])
+def test_visible_rows_have_distinct_slots(offset):
+    """Rows on screen at the same time never share a pooled widget."""
+    window = visible_range(offset, ROW_HEIGHT, 5, 1000)
+    assert len({pool_slot(index, 5) for index in window}) == len(window)
+
+
+def test_scrolling_by_one_row_rebinds_one_slot():
+    """An item keeps its slot while it stays visible; only the new row is rebound."""
+    before = {pool_slot(index, 5): index for index in visible_range(200, ROW_HEIGHT, 5, 1000)}
+    after = {pool_slot(index, 5): index for index in visible_range(300, ROW_HEIGHT, 5, 1000)}
+    changed = [slot for slot in after if before.get(slot) != after[slot]]
+    assert changed == [pool_slot(7, 5)]
+
+
+@pytest.mark.parametrize(
+    "offset, content_height, expected",
+    [
+        (-30, 10_000, 0.0),
+        (500, 10_000, 500),
+        (9_800, 10_000, 9_600),
+        (100, 300, 0.0),
+        (100, 0, 0.0),
+    ],
+)
+def test_clamp_offset(offset, content_height, expected):
+    """Never above the top or past the last full page; short content does not scroll."""
+    assert clamp_offset(offset, content_height, 400) == expected
+
+
+@pytest.mark.parametrize(
+    "index, expected",
+    [
+        (5, 500),  # already fully visible
+        (2, 200),  # above: scroll up to its top
+        (9, 600),  # below: scroll down until its bottom is at the viewport's bottom
+        (8, 500),  # the last fully visible row
+    ],
+)
+def test_offset_to_show(index, expected):
+    """Scroll only as far as needed to show the whole row."""
+    assert offset_to_show(index, ROW_HEIGHT, 500, 400) == expected
+
+
+@pytest.mark.parametrize(
+    "y, offset, expected", [(0, 0, 0), (99, 0, 0), (100, 0, 1), (30, 250, 2), (350, 0, None)]
+)
+def test_index_at(y, offset, expected):
+    """Hit testing includes the offset and misses below the last item."""
+    assert index_at(y, offset, ROW_HEIGHT, 3) == expected
@@ -38,7 +38,16 @@ backup_sqlite() {
     
     BACKUP_FILE="${BACKUP_DIR}/sqlite_backup_$(date +%Y-%m-%d_%H-%M-%S).db"
     
-    cp "${SQLITE_DB_FILE}" "${BACKUP_FILE}"
+    # The database runs in WAL mode: copying the file alone could miss commits
+    # still in the -wal file, so use SQLite's online backup instead.
+    python3 -c "
+import sqlite3
+source = sqlite3.connect('$SQLITE_DB_FILE')
+target = sqlite3.connect('$BACKUP_FILE')
+source.backup(target)
+target.close()
+source.close()
+"
     
     if [ $? -eq 0 ]; then
         echo "SUCCESS: SQLite backup created: $BACKUP_FILE"